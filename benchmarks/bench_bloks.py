@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de l'extraction des méthodes 2FA Bloks (BloksManager / AlternativeManager)
+Réponses des fixtures de tests (challenge_picker de test_bloks, réponses de connexion de test_login_response)
+"""
+
+import io
+import os
+import sys
+import json
+import timeit
+import contextlib
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from insta_kendou.auth.bloks_2fa import BloksManager
+from insta_kendou.auth.alternative_2fa import AlternativeManager
+from insta_kendou.utils.bloks import BloksScan, scan_bloks
+from test_bloks import picker_response, reference_scan
+from test_login_response import FIXTURES, bloks_filler
+
+def responses() -> list:
+    """Fixtures telles quelles, puis entourées du code Bloks de taille réelle (~250 Ko)"""
+    filler = bloks_filler(3000)
+    padded_picker = picker_response(extra=',"filler":' + json.dumps(filler))
+    return [
+        ("challenge_picker (fixture)", picker_response()),
+        ("challenge_picker + code Bloks", padded_picker),
+        ("login, littéral échappé", json.dumps(FIXTURES["littéral échappé"])),
+        ("login, littéraux imbriqués x3", json.dumps(FIXTURES["littéraux imbriqués x3"])),
+    ]
+
+def measure(name: str, function, number: int):
+    with contextlib.redirect_stdout(io.StringIO()):
+        elapsed = timeit.timeit(function, number=number) / number * 1000
+    print(f"{name:<48} {elapsed:8.3f} ms")
+
+def anchored_scan(text: str):
+    scan = BloksScan(text)
+    return scan.phones, scan.phone_endings("261"), scan.has_whatsapp_indicator(), scan.emails, \
+        [scan.occurrences(word) for word in ("context_data", "array.Make", "Texto", "SMS", "Email")]
+
+def main():
+    bloks_manager, alternative_manager = BloksManager(None), AlternativeManager(None)
+    bloks_manager.challenge_data, alternative_manager.challenge_data = {}, {}
+    
+    for label, text in responses():
+        number = 2000 if len(text) < 10_000 else 50
+        print(f"{label}: {len(text) / 1024:.1f} Ko")
+        measure("  regex historiques (numéros, WhatsApp, mots-clés)", lambda: reference_scan(text), number)
+        measure("  BloksScan (recherches ancrées)", lambda: anchored_scan(text), number)
+        measure("  bloks: méthodes (+ context_data)", lambda: bloks_manager._extract_bloks_verification_methods(text), number)
+        
+        def shared():
+            scan = scan_bloks(text)
+            alternative_manager._extract_context_from_alternative_response(text, scan)
+            alternative_manager._extract_alternative_verification_methods(text, scan)
+        measure("  alternatif: context + méthodes, 1 analyse", shared, number)
+
+if __name__ == "__main__":
+    main()
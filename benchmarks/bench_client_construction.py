@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de construction du client : InstagramClient.from_memory (sans E/S)
+Durée par construction et nombre d'événements d'E/S observés (hook d'audit)
+"""
+
+import os
+import sys
+import time
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from insta_kendou import InstagramClient
+from conftest import DEVICE_INFO, SESSION_DATA
+
+IO_EVENTS = ("open", "os.listdir", "os.scandir", "os.stat", "subprocess.Popen", "socket.connect", "socket.getaddrinfo")
+io_events = []
+recording = False
+
+def audit(event, args):
+    if recording and event in IO_EVENTS:
+        io_events.append(event)
+
+def main(rounds: int = 5000):
+    global recording
+    sys.addaudithook(audit)
+    InstagramClient.from_memory(dict(SESSION_DATA), dict(DEVICE_INFO))
+    
+    recording = True
+    start = time.perf_counter()
+    for _ in range(rounds):
+        InstagramClient.from_memory(dict(SESSION_DATA), dict(DEVICE_INFO))
+    elapsed = time.perf_counter() - start
+    recording = False
+    
+    print(f"from_memory: {elapsed / rounds * 1e6:.1f} µs par construction ({rounds} constructions)")
+    print(f"événements d'E/S: {len(io_events)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de débit des lectures sur un client partagé, de 1 à 32 threads
+Serveur local (latence simulée de 20 ms) qui pose un cookie à chaque réponse
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from insta_kendou import InstagramClient
+from conftest import DEVICE_INFO, SESSION_DATA, StubServer
+
+LATENCY = 0.02
+CALLS = 480
+
+def handler(method, path, headers, body):
+    time.sleep(LATENCY)
+    cookies = {"Set-Cookie": f"rur=r{time.monotonic_ns()}; Path=/"}
+    if "/comments/" in path:
+        return 200, cookies, {"status": "ok", "comments": [{"pk": 7, "text": "bravo", "user": {"pk": 42}}]}
+    return 200, cookies, {"status": "ok", "items": [{"id": "3_42", "code": "ABC", "like_count": 3}]}
+
+def main():
+    server = StubServer()
+    server.handler = handler
+    client = InstagramClient.from_memory(dict(SESSION_DATA), dict(DEVICE_INFO))
+    server.route(client.auth.session)
+    calls = (
+        lambda: client.get_media_info("https://www.instagram.com/p/ABC/"),
+        lambda: client.get_media_comments("https://www.instagram.com/p/ABC/"),
+    )
+    
+    try:
+        print(f"{'threads':>7} {'req/s':>10} {'erreurs':>8}")
+        for threads in (1, 2, 4, 8, 16, 32):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(threads) as executor:
+                results = list(executor.map(lambda index: calls[index % len(calls)](), range(CALLS)))
+            elapsed = time.perf_counter() - start
+            errors = sum(1 for result in results if not result["success"])
+            print(f"{threads:>7} {CALLS / elapsed:>10.0f} {errors:>8}")
+    finally:
+        server.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la façade JSON : json (bibliothèque standard) vs fast_json (backend installé)
+Corps signé compact, décodage d'un flux de 50 médias, session indentée et ligne de trace
+"""
+
+import os
+import sys
+import json
+import timeit
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from insta_kendou.utils import fast_json
+
+SIGNED_BODY = {
+    "_uuid": "8c3f3e5e-1f3c-4f9a-9d3b-0123456789ab", "device_id": "android-0123456789abcdef",
+    "media_id": "3456789012345678901_123456", "radio_type": "wifi-none", "container_module": "feed_timeline",
+    "nav_chain": "MainFeedFragment:feed_timeline:1:cold_start::" * 3, "d": 0,
+}
+
+FEED = {
+    "items": [{
+        "pk": 3456789012345678901 + index, "id": f"{index}_1", "caption": {"text": "Bonjour é 😀 #tag " * 5},
+        "user": {"pk": 123456 + index, "username": f"user{index}", "full_name": "Nom Prénom", "is_private": False,
+                 "profile_pic_url": "https://scontent.cdninstagram.com/v/t51/" + "x" * 120},
+        "like_count": index * 3, "taken_at": 1700000000 + index,
+        "image_versions2": {"candidates": [{"width": 1080, "height": 1350, "url": "https://x/" + "y" * 200}] * 3},
+    } for index in range(50)],
+    "more_available": True,
+    "status": "ok",
+}
+
+SPAN = {"traceId": "c12531017703689b1c86191bf93c0937", "spanId": "bbbe1579723e75a6", "name": "HTTP POST", "kind": 3,
+        "startTimeUnixNano": "1792432435464850200", "endTimeUnixNano": "1792432435465872680",
+        "attributes": [{"key": "http.request.method", "value": {"stringValue": "POST"}}], "status": {"code": 0}}
+
+def compare(name: str, stdlib, facade, number: int):
+    baseline = timeit.timeit(stdlib, number=number) / number * 1e6
+    fast = timeit.timeit(facade, number=number) / number * 1e6
+    print(f"{name:<28} json {baseline:9.1f} µs   fast_json {fast:9.1f} µs   x{baseline / fast:.1f}")
+
+def main():
+    print(f"backend: {fast_json.BACKEND}")
+    compact = (",", ":")
+    feed_text = json.dumps(FEED)
+    
+    compare("corps signé (dumps)", lambda: json.dumps(SIGNED_BODY, separators=compact),
+            lambda: fast_json.dumps(SIGNED_BODY, separators=compact), 50000)
+    compare(f"flux {len(feed_text) // 1024} Ko (loads)", lambda: json.loads(feed_text),
+            lambda: fast_json.loads(feed_text), 500)
+    compare("session indent=2 (dumps)", lambda: json.dumps(FEED, indent=2, ensure_ascii=False),
+            lambda: fast_json.dumps(FEED, indent=2, ensure_ascii=False), 300)
+    compare("ligne de trace (dumps)", lambda: json.dumps(SPAN, separators=compact, ensure_ascii=False),
+            lambda: fast_json.dumps(SPAN, separators=compact, ensure_ascii=False), 50000)
+
+if __name__ == "__main__":
+    main()
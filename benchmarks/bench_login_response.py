@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de l'extraction du login_response d'une réponse Bloks (_extract_user_data_fixed, find_embedded_json)
+Réponse d'environ 250 Ko (3000 actions avant HandleLoginResponse), map directe ou dans un littéral échappé
+"""
+
+import os
+import sys
+import json
+import timeit
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from insta_kendou import InstagramClient
+from insta_kendou.utils import fast_json
+from insta_kendou.utils.bloks import find_embedded_json
+from conftest import DEVICE_INFO, SESSION_DATA
+from test_login_response import bloks_filler, embedded_map
+
+def login_response(argument: str) -> dict:
+    return {"layout": {"bloks_payload": {"data": [], "action": "(bk.action.core.TakeLast, " + bloks_filler(3000)
+                                         + "(bk.action.caa.HandleLoginResponse, " + argument + "))"}},
+            "status": "ok"}
+
+def measure(name: str, function, number: int = 50):
+    elapsed = timeit.timeit(function, number=number) / number * 1000
+    print(f"{name:<40} {elapsed:8.2f} ms")
+
+def main():
+    auth = InstagramClient.from_memory(dict(SESSION_DATA), dict(DEVICE_INFO)).auth
+
+    for label, data in (("map dans l'action", login_response(embedded_map())),
+                        ("littéral échappé", login_response(json.dumps(embedded_map())))):
+        text = fast_json.dumps(data)
+        assert auth._extract_user_data_fixed(data)["username"] == auth._extract_user_data_fixed(text)["username"]
+        print(f"{label}: {len(text) // 1024} Ko")
+        # Référence: une sérialisation complète, ce que coûtait au minimum l'ancienne recherche par regex
+        measure("  sérialisation complète (référence)", lambda: fast_json.dumps(data))
+        measure("  find_embedded_json", lambda: find_embedded_json(data, "login_response"))
+        measure("  _extract_user_data_fixed (décodée)", lambda: auth._extract_user_data_fixed(data))
+        measure("  _extract_user_data_fixed (texte brut)", lambda: auth._extract_user_data_fixed(text))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark du coût des métriques HTTP : observe() seul, puis requêtes locales avec et sans métriques
+Et durée des exports Prometheus / JSON pour 50 endpoints
+"""
+
+import os
+import sys
+import time
+
+import requests
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from insta_kendou.utils import create_session, get_transport_adapter
+from insta_kendou.utils.metrics import MetricsRegistry
+from conftest import StubServer
+
+def per_call(func, rounds: int) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds
+
+def main():
+    registry = MetricsRegistry()
+    request = requests.Request("GET", "https://i.instagram.com/api/v1/media/123/info/",
+                               headers={"x-ig-client-endpoint": "media_info"}).prepare()
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["content-length"] = "512"
+    print(f"observe(): {per_call(lambda: registry.observe(request, response, None, 0.0421), 100000) * 1e6:.2f} µs")
+    
+    server = StubServer()
+    session = create_session()
+    server.route(session)
+    url = "https://i.instagram.com/api/v1/media/123/info/"
+    try:
+        disabled = per_call(lambda: session.get(url), 2000)
+        get_transport_adapter(session).observers.append(MetricsRegistry().observe)
+        enabled = per_call(lambda: session.get(url), 2000)
+    finally:
+        server.close()
+    print(f"GET local sans métriques: {disabled * 1e6:.0f} µs, avec: {enabled * 1e6:.0f} µs")
+    
+    for index in range(50):
+        request.headers["x-ig-client-endpoint"] = f"endpoint_{index}"
+        for latency in range(200):
+            registry.observe(request, response, None, latency / 1000.0)
+    print(f"to_prometheus (50 endpoints): {per_call(registry.to_prometheus, 200) * 1e3:.2f} ms")
+    print(f"to_json (50 endpoints): {per_call(registry.to_json, 200) * 1e3:.2f} ms")
+
+if __name__ == "__main__":
+    main()
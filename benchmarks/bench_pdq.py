@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark du hash PDQ : pixels déjà décodés vs décodage JPEG + hash
+Comparaison facultative avec pdqhash (implémentation C++) s'il est installé
+"""
+
+import os
+import sys
+import time
+from io import BytesIO
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+
+from insta_kendou.utils.media import MediaProcessor
+
+def bench(label, func, rounds=30):
+    func()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    elapsed = (time.perf_counter() - start) / rounds
+    print(f"{label:<34} {elapsed * 1000:8.2f} ms")
+
+def main():
+    rng = np.random.default_rng(0)
+    coarse = rng.integers(0, 256, size=(46, 46, 3), dtype=np.uint8)
+    image = Image.fromarray(coarse).resize((1080, 1080), Image.BILINEAR)
+    output = BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    jpeg = output.getvalue()
+    
+    bench("generate_pdq_hash(image=...)", lambda: MediaProcessor.generate_pdq_hash(b"", image=image))
+    bench("generate_pdq_hash(jpeg)", lambda: MediaProcessor.generate_pdq_hash(jpeg))
+    
+    try:
+        import pdqhash
+    except ImportError:
+        print("pdqhash non installé : comparaison ignorée")
+        return
+    pixels = np.ascontiguousarray(np.asarray(image))
+    bench("pdqhash.compute (référence C++)", lambda: pdqhash.compute(pixels))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de stress de la persistance JSON : N threads écrivains sur un même fichier
+Écriture atomique directe (une écriture par mise à jour) vs CoalescingWriter (rafales regroupées)
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from insta_kendou.utils.persistence import atomic_update_json, CoalescingWriter
+
+UPDATES_PER_THREAD = 50
+
+def hammer(threads: int, update) -> float:
+    barrier = threading.Barrier(threads)
+    
+    def run(index):
+        barrier.wait()
+        for count in range(UPDATES_PER_THREAD):
+            update(index, count)
+    
+    workers = [threading.Thread(target=run, args=(index,)) for index in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+def main():
+    directory = tempfile.mkdtemp(prefix="insta_kendou_bench_")
+    print(f"{'threads':>7} {'atomic_update_json':>22} {'CoalescingWriter':>22} {'écritures':>10}")
+    
+    try:
+        run_all(directory)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def run_all(directory: str):
+    for threads in (1, 2, 4, 8, 16, 32):
+        path = os.path.join(directory, f"direct_{threads}.json")
+        
+        def direct(index, count):
+            atomic_update_json(path, lambda data: dict(data, x_mid=f"{index}:{count}"), default=dict, indent=2)
+        
+        writer = CoalescingWriter(os.path.join(directory, f"coalesced_{threads}.json"), delay=0.5)
+        device = {"android_id": "android-0123456789abcdef"}
+        
+        def coalesced(index, count):
+            writer.schedule(dict(device, x_mid=f"{index}:{count}"))
+        
+        updates = threads * UPDATES_PER_THREAD
+        direct_elapsed = hammer(threads, direct)
+        coalesced_elapsed = hammer(threads, coalesced)
+        writer.flush()
+        print(f"{threads:>7} {updates / direct_elapsed:>16.0f} maj/s {updates / coalesced_elapsed:>16.0f} maj/s "
+              f"{writer.writes:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark des corps signed_body: construction d'origine vs create_signed_body vs SignedBodyTemplate
+Configure de story (34 champs dont 17 constants) et corps court d'une action (like)
+"""
+
+import os
+import sys
+import hmac
+import json
+import timeit
+import hashlib
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from insta_kendou.client import _STORY_CONFIGURE_BODY
+from insta_kendou.utils.encryption import InstagramEncryption
+from insta_kendou.utils.payload import FIELD, SignedBodyTemplate
+from test_signed_body import STORY_VALUES, SIGNATURE_KEY
+
+LIKE_VALUES = {
+    "media_id": "3456789012345678901_123456", "_uid": "1234567890",
+    "_uuid": "8c3f3e5e-1f3c-4f9a-9d3b-0123456789ab", "device_id": "android-0123456789abcdef",
+}
+LIKE_BODY = SignedBodyTemplate({
+    "media_id": FIELD, "radio_type": "wifi-none", "_uid": FIELD, "_uuid": FIELD, "device_id": FIELD,
+    "container_module": "feed_timeline", "d": 0,
+})
+
+def original_signed_body(data: dict) -> str:
+    """Construction d'origine: json.dumps compact et nouvel objet HMAC à chaque appel"""
+    json_data = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+    signature = hmac.new(SIGNATURE_KEY.encode(), json_data.encode(), hashlib.sha256).hexdigest()
+    return f"{signature}.{json_data}"
+
+def full_dict(template: SignedBodyTemplate, values: dict) -> dict:
+    """Dict complet équivalent (construit une fois: seul l'encodage est mesuré)"""
+    return json.loads(template.render(values))
+
+def compare(name: str, template: SignedBodyTemplate, values: dict, number: int):
+    data = full_dict(template, values)
+    assert original_signed_body(data) == InstagramEncryption.create_signed_body(data) == template.sign(values)
+
+    original = timeit.timeit(lambda: original_signed_body(data), number=number) / number * 1e6
+    facade = timeit.timeit(lambda: InstagramEncryption.create_signed_body(data), number=number) / number * 1e6
+    templated = timeit.timeit(lambda: template.sign(values), number=number) / number * 1e6
+    print(f"{name:<18} origine {original:7.1f} µs   create_signed_body {facade:7.1f} µs   "
+          f"template {templated:7.1f} µs   x{original / templated:.1f}")
+
+def main():
+    compare("configure story", _STORY_CONFIGURE_BODY, STORY_VALUES, 20000)
+    compare("like", LIKE_BODY, LIKE_VALUES, 50000)
+
+if __name__ == "__main__":
+    main()
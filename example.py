@@ -6,10 +6,8 @@ Interface colorée avec toutes les fonctionnalités
 Code d'accès obligatoire pour utiliser la bibliothèque
 """
 
-from insta_kendou import InstagramClient
+from insta_kendou import InstagramClient, JSONSessionStore, list_sessions
 import os
-import glob
-import json
 import time
 
 # CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
@@ -63,36 +61,16 @@ def print_user_id(user_id):
     print(f"{Colors.PURPLE}USER ID{Colors.RESET}: {Colors.WHITE}{user_id}{Colors.RESET}")
 
 def get_connected_accounts():
-    """Récupérer la liste des comptes connectés"""
+    """Récupérer la liste des comptes connectés (lecture de l'index des sessions uniquement)"""
     accounts = []
-    sessions_dir = "sessions"
     
-    if os.path.exists(sessions_dir):
-        session_files = glob.glob(os.path.join(sessions_dir, "*_ig_complete.json"))
-        
-        for file_path in session_files:
-            try:
-                filename = os.path.basename(file_path)
-                username = filename.replace("_ig_complete.json", "")
-                
-                # Vérifier la validité du fichier
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    session_data = json.load(f)
-                    
-                user_data = session_data.get("user_data", {}) or session_data.get("logged_in_user", {})
-                full_name = user_data.get("full_name", "")
-                is_private = user_data.get("is_private", False)
-                is_verified = user_data.get("is_verified", False)
-                
-                accounts.append({
-                    "username": username,
-                    "full_name": full_name,
-                    "is_private": is_private,
-                    "is_verified": is_verified,
-                    "file_path": file_path
-                })
-            except Exception:
-                continue
+    for session in list_sessions():
+        accounts.append({
+            "username": session["username"],
+            "full_name": session["full_name"],
+            "is_private": session["is_private"],
+            "is_verified": session["is_verified"]
+        })
     
     return accounts
 
@@ -152,7 +130,7 @@ def handle_delete_account(accounts):
             
             if confirm in ['oui', 'o', 'yes', 'y']:
                 try:
-                    os.remove(account['file_path'])
+                    JSONSessionStore().delete(account['username'])
                     print_success(f"Compte @{account['username']} supprimé")
                 except Exception as e:
                     print_error(f"Erreur suppression: {e}")
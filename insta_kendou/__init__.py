@@ -10,6 +10,8 @@ Contact: 0389561802 | https://t.me/Kenny5626
 
 from .client import InstagramClient
 from .exceptions import *
+from .utils.session_store import SessionStore, JSONSessionStore, SQLiteSessionStore, migrate_json_sessions, list_sessions
+from .utils.deadline import Deadline, timeout_override
 from .utils.license import validate_license, LicenseError
 
 # Validation de licence au niveau de la bibliothèque
@@ -26,6 +28,14 @@ __description__ = "Bibliothèque Instagram complète avec authentification 2FA e
 # Exports principaux
 __all__ = [
     'InstagramClient',
+    'Deadline',
+    'timeout_override',
+    # Stockage des sessions
+    'SessionStore',
+    'JSONSessionStore',
+    'SQLiteSessionStore',
+    'migrate_json_sessions',
+    'list_sessions',
     # Exceptions
     'InstagramError',
     'AuthenticationError',
@@ -39,6 +49,7 @@ __all__ = [
     'LoginRequiredError',
     'InvalidCredentialsError',
     'PasswordIncorrectError',
+    'DeadlineExceededError',
     'LicenseError'
 ]
 
@@ -9,9 +9,12 @@ import json
 import uuid
 import random
 import urllib.parse
-import re
 from ..utils.encryption import InstagramEncryption
 from ..utils.device import get_optimal_encoding_for_environment
+from ..utils.tracing import traced
+from ..utils import fast_json
+from ..utils.payload import bloks_form_suffix
+from ..utils.bloks import BloksScan, scan_bloks
 
 class AlternativeManager:
     """Gestionnaire du flux 2FA alternatif complet"""
@@ -20,6 +23,7 @@ class AlternativeManager:
         self.auth = auth_instance
         self.challenge_data = {}
 
+    @traced("alternative_2fa.flow")
     def handle_2fa_flow(self, response_text: str) -> dict:
         """Gérer le nouveau flux 2FA alternatif AVEC L'ORDRE CORRECT"""
         try:
@@ -54,27 +58,18 @@ class AlternativeManager:
         except Exception as e:
             return {"success": False, "error": f"Erreur flux alternatif: {str(e)}"}
 
-    def _extract_context_from_alternative_response(self, response_text: str) -> str:
-        """Extraire context_data du nouveau flux"""
+    def _extract_context_from_alternative_response(self, response_text: str, scan: BloksScan = None) -> str:
+        """Extraire context_data du nouveau flux (scan: analyse déjà faite de response_text)"""
         try:
             print("🔍 Extraction context_data alternatif...")
 
-            # Patterns pour le nouveau flux
-            context_patterns = [
-                r'"context_data"[^"]*"([A-Za-z0-9+/=_-]{500,}(?:\|[a-zA-Z]+)?)"',
-                r'context_data["\\\s:]*([A-Za-z0-9+/=_-]{500,}(?:\|[a-zA-Z]+)?)',
-                r'([A-Za-z0-9+/=_-]{500,}\|[a-zA-Z]{4,})'
-            ]
-
-            for pattern in context_patterns:
-                matches = re.findall(pattern, response_text)
-                if matches:
-                    context = matches[0]
-                    # Nettoyer les échappements
-                    context = context.replace('\\/', '/').replace('\\"', '"')
-                    if len(context) > 500:
-                        print(f"✅ Context_data alternatif trouvé: {context[:50]}...{context[-15:]}")
-                        return context
+            # "context_data" JSON, context_data libre puis chaîne suffixée, relevés en une passe
+            if scan is None:
+                scan = scan_bloks(response_text)
+            context = scan.alternative_context_data()
+            if context:
+                print(f"✅ Context_data alternatif trouvé: {context[:50]}...{context[-15:]}")
+                return context
 
             # Fallback avec suffixe standard
             fallback = "Adng8k4lYCNZHf6znKemw4Lr5VxOZizmQIzhG0JnvsG4vKXuM78CT2DxDuJ09R8x|aplc"
@@ -85,6 +80,7 @@ class AlternativeManager:
             print(f"❌ Erreur extraction context alternatif: {e}")
             return "fallback_context_data|aplc"
 
+    @traced("alternative_2fa.entrypoint")
     def _call_alternative_entrypoint(self, context_data: str) -> dict:
         """Appel au entrypoint_async alternatif"""
         try:
@@ -153,7 +149,7 @@ class AlternativeManager:
                 "x-fb-http-engine": "Tigon/MNS/TCP"
             }
 
-            payload = f"params={urllib.parse.quote(json.dumps(entrypoint_params, separators=(',', ':')))}&bk_client_context={urllib.parse.quote(json.dumps({'bloks_version': 'ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1', 'styles_id': 'instagram'}))}&bloks_versioning_id=ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1"
+            payload = f"params={urllib.parse.quote(fast_json.dumps(entrypoint_params, separators=(',', ':')))}{bloks_form_suffix('ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1')}"
 
             print("🚀 Envoi requête entrypoint...")
 
@@ -181,6 +177,7 @@ class AlternativeManager:
         except Exception as e:
             return {"success": False, "error": f"Erreur entrypoint: {str(e)}"}
 
+    @traced("alternative_2fa.load_code_entry")
     def _load_direct_code_entry_screen(self) -> dict:
         """Charger directement l'écran de saisie du code après entrypoint"""
         try:
@@ -240,7 +237,7 @@ class AlternativeManager:
                 "x-fb-http-engine": "Tigon/MNS/TCP"
             }
 
-            payload = f"params={urllib.parse.quote(json.dumps(entry_params, separators=(',', ':')))}&bk_client_context={urllib.parse.quote(json.dumps({'bloks_version': 'ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1', 'styles_id': 'instagram'}))}&bloks_versioning_id=ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1"
+            payload = f"params={urllib.parse.quote(fast_json.dumps(entry_params, separators=(',', ':')))}{bloks_form_suffix('ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1')}"
 
             print("🚀 Envoi requête code_entry...")
 
@@ -268,6 +265,7 @@ class AlternativeManager:
         except Exception as e:
             return {"success": False, "error": f"Erreur écran code: {str(e)}"}
 
+    @traced("alternative_2fa.code_verification")
     def _handle_alternative_code_verification(self) -> dict:
         """Gérer vérification code alternatif AVEC OPTIONS DE CHANGEMENT ET SÉLECTION"""
         try:
@@ -314,6 +312,7 @@ class AlternativeManager:
         except Exception as e:
             return {"success": False, "error": f"Erreur vérification: {str(e)}"}
 
+    @traced("alternative_2fa.change_method")
     def _change_alternative_verification_method(self) -> dict:
         """NOUVELLE FONCTION: Changer de méthode dans le flux alternatif"""
         try:
@@ -377,7 +376,7 @@ class AlternativeManager:
                 "x-fb-http-engine": "Tigon/MNS/TCP"
             }
 
-            payload = f"params={urllib.parse.quote(json.dumps(another_way_params, separators=(',', ':')))}&bk_client_context={urllib.parse.quote(json.dumps({'bloks_version': 'ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1', 'styles_id': 'instagram'}))}&bloks_versioning_id=ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1"
+            payload = f"params={urllib.parse.quote(fast_json.dumps(another_way_params, separators=(',', ':')))}{bloks_form_suffix('ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1')}"
 
             print("🔄 Essai autre méthode...")
 
@@ -428,6 +427,7 @@ class AlternativeManager:
         except Exception as e:
             return {"success": False, "error": f"Erreur changement méthode: {str(e)}"}
 
+    @traced("alternative_2fa.get_methods")
     def _get_alternative_verification_methods(self, context_data: str) -> dict:
         """Récupérer les méthodes via challenge_picker alternatif"""
         try:
@@ -485,7 +485,7 @@ class AlternativeManager:
                 "x-fb-http-engine": "Tigon/MNS/TCP"
             }
 
-            payload = f"params={urllib.parse.quote(json.dumps(picker_params, separators=(',', ':')))}&bk_client_context={urllib.parse.quote(json.dumps({'bloks_version': 'ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1', 'styles_id': 'instagram'}))}&bloks_versioning_id=ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1"
+            payload = f"params={urllib.parse.quote(fast_json.dumps(picker_params, separators=(',', ':')))}{bloks_form_suffix('ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1')}"
 
             response = self.auth.session.post(
                 "https://i.instagram.com/api/v1/bloks/apps/com.bloks.www.ap.two_step_verification.challenge_picker/",
@@ -497,12 +497,13 @@ class AlternativeManager:
             response_text = InstagramEncryption.safe_decode_response(response)
 
             if response.status_code == 200:
-                # Mettre à jour context_data et extraire méthodes
-                new_context = self._extract_context_from_alternative_response(response_text)
+                # Mettre à jour context_data et extraire méthodes (une seule analyse de la réponse)
+                scan = scan_bloks(response_text)
+                new_context = self._extract_context_from_alternative_response(response_text, scan)
                 if new_context and len(new_context) > 100:
                     self.challenge_data["challenge_context"] = new_context
 
-                methods = self._extract_alternative_verification_methods(response_text)
+                methods = self._extract_alternative_verification_methods(response_text, scan)
                 return {"success": True, "methods": methods}
             else:
                 return {"success": False, "error": f"HTTP {response.status_code}"}
@@ -510,22 +511,24 @@ class AlternativeManager:
         except Exception as e:
             return {"success": False, "error": f"Erreur méthodes: {str(e)}"}
 
-    def _extract_alternative_verification_methods(self, response_text: str) -> list:
+    def _extract_alternative_verification_methods(self, response_text: str, scan: BloksScan = None) -> list:
         """Extraire les méthodes du challenge_picker alternatif"""
         try:
             methods = []
 
             print("🔍 Extraction méthodes alternatives...")
 
-            # Rechercher SMS
-            sms_patterns = [
-                r'Texto.*?(\+\d{1,3}\s+\*+\s+\*+\s+\*+\s+\d{2})',
-                r'SMS.*?(\+\d{1,3}\s+\*+\s+\*+\s+\*+\s+\d{2})',
-                r'(\+\d{1,3}\s+\*+\s+\*+\s+\*+\s+\d{2})'
+            if scan is None:
+                scan = scan_bloks(response_text)
+
+            # Rechercher SMS: après "Texto", après "SMS", puis tout numéro international
+            sms_candidates = [
+                scan.phones_after_keyword("Texto"),
+                scan.phones_after_keyword("SMS"),
+                [phone[1] for phone in scan.phones]
             ]
 
-            for pattern in sms_patterns:
-                matches = re.findall(pattern, response_text)
+            for matches in sms_candidates:
                 for match in matches:
                     if match not in [m.get("value") for m in methods]:
                         methods.append({
@@ -537,14 +540,13 @@ class AlternativeManager:
                         print(f"📱 SMS alternatif trouvé: {match}")
                         break
 
-            # Rechercher Email
-            email_patterns = [
-                r'Email.*?([a-zA-Z0-9]\*+[a-zA-Z0-9]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-                r'([a-zA-Z0-9]\*+[a-zA-Z0-9]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
+            # Rechercher Email: après "Email", puis tout email masqué
+            email_candidates = [
+                scan.emails_after_keyword("Email"),
+                scan.emails
             ]
 
-            for pattern in email_patterns:
-                matches = re.findall(pattern, response_text)
+            for matches in email_candidates:
                 for match in matches:
                     if match not in [m.get("value") for m in methods]:
                         methods.append({
@@ -573,6 +575,7 @@ class AlternativeManager:
             print(f"❌ Erreur extraction méthodes alternatives: {e}")
             return []
 
+    @traced("alternative_2fa.select_method")
     def _show_alternative_method_selection(self, methods: list) -> dict:
         """Afficher sélection méthodes alternatives AVEC CHOIX UTILISATEUR"""
         try:
@@ -613,6 +616,7 @@ class AlternativeManager:
             print(f"❌ Erreur sélection alternative: {e}")
             return None
 
+    @traced("alternative_2fa.submit_method")
     def _submit_alternative_method_choice(self, selected_method: dict) -> dict:
         """Soumettre choix méthode alternative"""
         try:
@@ -676,7 +680,7 @@ class AlternativeManager:
                 "x-fb-http-engine": "Tigon/MNS/TCP"
             }
 
-            payload = f"params={urllib.parse.quote(json.dumps(choice_params, separators=(',', ':')))}&bk_client_context={urllib.parse.quote(json.dumps({'bloks_version': 'ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1', 'styles_id': 'instagram'}))}&bloks_versioning_id=ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1"
+            payload = f"params={urllib.parse.quote(fast_json.dumps(choice_params, separators=(',', ':')))}{bloks_form_suffix('ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1')}"
 
             response = self.auth.session.post(
                 "https://i.instagram.com/api/v1/bloks/async_action/com.bloks.www.bloks.ap.two_step_verification.challenge_picker.async/",
@@ -702,6 +706,7 @@ class AlternativeManager:
         except Exception as e:
             return {"success": False, "error": f"Erreur choix alternatif: {str(e)}"}
 
+    @traced("alternative_2fa.load_method_code_entry")
     def _load_alternative_code_entry_screen(self) -> dict:
         """Charger écran saisie code alternatif"""
         try:
@@ -761,7 +766,7 @@ class AlternativeManager:
                 "x-fb-http-engine": "Tigon/MNS/TCP"
             }
 
-            payload = f"params={urllib.parse.quote(json.dumps(entry_params, separators=(',', ':')))}&bk_client_context={urllib.parse.quote(json.dumps({'bloks_version': 'ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1', 'styles_id': 'instagram'}))}&bloks_versioning_id=ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1"
+            payload = f"params={urllib.parse.quote(fast_json.dumps(entry_params, separators=(',', ':')))}{bloks_form_suffix('ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1')}"
 
             response = self.auth.session.post(
                 "https://i.instagram.com/api/v1/bloks/apps/com.bloks.www.ap.two_step_verification.code_entry/",
@@ -786,6 +791,7 @@ class AlternativeManager:
         except Exception as e:
             return {"success": False, "error": f"Erreur écran code: {str(e)}"}
 
+    @traced("alternative_2fa.submit_code")
     def _submit_alternative_verification_code(self, code: str) -> dict:
         """Soumettre code vérification alternatif"""
         try:
@@ -853,7 +859,7 @@ class AlternativeManager:
                 "x-fb-http-engine": "Tigon/MNS/TCP"
             }
 
-            payload = f"params={urllib.parse.quote(json.dumps(code_params, separators=(',', ':')))}&bk_client_context={urllib.parse.quote(json.dumps({'bloks_version': 'ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1', 'styles_id': 'instagram'}))}&bloks_versioning_id=ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1"
+            payload = f"params={urllib.parse.quote(fast_json.dumps(code_params, separators=(',', ':')))}{bloks_form_suffix('ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1')}"
 
             print("🚀 Verification en Cours... ♻")
 
@@ -907,7 +913,7 @@ class AlternativeManager:
         try:
             if parsed_data is None:
                 try:
-                    parsed_data = json.loads(response_text)
+                    parsed_data = fast_json.loads(response_text)
                 except json.JSONDecodeError:
                     parsed_data = {"raw_text": response_text}
                 except Exception:
@@ -16,21 +16,30 @@ import requests
 from ..utils.license import validate_license
 from ..utils.device import DeviceManager
 from ..utils.encryption import InstagramEncryption
+from ..utils.session_store import JSONSessionStore, SESSION_TTL
+from ..utils.transport import create_session, get_transport_adapter
 from .bloks_2fa import BloksManager
 from .alternative_2fa import AlternativeManager
 from .classic_2fa import ClassicManager
 from .challenge_handler import ChallengeHandler
+from ..utils.tracing import Tracer, span, traced
+from ..utils import fast_json
+from ..utils.payload import bloks_form_suffix
+from ..utils.bloks import find_embedded_json
 
 class InstagramAuth:
     """Gestionnaire d'authentification Instagram complet"""
     
-    def __init__(self):
+    def __init__(self, session_store=None, device_info: dict = None):
         # Validation licence obligatoire
         if not validate_license():
             raise PermissionError("Ce script n'est pas autorisé à utiliser cette bibliothèque. Veuillez contacter le créateur via: 0389561802 ou https://t.me/Kenny5626")
         
-        self.device_manager = DeviceManager()
-        self.session = requests.Session()
+        # Backend de stockage des sessions (fichiers JSON par défaut)
+        self.session_store = session_store or JSONSessionStore()
+        self.device_manager = DeviceManager(device_info)
+        self.session = create_session()
+        self.tracer = Tracer()
         self.session_data = {}
         self.challenge_data = {}
         
@@ -64,8 +73,29 @@ class InstagramAuth:
             "x-fb-server-cluster": "True"
         }
     
+    def enable_tracing(self, exporter):
+        """Tracer la connexion et les flux 2FA/challenge (spans exportés par exporter)"""
+        self.tracer.exporter = exporter
+        adapter = get_transport_adapter(self.session)
+        if adapter is not None and self.tracer.observe_http not in adapter.observers:
+            adapter.observers.append(self.tracer.observe_http)
+    
+    def disable_tracing(self):
+        """Désactiver le traçage"""
+        self.tracer.exporter = None
+        adapter = get_transport_adapter(self.session)
+        if adapter is not None and self.tracer.observe_http in adapter.observers:
+            adapter.observers.remove(self.tracer.observe_http)
+    
     def login(self, username: str, password: str) -> dict:
         """Connexion Instagram avec gestion 2FA complète"""
+        with self.tracer.span("login", {"ig.username": username}) as current:
+            result = self._login(username, password)
+            current.set_status(result.get("success", False), "" if result.get("success") else result.get("message", ""))
+            return result
+    
+    def _login(self, username: str, password: str) -> dict:
+        """Déroulé de la connexion (synchronisation, chiffrement, requête, 2FA)"""
         result = {
             "success": False,
             "message": "",
@@ -94,18 +124,19 @@ class InstagramAuth:
             # Requête de connexion
             payload_data = self._build_login_payload(login_data)
             
-            response = self.session.post(
-                "https://i.instagram.com/api/v1/bloks/async_action/com.bloks.www.bloks.caa.login.async.send_login_request/",
-                headers=headers,
-                data=payload_data,
-                timeout=60
-            )
+            with span("login.send_login_request"):
+                response = self.session.post(
+                    "https://i.instagram.com/api/v1/bloks/async_action/com.bloks.www.bloks.caa.login.async.send_login_request/",
+                    headers=headers,
+                    data=payload_data,
+                    timeout=60
+                )
             
             response_text = InstagramEncryption.safe_decode_response(response)
             
             if response.status_code == 200:
                 try:
-                    response_data = json.loads(response_text)
+                    response_data = fast_json.loads(response_text)
                     
                     # Vérifier les cas spécifiques
                     if self._is_invalid_credentials(response_data):
@@ -189,8 +220,8 @@ class InstagramAuth:
                         else:
                             print("🔍 Réponse login complète (cas inconnu):")
                             try:
-                                response_json = json.loads(response_text)
-                                print(json.dumps(response_json, indent=2))
+                                response_json = fast_json.loads(response_text)
+                                print(fast_json.dumps(response_json, indent=2))
                             except:
                                 print(response_text[:2000] + "..." if len(response_text) > 2000 else response_text)
                             result["message"] = f"Erreur détaillée: {response_data}"
@@ -210,20 +241,14 @@ class InstagramAuth:
         return result
     
     def load_session(self, username: str) -> dict:
-        """Charger session depuis le disque"""
+        """Charger session depuis le stockage de sessions"""
         try:
-            complete_filename = f"sessions/{username}_ig_complete.json"
-            simple_filename = f"sessions/{username}_ig.json"
-            
-            filename = complete_filename if os.path.exists(complete_filename) else simple_filename
+            session_data = self.session_store.load(username)
             
-            if os.path.exists(filename):
-                with open(filename, 'r', encoding='utf-8') as f:
-                    session_data = json.load(f)
-                
+            if session_data:
                 created_at = session_data.get("created_at") or session_data.get("last_login") or session_data.get("session_created", 0)
                 
-                if time.time() - created_at < 7 * 24 * 3600:
+                if time.time() - created_at < SESSION_TTL:
                     self.session_data = session_data
                     
                     cookies = session_data.get("cookies", {})
@@ -239,6 +264,7 @@ class InstagramAuth:
         
         return {}
     
+    @traced("login.sync_pre_login")
     def _sync_pre_login(self) -> bool:
         """Synchronisation pré-connexion"""
         try:
@@ -279,7 +305,7 @@ class InstagramAuth:
         current_time = int(time.time())
         machine_id = self.device_manager.get_x_mid()
         
-        attestation_data = json.dumps({
+        attestation_data = fast_json.dumps({
             "attestation": [{
                 "version": 2,
                 "type": "keystore",
@@ -434,7 +460,7 @@ class InstagramAuth:
     def _build_login_payload(self, login_data: dict) -> str:
         """Construire le payload de connexion"""
         import urllib.parse
-        return f"params={urllib.parse.quote(json.dumps(login_data, separators=(',', ':')))}&bk_client_context={urllib.parse.quote(json.dumps({'bloks_version': 'e061cacfa956f06869fc2b678270bef1583d2480bf51f508321e64cfb5cc12bd', 'styles_id': 'instagram'}))}&bloks_versioning_id=e061cacfa956f06869fc2b678270bef1583d2480bf51f508321e64cfb5cc12bd"
+        return f"params={urllib.parse.quote(fast_json.dumps(login_data, separators=(',', ':')))}{bloks_form_suffix('e061cacfa956f06869fc2b678270bef1583d2480bf51f508321e64cfb5cc12bd')}"
     
     # Méthodes de vérification et extraction
     def _is_invalid_credentials(self, response_data: dict) -> bool:
@@ -496,65 +522,48 @@ class InstagramAuth:
         user_data = {}
         
         try:
-            response_str = json.dumps(response_data) if isinstance(response_data, dict) else str(response_data)
+            # Les 2FA transmettent le texte brut de la réponse, la connexion directe le JSON déjà décodé
+            tree = response_data
+            if isinstance(response_data, str):
+                try:
+                    tree = fast_json.loads(response_data)
+                except json.JSONDecodeError:
+                    pass
             
-            login_response_pattern = r'"login_response\\?"\s*:\s*\\"([^"]*(?:\\\\"[^"]*)*)\\"'
-            login_match = re.search(login_response_pattern, response_str)
+            # login_response: JSON encodé dans le code Bloks, décodé niveau par niveau sans aplatir la réponse
+            login_data = find_embedded_json(tree, "login_response")
             
-            if login_match:
-                login_response_raw = login_match.group(1)
+            if isinstance(login_data, dict) and isinstance(login_data.get("logged_in_user"), dict):
+                logged_user = login_data["logged_in_user"]
                 
-                decoded_response = login_response_raw
-                for _ in range(6):
-                    old_response = decoded_response
-                    decoded_response = decoded_response.replace('\\\\\\\\"', '"')
-                    decoded_response = decoded_response.replace('\\\\\\/', '/')
-                    decoded_response = decoded_response.replace('\\\\"', '"')
-                    decoded_response = decoded_response.replace('\\/', '/')
-                    decoded_response = decoded_response.replace('\\\\', '\\')
-                    if decoded_response == old_response:
-                        break
+                user_data = {
+                    "user_id": str(logged_user.get("pk", "")),
+                    "username": logged_user.get("username", ""),
+                    "full_name": logged_user.get("full_name", ""),
+                    "is_verified": logged_user.get("is_verified", False),
+                    "is_private": logged_user.get("is_private", False),
+                    "profile_pic_url": logged_user.get("profile_pic_url", ""),
+                    "profile_pic_id": logged_user.get("profile_pic_id", ""),
+                    "phone_number": logged_user.get("phone_number", ""),
+                    "country_code": logged_user.get("country_code", ""),
+                    "national_number": logged_user.get("national_number", ""),
+                    "account_type": logged_user.get("account_type", 1),
+                    "fbid_v2": logged_user.get("fbid_v2", ""),
+                    "interop_messaging_user_fbid": logged_user.get("interop_messaging_user_fbid", ""),
+                    "has_anonymous_profile_picture": logged_user.get("has_anonymous_profile_picture", False),
+                    "can_boost_post": logged_user.get("can_boost_post", False),
+                    "can_see_organic_insights": logged_user.get("can_see_organic_insights", False),
+                    "is_business": logged_user.get("is_business", False),
+                    "category": logged_user.get("category"),
+                    "wa_addressable": logged_user.get("wa_addressable", False),
+                    "allow_contacts_sync": logged_user.get("allow_contacts_sync", False),
+                    "has_onboarded_to_text_post_app": logged_user.get("has_onboarded_to_text_post_app", False),
+                    "is_threads_only_user": logged_user.get("is_threads_only_user", False),
+                }
                 
-                try:
-                    login_data = json.loads(decoded_response)
-                    
-                    if "logged_in_user" in login_data:
-                        logged_user = login_data["logged_in_user"]
-                        
-                        user_data = {
-                            "user_id": str(logged_user.get("pk", "")),
-                            "username": logged_user.get("username", ""),
-                            "full_name": logged_user.get("full_name", ""),
-                            "is_verified": logged_user.get("is_verified", False),
-                            "is_private": logged_user.get("is_private", False),
-                            "profile_pic_url": logged_user.get("profile_pic_url", ""),
-                            "profile_pic_id": logged_user.get("profile_pic_id", ""),
-                            "phone_number": logged_user.get("phone_number", ""),
-                            "country_code": logged_user.get("country_code", ""),
-                            "national_number": logged_user.get("national_number", ""),
-                            "account_type": logged_user.get("account_type", 1),
-                            "fbid_v2": logged_user.get("fbid_v2", ""),
-                            "interop_messaging_user_fbid": logged_user.get("interop_messaging_user_fbid", ""),
-                            "has_anonymous_profile_picture": logged_user.get("has_anonymous_profile_picture", False),
-                            "can_boost_post": logged_user.get("can_boost_post", False),
-                            "can_see_organic_insights": logged_user.get("can_see_organic_insights", False),
-                            "is_business": logged_user.get("is_business", False),
-                            "category": logged_user.get("category"),
-                            "wa_addressable": logged_user.get("wa_addressable", False),
-                            "allow_contacts_sync": logged_user.get("allow_contacts_sync", False),
-                            "has_onboarded_to_text_post_app": logged_user.get("has_onboarded_to_text_post_app", False),
-                            "is_threads_only_user": logged_user.get("is_threads_only_user", False),
-                        }
-                        
-                        for key, value in user_data.items():
-                            if isinstance(value, str):
-                                cleaned_value = value.replace('\\\\\\', '').replace('\\"', '"').strip()
-                                user_data[key] = cleaned_value
-                        
-                        return user_data
-                        
-                except json.JSONDecodeError as e:
-                    pass
+                return user_data
+            
+            response_str = fast_json.dumps(response_data) if isinstance(response_data, dict) else str(response_data)
             
             # Fallback patterns
             direct_patterns = {
@@ -595,6 +604,7 @@ class InstagramAuth:
         
         return user_data
     
+    @traced("login.extract_session_data")
     def _extract_session_data_fixed(self, response, user_data: dict) -> dict:
         """Extraire données de session complète"""
         import re
@@ -658,7 +668,7 @@ class InstagramAuth:
                         token_part += "="
                     
                     decoded = base64.b64decode(token_part).decode('utf-8')
-                    auth_json = json.loads(decoded)
+                    auth_json = fast_json.loads(decoded)
                     
                     if "sessionid" in auth_json:
                         session_data["sessionid"] = auth_json["sessionid"]
@@ -680,7 +690,7 @@ class InstagramAuth:
                     "ds_user_id": user_data["user_id"],
                     "sessionid": session_data["sessionid"]
                 }
-                encoded = base64.b64encode(json.dumps(token_data, separators=(',', ':')).encode()).decode()
+                encoded = base64.b64encode(fast_json.dumps(token_data, separators=(',', ':')).encode()).decode()
                 auth_token = f"Bearer IGT:2:{encoded}"
                 session_data["authorization"] = auth_token
             
@@ -737,13 +747,10 @@ class InstagramAuth:
         
         return session_data
     
+    @traced("login.save_session")
     def _save_session_fixed(self, username: str, session_data: dict, user_data: dict):
         """Sauvegarder session complète avec USERNAME"""
         try:
-            os.makedirs("sessions", exist_ok=True)
-            
-            complete_filename = f"sessions/{username}_ig_complete.json"
-            
             if not user_data.get("username"):
                 user_data["username"] = username
             
@@ -832,20 +839,12 @@ class InstagramAuth:
                 instagrapi_session["cookies"]["sessionid"] = session_data["sessionid"]
                 instagrapi_session["cookies"]["ds_user_id"] = user_data.get("user_id", "")
             
-            with open(complete_filename, 'w', encoding='utf-8') as f:
-                json.dump(instagrapi_session, f, indent=2, ensure_ascii=False)
-            
-            # Supprimer l'ancien fichier simple s'il existe
-            simple_filename = f"sessions/{username}_ig.json"
-            if os.path.exists(simple_filename):
-                try:
-                    os.remove(simple_filename)
-                except:
-                    pass
+            self.session_store.save(username, instagrapi_session)
         
         except Exception as e:
             pass
     
+    @traced("login.check_account_status")
     def check_account_status_after_login(self, username: str, password: str, login_response: dict) -> dict:
         """Vérifier le statut du compte après la connexion"""
         try:
@@ -976,7 +975,7 @@ class InstagramAuth:
         import re
         
         try:
-            response_data = json.loads(login_response_text) if login_response_text else {}
+            response_data = fast_json.loads(login_response_text) if login_response_text else {}
             
             extracted_data = {}
             
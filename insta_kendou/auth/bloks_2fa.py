@@ -9,9 +9,12 @@ import json
 import uuid
 import random
 import urllib.parse
-import re
 from ..utils.encryption import InstagramEncryption
 from ..utils.device import get_optimal_encoding_for_environment
+from ..utils.tracing import traced
+from ..utils import fast_json
+from ..utils.payload import bloks_form_suffix
+from ..utils.bloks import BloksScan, scan_bloks
 
 class BloksManager:
     """Gestionnaire du flux Bloks 2FA complet"""
@@ -21,6 +24,7 @@ class BloksManager:
         self.stored_methods_data = {}
         self.challenge_data = {}
 
+    @traced("bloks_2fa.flow")
     def handle_2fa_flow(self, response_text: str) -> dict:
         """Gérer le flux Bloks 2FA complet"""
         try:
@@ -57,6 +61,7 @@ class BloksManager:
         except Exception as e:
             return {"success": False, "error": f"Erreur flux Bloks: {str(e)}"}
 
+    @traced("bloks_2fa.fetch_context")
     def _fetch_bloks_context_data(self, login_response_text: str = "") -> str:
         """Récupérer le context_data via com.bloks.www.caa.ar.uhl.nav.async avec données extraites"""
         try:
@@ -140,7 +145,7 @@ class BloksManager:
                 "x-fb-http-engine": "Tigon/MNS/TCP"
             }
 
-            payload = f"params={urllib.parse.quote(json.dumps(bloks_params, separators=(',', ':')))}&bk_client_context={urllib.parse.quote(json.dumps({'bloks_version': 'ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1', 'styles_id': 'instagram'}))}&bloks_versioning_id=ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1"
+            payload = f"params={urllib.parse.quote(fast_json.dumps(bloks_params, separators=(',', ':')))}{bloks_form_suffix('ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1')}"
 
             response = self.auth.session.post(
                 "https://b.i.instagram.com/api/v1/bloks/async_action/com.bloks.www.caa.ar.uhl.nav.async/",
@@ -162,51 +167,15 @@ class BloksManager:
             print(f"❌ Erreur récupération context_data: {e}")
             return None
 
-    def _extract_bloks_context_data(self, response_text: str) -> str:
-        """Extraire le context_data de la réponse Bloks AVEC PATTERNS AMÉLIORÉS"""
+    def _extract_bloks_context_data(self, response_text: str, scan: BloksScan = None) -> str:
+        """Extraire le context_data de la réponse Bloks AVEC PATTERNS AMÉLIORÉS (scan: analyse déjà faite de response_text)"""
         try:
-
-            # Pattern 1: Chercher directement dans la structure array.Make
-            full_context_pattern = r'([A-Za-z0-9+/=_-]{500,}\|[a-zA-Z]+)'
-            full_matches = re.findall(full_context_pattern, response_text)
-
-            if full_matches:
-                longest_match = max(full_matches, key=len)
-                return longest_match
-
-            # Pattern 2: Chercher spécifiquement dans les structures Bloks
-            bloks_context_patterns = [
-                r'"context_data"[^"]*"([A-Za-z0-9+/=_-]{500,}(?:\|[a-zA-Z]+)?)"',
-                r'context_data[^"]*"([A-Za-z0-9+/=_-]{500,}(?:\|[a-zA-Z]+)?)"',
-                r'"([A-Za-z0-9+/=_-]{500,}\|[a-zA-Z]+)"[^"]*"[^"]*"method_picker'
-            ]
-
-            for pattern in bloks_context_patterns:
-                matches = re.findall(pattern, response_text)
-                if matches:
-                    context_candidate = matches[0]
-                    cleaned = context_candidate.replace('\\/', '/').replace('\\"', '"')
-                    if len(cleaned) > 500:
-                        return cleaned
-
-            # Pattern 3: Recherche dans les array.Make complexes
-            array_make_pattern = r'array\.Make[^"]*"([A-Za-z0-9+/=_-]{500,}(?:\|[a-zA-Z]+)?)"'
-            array_matches = re.findall(array_make_pattern, response_text)
-
-            if array_matches:
-                longest_array = max(array_matches, key=len)
-                if len(longest_array) > 500:
-                    return longest_array
-
-            # Pattern 4: Fallback avec tous les patterns possibles
-            all_long_strings = re.findall(r'([A-Za-z0-9+/=_-]{500,})', response_text)
-
-            if all_long_strings:
-                for candidate in sorted(all_long_strings, key=len, reverse=True):
-                    if len(candidate) > 1000 and candidate.count('+') > 5 and candidate.count('/') > 5:
-                        if not '|' in candidate:
-                            candidate += '|aplrr'
-                        return candidate
+            # Une seule passe sur la réponse: chaînes suffixées, "context_data", array.Make puis plus longue chaîne base64
+            if scan is None:
+                scan = scan_bloks(response_text)
+            context_data = scan.bloks_context_data()
+            if context_data:
+                return context_data
 
             # Fallback ultime
             fallback = "Q-PTBAK49eHoIb0CC4ADtQiudond3EHyEU_fGaEsQpR2hwLz7ppyuG|aplrr"
@@ -217,6 +186,7 @@ class BloksManager:
             print(f"❌ Erreur extraction context_data: {e}")
             return "Q-PTBAK49eHoIb0CC4ADtQiudond3EHyEU_fGaEsQpR2hwLz7ppyuG|aplrr"
 
+    @traced("bloks_2fa.get_methods")
     def _get_bloks_verification_methods(self, context_data: str) -> dict:
         """Récupérer les méthodes de vérification disponibles ET stocker les données"""
         try:
@@ -274,7 +244,7 @@ class BloksManager:
                 "x-fb-http-engine": "Tigon/MNS/TCP"
             }
 
-            payload = f"params={urllib.parse.quote(json.dumps({'server_params': server_params}, separators=(',', ':')))}&bk_client_context={urllib.parse.quote(json.dumps({'bloks_version': 'ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1', 'styles_id': 'instagram'}))}&bloks_versioning_id=ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1"
+            payload = f"params={urllib.parse.quote(fast_json.dumps({'server_params': server_params}, separators=(',', ':')))}{bloks_form_suffix('ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1')}"
 
             url = "https://b.i.instagram.com/api/v1/bloks/apps/com.bloks.www.ap.two_step_verification.challenge_picker/"
 
@@ -299,37 +269,22 @@ class BloksManager:
         except Exception as e:
             return {"error": f"Erreur récupération méthodes: {str(e)}"}
 
-    def _extract_bloks_verification_methods(self, response_text: str) -> list:
+    def _extract_bloks_verification_methods(self, response_text: str, scan: BloksScan = None) -> list:
         """Extraire les méthodes de vérification depuis la réponse Bloks AVEC EXTRACTION DU NOUVEAU CONTEXT_DATA"""
         try:
             methods = []
+            if scan is None:
+                scan = scan_bloks(response_text)
 
             # ÉTAPE 1: Extraire le nouveau context_data AVANT d'extraire les méthodes
-            new_context_data = self._extract_bloks_context_data(response_text)
+            new_context_data = self._extract_bloks_context_data(response_text, scan)
             if new_context_data and len(new_context_data) > 100:
                 self.challenge_data["challenge_context"] = new_context_data
             else:
                 print("⚠️ Impossible d'extraire nouveau context_data, utilisation de l'ancien")
 
-            # ÉTAPE 2: CORRECTION 1: Recherche intelligente des numéros uniques
-            phone_numbers = set()
-
-            # Pattern plus précis pour capturer les vrais numéros
-            phone_patterns = [
-                r'\+261\s+\*+\s+\*+\s+\*+\s+(\d{2})',  # Capture terminaison
-                r'261\s+\*+\s+\*+\s+\*+\s+(\d{2})'     # Sans +
-            ]
-
-            # Extraire seulement les terminaisons uniques
-            endings_found = set()
-            for pattern in phone_patterns:
-                matches = re.findall(pattern, response_text)
-                for ending in matches:
-                    if ending not in endings_found:
-                        endings_found.add(ending)
-                        # Reconstruire le numéro complet
-                        formatted_number = f"+261 ** ** *** {ending}"
-                        phone_numbers.add(formatted_number)
+            # ÉTAPE 2: CORRECTION 1: Numéros uniques (+261 ou 261), relevés avec WhatsApp et emails en une passe
+            phone_numbers = {f"+261 ** ** *** {ending}" for ending in scan.phone_endings("261")}
 
             # Ajouter SMS pour chaque numéro unique
             for phone in sorted(phone_numbers):
@@ -341,14 +296,7 @@ class BloksManager:
                 })
 
             # CORRECTION 2: WhatsApp intelligent (seulement si différent)
-            whatsapp_indicators = [
-                r'"SOWA"',
-                r'"google_oauth_token":\s*"true"',
-                r'WhatsApp'
-            ]
-
-            whatsapp_found = any(re.search(indicator, response_text, re.IGNORECASE)
-                               for indicator in whatsapp_indicators)
+            whatsapp_found = scan.has_whatsapp_indicator()
 
             if whatsapp_found and phone_numbers:
                 # Utiliser tous les numéros trouvés pour WhatsApp
@@ -361,19 +309,13 @@ class BloksManager:
                     })
 
             # CORRECTION 3: Email
-            email_patterns = [
-                r'[a-zA-Z0-9]\*+[a-zA-Z0-9]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-            ]
-
-            for pattern in email_patterns:
-                matches = re.findall(pattern, response_text)
-                for match in matches:
-                    methods.append({
-                        "id": "EMAIL",
-                        "type": "email",
-                        "label": f"Email à {match}",
-                        "value": match
-                    })
+            for match in scan.emails:
+                methods.append({
+                    "id": "EMAIL",
+                    "type": "email",
+                    "label": f"Email à {match}",
+                    "value": match
+                })
 
             return methods
 
@@ -381,6 +323,7 @@ class BloksManager:
             print(f"❌ Erreur extraction méthodes: {e}")
             return []
 
+    @traced("bloks_2fa.select_method")
     def _show_bloks_method_selection(self, methods: list) -> dict:
         """Afficher les méthodes Bloks et demander la sélection"""
         try:
@@ -421,6 +364,7 @@ class BloksManager:
             print(f"❌ Erreur sélection méthode: {e}")
             return None
 
+    @traced("bloks_2fa.submit_method")
     def _submit_bloks_method_choice(self, selected_method: dict, context_data: str) -> dict:
         """ÉTAPE 1: Soumettre le choix de méthode Bloks"""
         try:
@@ -485,7 +429,7 @@ class BloksManager:
                 "x-fb-http-engine": "Tigon/MNS/TCP"
             }
 
-            payload = f"params={urllib.parse.quote(json.dumps(choice_params, separators=(',', ':')))}&bk_client_context={urllib.parse.quote(json.dumps({'bloks_version': 'ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1', 'styles_id': 'instagram'}))}&bloks_versioning_id=ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1"
+            payload = f"params={urllib.parse.quote(fast_json.dumps(choice_params, separators=(',', ':')))}{bloks_form_suffix('ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1')}"
 
             response = self.auth.session.post(
                 "https://i.instagram.com/api/v1/bloks/async_action/com.bloks.www.bloks.ap.two_step_verification.challenge_picker.async/",
@@ -498,7 +442,7 @@ class BloksManager:
 
             if response.status_code == 200:
                 try:
-                    result = json.loads(response_text)
+                    result = fast_json.loads(response_text)
 
                     if result.get("status") == "ok":
                         new_context = self._extract_bloks_context_data(response_text)
@@ -528,6 +472,7 @@ class BloksManager:
             print(f"❌ Erreur étape 1: {e}")
             return {"error": f"Erreur: {str(e)}"}
 
+    @traced("bloks_2fa.fetch_code_entry")
     def _fetch_code_entry_screen_with_debug(self, context_data: str) -> dict:
         """ÉTAPE 2: Charger l'écran de saisie du code"""
         try:
@@ -585,7 +530,7 @@ class BloksManager:
                 "x-fb-http-engine": "Tigon/MNS/TCP"
             }
 
-            payload = f"params={urllib.parse.quote(json.dumps(code_entry_params, separators=(',', ':')))}&bk_client_context={urllib.parse.quote(json.dumps({'bloks_version': 'ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1', 'styles_id': 'instagram'}))}&bloks_versioning_id=ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1"
+            payload = f"params={urllib.parse.quote(fast_json.dumps(code_entry_params, separators=(',', ':')))}{bloks_form_suffix('ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1')}"
 
             response = self.auth.session.post(
                 "https://i.instagram.com/api/v1/bloks/apps/com.bloks.www.ap.two_step_verification.code_entry/",
@@ -598,7 +543,7 @@ class BloksManager:
 
             if response.status_code == 200:
                 try:
-                    result = json.loads(response_text)
+                    result = fast_json.loads(response_text)
 
                     # Extraire le nouveau context_data depuis la réponse
                     final_context = self._extract_bloks_context_data(response_text)
@@ -620,6 +565,7 @@ class BloksManager:
             print(f"❌ Erreur chargement écran code: {e}")
             return {"success": False, "error": f"Erreur: {str(e)}"}
 
+    @traced("bloks_2fa.code_verification")
     def _handle_bloks_code_verification(self, code_context: dict) -> dict:
         """Gérer la vérification du code Bloks AVEC GESTION COMPLÈTE DU FLUX"""
         try:
@@ -672,6 +618,7 @@ class BloksManager:
         except Exception as e:
             return {"success": False, "error": f"Erreur vérification code: {str(e)}"}
 
+    @traced("bloks_2fa.submit_code")
     def _submit_bloks_verification_code_style_bien(self, code: str) -> dict:
         """Soumettre le code de vérification Bloks EXACTEMENT comme l'exemple fourni"""
         try:
@@ -744,7 +691,7 @@ class BloksManager:
             }
 
             # PAYLOAD EXACT comme votre exemple
-            payload = f"params={urllib.parse.quote(json.dumps(code_params, separators=(',', ':')))}&bk_client_context={urllib.parse.quote(json.dumps({'bloks_version': 'ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1', 'styles_id': 'instagram'}))}&bloks_versioning_id=ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1"
+            payload = f"params={urllib.parse.quote(fast_json.dumps(code_params, separators=(',', ':')))}{bloks_form_suffix('ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1')}"
             print("🚀 Verification en Cours... ♻")
 
             # REQUÊTE EXACTE comme votre exemple
@@ -794,6 +741,7 @@ class BloksManager:
         except Exception as e:
             return {"success": False, "error": f"Erreur code: {str(e)}"}
 
+    @traced("bloks_2fa.change_method")
     def _handle_method_change_from_code_entry(self) -> dict:
         """NOUVELLE FONCTION: Gérer le changement de méthode depuis l'écran de code"""
         try:
@@ -824,14 +772,15 @@ class BloksManager:
 
             if response.status_code == 200:
                 try:
-                    result = json.loads(response_text)
+                    result = fast_json.loads(response_text)
 
                     # Extraire les méthodes depuis la réponse
-                    methods = self._extract_bloks_verification_methods(response_text)
+                    scan = scan_bloks(response_text)
+                    methods = self._extract_bloks_verification_methods(response_text, scan)
 
                     if methods:
                         # Mettre à jour le context_data si nécessaire
-                        new_context_data = self._extract_bloks_context_data(response_text)
+                        new_context_data = self._extract_bloks_context_data(response_text, scan)
                         if new_context_data and len(new_context_data) > 100:
                             self.challenge_data["challenge_context"] = new_context_data
 
@@ -894,6 +843,7 @@ class BloksManager:
             print(f"❌ Erreur changement méthode: {e}")
             return {"success": False, "error": f"Erreur changement: {str(e)}"}
 
+    @traced("bloks_2fa.code_input")
     def _handle_bloks_code_input(self) -> dict:
         """Gérer la saisie et vérification du code Bloks"""
         try:
@@ -945,7 +895,7 @@ class BloksManager:
         try:
             if parsed_data is None:
                 try:
-                    parsed_data = json.loads(response_text)
+                    parsed_data = fast_json.loads(response_text)
                 except json.JSONDecodeError:
                     parsed_data = {"raw_text": response_text}
                 except Exception:
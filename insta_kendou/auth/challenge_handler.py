@@ -12,6 +12,8 @@ import urllib.parse
 import re
 from ..utils.encryption import InstagramEncryption
 from ..utils.device import get_optimal_encoding_for_environment
+from ..utils.tracing import traced
+from ..utils import fast_json
 
 class ChallengeHandler:
     """Gestionnaire des challenges et checkpoints Instagram"""
@@ -20,6 +22,7 @@ class ChallengeHandler:
         self.auth = auth_instance
         self.challenge_data = {}
     
+    @traced("challenge.flow")
     def handle_challenge_flow(self, challenge_data: dict) -> dict:
         """Gérer le flux de challenge complet"""
         try:
@@ -61,6 +64,7 @@ class ChallengeHandler:
         except Exception:
             return "generic"
     
+    @traced("challenge.select_method")
     def _handle_verify_method_selection(self, step_data: dict) -> dict:
         """Gérer la sélection de méthode de vérification avec gestion des méthodes temporairement indisponibles"""
         try:
@@ -174,6 +178,7 @@ class ChallengeHandler:
             print(f"❌ Erreur sélection méthode: {e}")
             return {"success": False, "error": f"Erreur sélection méthode: {str(e)}"}
     
+    @traced("challenge.submit_method")
     def _submit_verify_method_choice_modern(self, choice_value: str) -> dict:
         """Soumettre le choix de méthode avec gestion complète des retours"""
         try:
@@ -236,7 +241,7 @@ class ChallengeHandler:
             response_text = InstagramEncryption.safe_decode_response(response)
             
             try:
-                result = json.loads(response_text)
+                result = fast_json.loads(response_text)
                 
                 if response.status_code == 200:
                     # Vérifier le status de la réponse
@@ -275,6 +280,7 @@ class ChallengeHandler:
             print(f"❌ Erreur soumission choix: {e}")
             return {"success": False, "error": f"Erreur soumission choix: {str(e)}"}
     
+    @traced("challenge.code_verification")
     def _handle_code_verification(self, step_data: dict) -> dict:
         """Gérer la vérification de code directe"""
         try:
@@ -305,6 +311,7 @@ class ChallengeHandler:
         except Exception as e:
             return {"success": False, "error": f"Erreur vérification code: {str(e)}"}
     
+    @traced("challenge.generic")
     def _handle_generic_challenge(self, challenge_data: dict) -> dict:
         """Gérer un challenge générique avec analyse améliorée"""
         try:
@@ -366,6 +373,7 @@ class ChallengeHandler:
         except Exception as e:
             return {"success": False, "error": f"Erreur challenge générique: {str(e)}"}
     
+    @traced("challenge.request_code")
     def _request_verification_code_modern(self, retry_count: int = 0) -> dict:
         """Demander le code avec validation du nombre de chiffres"""
         try:
@@ -438,6 +446,7 @@ class ChallengeHandler:
         except Exception as e:
             return {"success": False, "error": f"Erreur demande code: {str(e)}"}
     
+    @traced("challenge.submit_code")
     def _submit_verification_code_modern(self, code: str, retry_count: int = 0) -> dict:
         """ÉTAPE 3: Soumettre le code avec format moderne"""
         try:
@@ -507,7 +516,7 @@ class ChallengeHandler:
             
             if response.status_code == 200:
                 try:
-                    result = json.loads(response_text)
+                    result = fast_json.loads(response_text)
                     
                     if result.get("status") == "ok":
                         # Vérifier si c'est vraiment un succès ou un code incorrect
@@ -597,6 +606,7 @@ class ChallengeHandler:
         except Exception:
             return False
     
+    @traced("challenge.rewind")
     def _rewind_to_method_selection(self) -> dict:
         """Revenir à la sélection de méthodes de vérification"""
         try:
@@ -610,7 +620,7 @@ class ChallengeHandler:
             current_timestamp = time.time()
             
             post_data = {
-                "bk_client_context": urllib.parse.quote(json.dumps({
+                "bk_client_context": urllib.parse.quote(fast_json.dumps({
                     "bloks_version": "ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1",
                     "styles_id": "instagram"
                 })),
@@ -673,7 +683,7 @@ class ChallengeHandler:
                 response_text = InstagramEncryption.safe_decode_response(response)
                 
                 try:
-                    result = json.loads(response_text)
+                    result = fast_json.loads(response_text)
                     print("✅ Retour à la sélection de méthodes réussi")
                     
                     # Extraire les nouvelles méthodes disponibles
@@ -700,7 +710,7 @@ class ChallengeHandler:
         """Extraire les méthodes de vérification depuis la réponse Bloks"""
         try:
             methods = []
-            response_str = json.dumps(bloks_response)
+            response_str = fast_json.dumps(bloks_response)
             
             # Sets pour éviter les doublons
             phone_numbers = set()
@@ -826,7 +836,7 @@ class ChallengeHandler:
         try:
             if parsed_data is None:
                 try:
-                    parsed_data = json.loads(response_text)
+                    parsed_data = fast_json.loads(response_text)
                 except json.JSONDecodeError:
                     parsed_data = {"raw_text": response_text}
                 except Exception:
@@ -895,6 +905,7 @@ class ChallengeHandler:
             print(f"❌ Erreur vérification 2FA: {str(e)}")
             return {"success": False, "error": f"Erreur vérification 2FA: {str(e)}"}
     
+    @traced("challenge.solve_general")
     def solve_general_challenge(self, challenge_data: dict) -> bool:
         """Tenter de résoudre un challenge général automatiquement"""
         try:
@@ -916,7 +927,7 @@ class ChallengeHandler:
             challenge_payload = {
                 "_uuid": self.auth.device_manager.device_info['device_uuid'],
                 "has_follow_up_screens": "0",
-                "bk_client_context": json.dumps({
+                "bk_client_context": fast_json.dumps({
                     "bloks_version": "e061cacfa956f06869fc2b678270bef1583d2480bf51f508321e64cfb5cc12bd",
                     "styles_id": "instagram"
                 }),
@@ -1058,7 +1069,7 @@ class ChallengeHandler:
                 "sessionid": sessionid
             }
             
-            encoded = base64.b64encode(json.dumps(token_data, separators=(',', ':')).encode()).decode()
+            encoded = base64.b64encode(fast_json.dumps(token_data, separators=(',', ':')).encode()).decode()
             constructed_token = f"Bearer IGT:2:{encoded}"
             
             self.auth.session_data["authorization"] = constructed_token
@@ -1072,7 +1083,7 @@ class ChallengeHandler:
             "ds_user_id": user_id,
             "sessionid": basic_sessionid
         }
-        encoded = base64.b64encode(json.dumps(token_data, separators=(',', ':')).encode()).decode()
+        encoded = base64.b64encode(fast_json.dumps(token_data, separators=(',', ':')).encode()).decode()
         return f"Bearer IGT:2:{encoded}"
     
     def _generate_www_claim(self) -> str:
@@ -12,6 +12,9 @@ import urllib.parse
 import re
 from ..utils.encryption import InstagramEncryption
 from ..utils.device import get_optimal_encoding_for_environment
+from ..utils.tracing import span, traced
+from ..utils.deadline import deadline_sleep
+from ..utils import fast_json
 
 class ClassicManager:
     """Gestionnaire du flux 2FA classique complet"""
@@ -20,6 +23,7 @@ class ClassicManager:
         self.auth = auth_instance
         self.challenge_data = {}
 
+    @traced("classic_2fa.flow")
     def handle_2fa_flow(self, response_text: str) -> dict:
         """Gérer le 2FA avec gestion améliorée des cas edge"""
         try:
@@ -146,6 +150,7 @@ class ClassicManager:
             print(f"❌ Erreur extraction: {e}")
             return None, None, None, None
 
+    @traced("classic_2fa.get_challenge_data")
     def get_challenge_data(self, challenge_url: str) -> dict:
         """Récupérer données de challenge avec DÉCODAGE UNIFIÉ pour tous les environnements"""
         try:
@@ -227,7 +232,8 @@ class ClassicManager:
             }
 
             # ATTENDRE 2-3 SECONDES avant la requête
-            time.sleep(2)
+            with span("classic_2fa.pre_request_delay"):
+                deadline_sleep(2)
 
             print("📡 Récupération données challenge...")
 
@@ -295,6 +301,7 @@ class ClassicManager:
             traceback.print_exc()
             return {"error": str(e)}
 
+    @traced("classic_2fa.challenge_post")
     def _try_challenge_post_method(self, api_url: str, params: dict, headers: dict, challenge_path: str) -> dict:
         """Méthode alternative avec POST si GET échoue"""
         try:
@@ -317,7 +324,7 @@ class ClassicManager:
             print(response_text)
 
             try:
-                response_json = json.loads(response_text)
+                response_json = fast_json.loads(response_text)
 
                 if response.status_code == 200:
                     step_name = response_json.get("step_name", "unknown")
@@ -340,6 +347,7 @@ class ClassicManager:
         except Exception as e:
             return {"error": f"Erreur POST: {str(e)}"}
 
+    @traced("classic_2fa.select_method")
     def handle_verify_method_selection_modern(self, step_data: dict) -> dict:
         """Gérer la sélection de méthode avec données extraites réelles"""
         try:
@@ -455,6 +463,7 @@ class ClassicManager:
             print(f"❌ Erreur sélection méthode: {e}")
             return {"success": False, "error": f"Erreur sélection méthode: {str(e)}"}
 
+    @traced("classic_2fa.submit_method")
     def submit_verify_method_choice_modern(self, choice_value: str) -> dict:
         """Soumettre le choix de méthode avec logs complets"""
         try:
@@ -513,7 +522,7 @@ class ClassicManager:
             # Décoder et analyser la réponse
             response_text = InstagramEncryption.safe_decode_response(response)
             try:
-                result = json.loads(response_text)
+                result = fast_json.loads(response_text)
 
                 if response.status_code == 200:
                     # Vérifier le status de la réponse
@@ -552,6 +561,7 @@ class ClassicManager:
             print(f"❌ Erreur soumission choix: {e}")
             return {"success": False, "error": f"Erreur soumission choix: {str(e)}"}
 
+    @traced("classic_2fa.code_verification")
     def handle_code_verification_modern(self, step_data: dict) -> dict:
         """Gérer la vérification de code (format moderne)"""
         try:
@@ -571,6 +581,7 @@ class ClassicManager:
         except Exception as e:
             return {"success": False, "error": f"Erreur vérification code: {str(e)}"}
 
+    @traced("classic_2fa.request_code")
     def request_verification_code_modern(self, retry_count: int = 0) -> dict:
         """Demander le code avec validation du nombre de chiffres"""
         try:
@@ -643,6 +654,7 @@ class ClassicManager:
         except Exception as e:
             return {"success": False, "error": f"Erreur demande code: {str(e)}"}
 
+    @traced("classic_2fa.submit_code")
     def submit_verification_code_modern(self, code: str, retry_count: int = 0) -> dict:
         """ÉTAPE 3: Soumettre le code avec debug complet et nouveau format"""
         try:
@@ -712,7 +724,7 @@ class ClassicManager:
 
             if response.status_code == 200:
                 try:
-                    result = json.loads(response_text)
+                    result = fast_json.loads(response_text)
 
                     if result.get("status") == "ok":
                         # Vérifier si c'est vraiment un succès ou un code incorrect
@@ -810,6 +822,7 @@ class ClassicManager:
         except Exception:
             return False
 
+    @traced("classic_2fa.generic_fallback")
     def handle_generic_challenge_fallback(self) -> dict:
         """Fallback pour challenge générique sans sélection de méthodes"""
         try:
@@ -823,6 +836,7 @@ class ClassicManager:
         except Exception as e:
             return {"success": False, "error": f"Erreur challenge générique: {str(e)}"}
 
+    @traced("classic_2fa.rewind")
     def rewind_to_method_selection(self) -> dict:
         """Revenir à la sélection de méthodes de vérification"""
         try:
@@ -836,7 +850,7 @@ class ClassicManager:
             current_timestamp = time.time()
 
             post_data = {
-                "bk_client_context": urllib.parse.quote(json.dumps({
+                "bk_client_context": urllib.parse.quote(fast_json.dumps({
                     "bloks_version": "ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1",
                     "styles_id": "instagram"
                 })),
@@ -899,7 +913,7 @@ class ClassicManager:
                 response_text = InstagramEncryption.safe_decode_response(response)
 
                 try:
-                    result = json.loads(response_text)
+                    result = fast_json.loads(response_text)
                     print("✅ Retour à la sélection de méthodes réussi")
 
                     # Extraire les nouvelles méthodes disponibles
@@ -927,7 +941,7 @@ class ClassicManager:
         """Extraire les méthodes de vérification RÉELLES depuis la réponse Bloks sans doublons"""
         try:
             methods = []
-            response_str = json.dumps(bloks_response)
+            response_str = fast_json.dumps(bloks_response)
 
             # Sets pour éviter les doublons
             phone_numbers = set()
@@ -1056,7 +1070,7 @@ class ClassicManager:
         try:
             if parsed_data is None:
                 try:
-                    parsed_data = json.loads(response_text)
+                    parsed_data = fast_json.loads(response_text)
                 except json.JSONDecodeError:
                     parsed_data = {"raw_text": response_text}
                 except Exception:
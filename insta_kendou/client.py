@@ -6,26 +6,40 @@ Classe InstagramClient avec toutes les fonctionnalités complètes et headers ex
 
 import os
 import time
-import json
 import uuid
 import random
 import urllib.parse
 import re
 import base64
+import requests
+import threading
+import functools
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from types import MappingProxyType
 from datetime import datetime
 from .auth import InstagramAuth
-from .utils import DeviceManager, InstagramEncryption, MediaProcessor, URLResolver, validate_license
+from .utils import AdaptiveTimeoutPolicy, DeviceManager, SessionCircuitBreaker, InstagramEncryption, JSONLSpanExporter, MediaProcessor, MetricsRegistry, PreparedMediaCache, ResponseCache, RetryPolicy, ServerAwareThrottle, UploadStream, URLResolver, accepts_deadline, deadline_sleep, fast_json, get_transport_adapter, list_sessions, validate_license
+from .utils.payload import FIELD, SignedBodyTemplate
 from .exceptions import *
 
 class InstagramAPI:
     """API Instagram pour extraire media ID et user ID (intégrée au client) - CORRIGÉE"""
     
-    def __init__(self, session, device_info: dict, user_id: str = None, auth_token: str = None):
+    def __init__(self, session, device_info: dict, user_id: str = None, auth_token: str = None, response_cache=None):
         self.session = session
         self.device_info = device_info
         self.user_id = user_id
         self.auth_token = auth_token
-        self.url_resolver = URLResolver()
+        self.response_cache = response_cache
+        self._url_resolver = None
+    
+    @property
+    def url_resolver(self) -> URLResolver:
+        """Résolveur d'URLs créé à la première utilisation"""
+        if self._url_resolver is None:
+            self._url_resolver = URLResolver()
+        return self._url_resolver
     
     def shortcode_to_media_id(self, shortcode: str) -> str:
         """Convertir shortcode Instagram en media ID (algorithme exact)"""
@@ -46,13 +60,20 @@ class InstagramAPI:
             if match:
                 username = match.group(1).replace('@', '').strip()
                 
+                if self.response_cache is not None:
+                    cached_id = self.response_cache.get("user_lookup", username.lower())
+                    if cached_id:
+                        return cached_id
+                
                 # ÉTAPE 1: Tenter extraction directe via recherche API
                 user_id = self._direct_username_to_user_id(username)
-                if user_id:
-                    return user_id
                 
                 # ÉTAPE 2: Si échec, recherche similaire via API seulement
-                user_id = self._search_similar_username_api_only(username)
+                if not user_id:
+                    user_id = self._search_similar_username_api_only(username)
+                
+                if user_id and self.response_cache is not None:
+                    self.response_cache.put("user_lookup", username.lower(), user_id)
                 return user_id  # Peut être None si pas trouvé
             
             return None
@@ -162,6 +183,11 @@ class InstagramAPI:
     def get_user_info(self, user_id: str) -> dict:
         """Récupérer informations d'un utilisateur"""
         try:
+            if self.response_cache is not None:
+                cached = self.response_cache.get("user_info", user_id)
+                if cached is not None:
+                    return cached
+            
             headers = {
                 "user-agent": self.device_info['user_agent'],
                 "x-ig-app-id": "567067343352427",
@@ -180,7 +206,10 @@ class InstagramAPI:
             if response.status_code == 200:
                 data = response.json()
                 if data.get("status") == "ok":
-                    return data.get("user", {})
+                    user = data.get("user", {})
+                    if user and self.response_cache is not None:
+                        self.response_cache.put("user_info", user_id, user)
+                    return user
             
             return {}
             
@@ -245,17 +274,122 @@ class InstagramAPI:
         except Exception as e:
             return []
 
+# Hôtes de l'API privée (les uploads rupload passent aussi par i.instagram.com)
+WARM_UP_HOSTS = ("https://i.instagram.com", "https://b.i.instagram.com")
+
+# Corps des configure (story / post): fragments constants sérialisés une fois
+_STORY_CONFIGURE_BODY = SignedBodyTemplate({
+    "supported_capabilities_new": '[{"name":"SUPPORTED_SDK_VERSIONS","value":"149.0,150.0,151.0,152.0,153.0,154.0,155.0,156.0,157.0,158.0,159.0,160.0,161.0,162.0,163.0,164.0,165.0,166.0,167.0,168.0,169.0,170.0,171.0,172.0,173.0,174.0,175.0,176.0,177.0,178.0,179.0,180.0,181.0,182.0,183.0,184.0,185.0,186.0,187.0,188.0,189.0,190.0,191.0,192.0,193.0,194.0,195.0,196.0,197.0,198.0,199.0,200.0,201.0,202.0"},{"name":"SUPPORTED_BETA_SDK_VERSIONS","value":"182.0-beta,183.0-beta,184.0-beta,185.0-beta,186.0-beta,187.0-beta,188.0-beta,189.0-beta,190.0-beta,191.0-beta,192.0-beta,193.0-beta,194.0-beta,195.0-beta,196.0-beta,197.0-beta,198.0-beta,199.0-beta,200.0-beta,201.0-beta,202.0-beta"},{"name":"FACE_TRACKER_VERSION","value":"14"},{"name":"segmentation","value":"segmentation_enabled"},{"name":"COMPRESSION","value":"ETC2_COMPRESSION"},{"name":"gyroscope","value":"gyroscope_enabled"}]',
+    "allow_multi_configures": "1",
+    "has_camera_metadata": "0",
+    "camera_entry_point": "11",
+    "original_media_type": "1",
+    "camera_session_id": FIELD,
+    "original_height": FIELD,
+    "include_e2ee_mentioned_user_list": "1",
+    "hide_from_profile_grid": "false",
+    "scene_capture_type": "",
+    "timezone_offset": FIELD,
+    "client_shared_at": FIELD,
+    "media_folder": "Screenshots",
+    "configure_mode": "1",
+    "source_type": "4",
+    "camera_position": "unknown",
+    "_uid": FIELD,
+    "device_id": FIELD,
+    "composition_id": FIELD,
+    "_uuid": FIELD,
+    "creation_tool_info": "[]",
+    "creation_surface": "camera",
+    "nav_chain": FIELD,
+    "imported_taken_at": FIELD,
+    "capture_type": "normal",
+    "audience": "default",
+    "upload_id": FIELD,
+    "client_timestamp": FIELD,
+    "bottom_camera_dial_selected": "2",
+    "publish_id": "1",
+    "original_width": FIELD,
+    "media_transformation_info": FIELD,
+    "edits": FIELD,
+    "extra": FIELD,
+    "device": FIELD
+})
+
+_POST_CONFIGURE_BODY = SignedBodyTemplate({
+    "app_attribution_android_namespace": "",
+    "camera_entry_point": "360",
+    "camera_session_id": FIELD,
+    "original_height": FIELD,
+    "include_e2ee_mentioned_user_list": "1",
+    "hide_from_profile_grid": "false",
+    "scene_capture_type": "",
+    "timezone_offset": FIELD,
+    "source_type": "4",
+    "_uid": FIELD,
+    "device_id": FIELD,
+    "_uuid": FIELD,
+    "creation_tool_info": "[]",
+    "creation_logger_session_id": FIELD,
+    "nav_chain": FIELD,
+    "caption": FIELD,
+    "audience": "default",
+    "upload_id": FIELD,
+    "bottom_camera_dial_selected": "11",
+    "publish_id": "1",
+    "original_width": FIELD,
+    "edits": FIELD,
+    "extra": FIELD,
+    "device": FIELD,
+    "overlay_data": []
+})
+
+def session_guard(func):
+    """Décorateur: échouer immédiatement (exception typée) si le disjoncteur de session est ouvert"""
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        self._ensure_session_valid()
+        return func(self, *args, **kwargs)
+    return wrapper
+
 class InstagramClient:
-    """Client Instagram complet avec toutes les fonctionnalités"""
-    
-    def __init__(self, session_data: dict = None):
+    """Client Instagram complet avec toutes les fonctionnalités
+    
+    Concurrence: une instance connectée peut être partagée entre threads pour les
+    lectures (get_media_info, get_user_info, get_media_comments, get_followers...).
+    Les headers de session sont un instantané immuable, le cookie jar est verrouillé
+    et le rafraîchissement du MID est sérialisé. login, load_session, dump_session et
+    toute modification de session_data doivent être faits par un seul thread, sans
+    lecture en cours; après une modification en place de session_data, appeler
+    invalidate_header_snapshot().
+    """
+    
+    def __init__(self, session_data: dict = None, session_store=None, device_info: dict = None, warm_up: bool = False):
         # Validation licence obligatoire
         if not validate_license():
             raise LicenseError("Ce script n'est pas autorisé à utiliser cette bibliothèque. Veuillez contacter le créateur via: 0389561802 ou https://t.me/Kenny5626")
         
-        self.auth = InstagramAuth()
+        self.auth = InstagramAuth(session_store, device_info)
         self.session_data = session_data or {}
         self.api = None
+        self.media_cache = None
+        self.response_cache = None
+        self.metrics = None
+        self.throttle = None
+        self.timeout_policy = None
+        self._background_executor = None
+        self._pipeline_executor = None
+        self._background_tasks = []
+        self._header_lock = threading.Lock()
+        self._header_snapshot = None
+        self.auto_warm_up = warm_up
+        
+        # Disjoncteur: login_required / suspendu / désactivé => échec local immédiat
+        self.session_breaker = SessionCircuitBreaker()
+        adapter = get_transport_adapter(self.auth.session)
+        if adapter is not None:
+            adapter.before_send.insert(0, self.session_breaker.before_send)
+            adapter.observers.append(self.session_breaker.observe)
         
         if session_data:
             self.auth.session_data = session_data
@@ -270,10 +404,25 @@ class InstagramClient:
             user_id = user_data.get("user_id", "") or session_data.get("account_id", "")
             
             if user_id:
-                self.api = InstagramAPI(self.auth.session, self.auth.device_manager.device_info, user_id, auth_token)
+                self.api = InstagramAPI(self.auth.session, self.auth.device_manager.device_info, user_id, auth_token, self.response_cache)
+            
+            if warm_up:
+                self.warm_up_connections()
     
+    @classmethod
+    def from_memory(cls, session_data: dict, device_info: dict, session_store=None,
+                    warm_up: bool = False) -> "InstagramClient":
+        """Construire un client depuis une session et des infos device en mémoire
+        
+        Aucun accès disque, sous-processus ou réseau pendant la construction
+        (warm_up=True ouvre ensuite les connexions en arrière-plan).
+        """
+        return cls(session_data, session_store=session_store, device_info=device_info, warm_up=warm_up)
+    
+    @accepts_deadline
     def login(self, username: str, password: str) -> dict:
         """Connexion Instagram avec gestion 2FA complète"""
+        self.session_breaker.reset()
         return self.auth.login(username, password)
     
     def load_session(self, username: str) -> dict:
@@ -281,6 +430,7 @@ class InstagramClient:
         session_data = self.auth.load_session(username)
         if session_data:
             self.session_data = session_data
+            self.session_breaker.reset()
             
             # Initialiser API avec session chargée
             user_data = session_data.get("user_data", {}) or session_data.get("logged_in_user", {})
@@ -288,7 +438,10 @@ class InstagramClient:
             user_id = user_data.get("user_id", "") or session_data.get("account_id", "")
             
             if user_id:
-                self.api = InstagramAPI(self.auth.session, self.auth.device_manager.device_info, user_id, auth_token)
+                self.api = InstagramAPI(self.auth.session, self.auth.device_manager.device_info, user_id, auth_token, self.response_cache)
+            
+            if self.auto_warm_up:
+                self.warm_up_connections()
         
         return session_data
     
@@ -307,6 +460,222 @@ class InstagramClient:
         
         return {}
     
+    def _ensure_session_valid(self):
+        """Lever LoginRequiredError / AccountSuspendedError / AccountDisabledError si la session est invalidée"""
+        if self.session_breaker.reason is not None:
+            self.session_breaker.username = self._get_username_from_session()
+            self.session_breaker.check()
+    
+    def get_session_state(self) -> dict:
+        """État du disjoncteur de session (open, reason, opened_at, rejected)"""
+        return self.session_breaker.get_state()
+    
+    def list_sessions(self) -> list:
+        """Lister les comptes sauvegardés dans le stockage de sessions (index uniquement)"""
+        return list_sessions(self.auth.session_store)
+    
+    def enable_response_cache(self, ttl: float = 60, max_entries: int = 512, disk_dir: str = None) -> ResponseCache:
+        """Activer le cache des réponses d'information (infos utilisateur/média), invalidé par les actions du client"""
+        self.response_cache = ResponseCache(ttl=ttl, max_entries=max_entries, disk_dir=disk_dir,
+                                            ttl_overrides={"user_lookup": 3600})
+        if self.api:
+            self.api.response_cache = self.response_cache
+        return self.response_cache
+    
+    def get_response_cache_stats(self) -> dict:
+        """Taux de succès du cache de réponses par endpoint"""
+        return self.response_cache.get_stats() if self.response_cache else {}
+    
+    def _invalidate_cached(self, endpoint: str, key: str = None):
+        """Invalider une entrée du cache de réponses après une action qui modifie l'objet"""
+        if self.response_cache is not None:
+            self.response_cache.invalidate(endpoint, key)
+    
+    def enable_tracing(self, path: str = "traces/login.jsonl", exporter=None):
+        """Tracer connexion, 2FA et challenges en spans JSONL (format OTLP/JSON)
+        
+        exporter remplace l'export fichier (ex: InMemorySpanExporter).
+        """
+        exporter = exporter or JSONLSpanExporter(path)
+        self.auth.enable_tracing(exporter)
+        return exporter
+    
+    def disable_tracing(self):
+        """Désactiver le traçage"""
+        self.auth.disable_tracing()
+    
+    def enable_metrics(self, registry: MetricsRegistry = None) -> MetricsRegistry:
+        """Mesurer les requêtes HTTP par endpoint (compteurs, codes, octets, latences)
+        
+        Un même registre peut être partagé entre plusieurs clients.
+        """
+        self.disable_metrics()
+        self.metrics = registry or MetricsRegistry()
+        adapter = get_transport_adapter(self.auth.session)
+        if adapter is not None:
+            adapter.observers.append(self.metrics.observe)
+        return self.metrics
+    
+    def disable_metrics(self):
+        """Arrêter la collecte des métriques (aucun coût par requête une fois désactivée)"""
+        if self.metrics is None:
+            return
+        adapter = get_transport_adapter(self.auth.session)
+        if adapter is not None and self.metrics.observe in adapter.observers:
+            adapter.observers.remove(self.metrics.observe)
+        self.metrics = None
+    
+    def get_metrics(self, format: str = "json"):
+        """Métriques collectées: dict ("json") ou texte Prometheus ("prometheus")"""
+        if self.metrics is None:
+            return "" if format == "prometheus" else {}
+        if format == "prometheus":
+            return self.metrics.to_prometheus()
+        return self.metrics.snapshot()
+    
+    def enable_throttle(self, rates: dict = None, max_wait: float = None) -> ServerAwareThrottle:
+        """Limiter le débit par famille d'endpoints (likes, follows, commentaires, uploads, lectures)
+        
+        Le débit baisse automatiquement sur 429, Retry-After et feedback_required de limitation:
+        les appels suivants attendent la fin de la pause (ou lèvent RateLimitError au-delà de max_wait).
+        rates: {famille: (jetons par seconde, capacité)} pour remplacer les valeurs par défaut.
+        """
+        self.disable_throttle()
+        self.throttle = ServerAwareThrottle(rates=rates, max_wait=max_wait)
+        adapter = get_transport_adapter(self.auth.session)
+        if adapter is not None:
+            adapter.before_send.append(self.throttle.before_send)
+            adapter.observers.append(self.throttle.observe)
+        return self.throttle
+    
+    def disable_throttle(self):
+        """Retirer le limiteur de débit"""
+        if self.throttle is None:
+            return
+        adapter = get_transport_adapter(self.auth.session)
+        if adapter is not None:
+            if self.throttle.before_send in adapter.before_send:
+                adapter.before_send.remove(self.throttle.before_send)
+            if self.throttle.observe in adapter.observers:
+                adapter.observers.remove(self.throttle.observe)
+        self.throttle = None
+    
+    def get_throttle_state(self) -> dict:
+        """Budget courant par famille: jetons, débit, cool-down restant, pénalités"""
+        return self.throttle.get_state() if self.throttle else {}
+    
+    def configure_read_retries(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                               max_total: float = 20.0) -> RetryPolicy:
+        """Régler les nouvelles tentatives des lectures (GET) sur erreurs réseau et 502/503/504
+        
+        Activées par défaut (3 tentatives, backoff exponentiel à gigue complète, 20s au total).
+        """
+        policy = RetryPolicy(max_attempts=max_attempts, base_delay=base_delay, max_delay=max_delay, max_total=max_total)
+        adapter = get_transport_adapter(self.auth.session)
+        if adapter is not None:
+            adapter.retry_policy = policy
+        return policy
+    
+    def disable_read_retries(self):
+        """Une seule tentative par lecture (comportement historique)"""
+        adapter = get_transport_adapter(self.auth.session)
+        if adapter is not None:
+            adapter.retry_policy = None
+    
+    def enable_adaptive_timeouts(self, k: float = 3.0, read_floor: float = 2.0, connect_timeout: float = None,
+                                 min_samples: int = 20, overrides: dict = None) -> AdaptiveTimeoutPolicy:
+        """Adapter le timeout de lecture de chaque endpoint à ses latences observées (p99 x k)
+        
+        Les timeouts codés (10s, 30s, 60s, 120s) deviennent des plafonds; timeout_override()
+        et overrides ({"GET /api/v{id}/users/{id}/info/": 5}) restent prioritaires.
+        connect_timeout fixe le timeout de connexion (None: celui de l'appel).
+        """
+        self.disable_adaptive_timeouts()
+        self.timeout_policy = AdaptiveTimeoutPolicy(k=k, read_floor=read_floor, connect_timeout=connect_timeout,
+                                                    min_samples=min_samples, overrides=overrides)
+        adapter = get_transport_adapter(self.auth.session)
+        if adapter is not None:
+            adapter.before_send.append(self.timeout_policy.before_send)
+            adapter.observers.append(self.timeout_policy.observe)
+        return self.timeout_policy
+    
+    def disable_adaptive_timeouts(self):
+        """Revenir aux timeouts codés"""
+        if self.timeout_policy is None:
+            return
+        adapter = get_transport_adapter(self.auth.session)
+        if adapter is not None:
+            if self.timeout_policy.before_send in adapter.before_send:
+                adapter.before_send.remove(self.timeout_policy.before_send)
+            if self.timeout_policy.observe in adapter.observers:
+                adapter.observers.remove(self.timeout_policy.observe)
+        self.timeout_policy = None
+    
+    def get_timeout_state(self) -> dict:
+        """Latence p99 observée et timeout de lecture adaptatif par endpoint"""
+        return self.timeout_policy.get_state() if self.timeout_policy else {}
+    
+    def enable_media_cache(self, cache_dir: str = "media_cache", max_bytes: int = 200 * 1024 * 1024) -> PreparedMediaCache:
+        """Activer le cache disque des médias préparés (réutilisé entre story, post et retries)"""
+        self.media_cache = PreparedMediaCache(cache_dir, max_bytes)
+        return self.media_cache
+    
+    def _submit_background(self, func, *args, detached: bool = False):
+        """Exécuter une tâche sur le pool de threads du client (créé à la demande)
+        
+        La tâche hérite du contexte de l'appelant (deadline, span de trace), sauf si
+        detached (tâche qui survit à l'opération, ex: mise à jour PDQ après le configure).
+        """
+        if self._background_executor is None:
+            self._background_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="insta_kendou")
+        
+        context = contextvars.Context() if detached else contextvars.copy_context()
+        future = self._background_executor.submit(context.run, func, *args)
+        self._background_tasks = [task for task in self._background_tasks if not task.done()]
+        self._background_tasks.append(future)
+        return future
+    
+    def _submit_pipeline(self, func, *args):
+        """Exécuter une étape du pipeline d'upload sur un pool dédié
+        
+        Séparé du pool d'arrière-plan: un préchauffage ou une mise à jour PDQ en cours
+        ne retarde jamais le hash ou le corps signé attendus par l'upload en cours.
+        """
+        if self._pipeline_executor is None:
+            self._pipeline_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="insta_kendou_upload")
+        
+        return self._pipeline_executor.submit(contextvars.copy_context().run, func, *args)
+    
+    def warm_up_connections(self, hosts: tuple = WARM_UP_HOSTS, connections: int = 1, wait: bool = False):
+        """Ouvrir à l'avance les connexions (DNS, TCP, TLS) vers les hôtes de l'API
+        
+        Exécuté en arrière-plan: la première requête réutilise une connexion déjà établie.
+        Retourne le Future de la tâche, ou le résultat {hôte: connexions ouvertes} si wait.
+        """
+        future = self._submit_background(self._warm_up_hosts, tuple(hosts), connections, detached=True)
+        return future.result() if wait else future
+    
+    def _warm_up_hosts(self, hosts: tuple, connections: int) -> dict:
+        adapter = get_transport_adapter(self.auth.session)
+        session = self.auth.session
+        opened = {}
+        for host in hosts:
+            try:
+                # Mêmes paramètres TLS/proxy que les requêtes réelles (variables d'environnement incluses)
+                settings = session.merge_environment_settings(host, {}, None, None, None)
+                opened[host] = adapter.warm_up(host, connections, verify=settings["verify"],
+                                               proxies=settings["proxies"], cert=settings["cert"])
+            except Exception as e:
+                # Préchauffage best-effort: la requête réelle ouvrira sa connexion normalement
+                print(f"⚠️ Préchauffage {host} impossible: {e}")
+                opened[host] = 0
+        return opened
+    
+    def wait_background_tasks(self, timeout: float = None) -> bool:
+        """Attendre la fin des tâches d'arrière-plan (mise à jour PDQ...). True si toutes terminées"""
+        _, not_done = wait(list(self._background_tasks), timeout=timeout)
+        return not not_done
+    
     def get_x_mid(self) -> str:
         """Récupérer x-mid depuis le device manager"""
         return self.auth.device_manager.get_x_mid()
@@ -371,7 +740,7 @@ class InstagramClient:
                 "sessionid": sessionid
             }
             
-            encoded = base64.b64encode(json.dumps(token_data, separators=(',', ':')).encode()).decode()
+            encoded = base64.b64encode(fast_json.dumps(token_data, separators=(',', ':')).encode()).decode()
             return f"Bearer IGT:2:{encoded}"
         
         return ""
@@ -577,7 +946,7 @@ class InstagramClient:
             zca_data = {
                 "android": {
                     "aka": {
-                        "dataToSign": json.dumps({
+                        "dataToSign": fast_json.dumps({
                             "time": current_time,
                             "hash": hash_b64
                         }, separators=(',', ':')),
@@ -601,7 +970,7 @@ class InstagramClient:
             }
             
             # Encoder en base64
-            json_str = json.dumps(zca_data, separators=(',', ':'))
+            json_str = fast_json.dumps(zca_data, separators=(',', ':'))
             encoded = base64.b64encode(json_str.encode()).decode()
             
             return encoded
@@ -634,7 +1003,7 @@ class InstagramClient:
                 }
             }
             
-            json_str = json.dumps(fallback_data, separators=(',', ':'))
+            json_str = fast_json.dumps(fallback_data, separators=(',', ':'))
             return base64.b64encode(json_str.encode()).decode()
     
     def _get_battery_level(self) -> int:
@@ -685,15 +1054,69 @@ class InstagramClient:
             return random.choice(["Unplugged", "Charging", "Full"])
     
     def _build_complete_headers(self, endpoint: str = "", friendly_name: str = "") -> dict:
-        """Construire headers complets avec toutes les données de session"""
-        user_id = self._get_user_id_from_session()
+        """Construire headers complets avec toutes les données de session
+        
+        La partie dérivée de la session provient d'un instantané immuable partagé entre
+        threads; seuls les champs horodatés et spécifiques à la requête sont calculés ici.
+        """
+        _, head, tail = self._get_header_snapshot()
+        
+        headers = dict(head)
+        headers["x-pigeon-rawclienttime"] = str(time.time())
+        
+        # x-mid depuis session ou device manager
+        x_mid = self.get_x_mid()
+        if x_mid:
+            headers["x-mid"] = x_mid
+        else:
+            del headers["x-mid"]
+        
+        # Nav chain basique si non fournie
+        current_time = int(time.time() * 1000)
+        headers["x-ig-nav-chain"] = f"MainFeedFragment:feed_timeline:1:cold_start:{current_time}:::"
+        
+        # Endpoint spécifique
+        if endpoint:
+            headers["x-ig-client-endpoint"] = endpoint
+        
+        # Friendly name
+        if friendly_name:
+            headers["x-fb-friendly-name"] = friendly_name
+        
+        headers.update(tail)
+        
+        # Générer Meta ZCA dynamique avec données réelles
+        headers["x-meta-zca"] = self._generate_meta_zca()
+        
+        return headers
+    
+    def invalidate_header_snapshot(self):
+        """Forcer le recalcul des headers de session (après modification en place de session_data)"""
+        with self._header_lock:
+            self._header_snapshot = None
+    
+    def _get_header_snapshot(self) -> tuple:
+        """Instantané (session_data, headers de tête, headers de fin) recalculé si session_data est remplacé"""
+        snapshot = self._header_snapshot
+        if snapshot is not None and snapshot[0] is self.session_data:
+            return snapshot
+        
+        with self._header_lock:
+            snapshot = self._header_snapshot
+            if snapshot is None or snapshot[0] is not self.session_data:
+                snapshot = self._build_header_snapshot(self.session_data)
+                self._header_snapshot = snapshot
+            return snapshot
+    
+    def _build_header_snapshot(self, session_data: dict) -> tuple:
+        """Calculer les headers invariants d'une session (ordre des headers conservé)"""
         bandwidth_data = self._get_bandwidth_test_data()
         salt_ids = self._get_salt_ids()
         device_headers = self._get_device_specific_headers()
         connection_headers = self._get_connection_type_headers()
         ig_headers = self._get_ig_headers()
         
-        # Headers de base
+        # Headers de base (les valeurs vides sont remplies à chaque requête)
         headers = {
             "accept-language": "fr-FR, en-US",
             "authorization": self._get_auth_token(),
@@ -705,9 +1128,9 @@ class InstagramClient:
             "x-ig-app-locale": "fr_FR",
             "x-ig-device-locale": "fr_FR",
             "x-ig-mapped-locale": "fr_FR",
-            "x-ig-timezone-offset": str(self.session_data.get("timezone_offset", 10800)),
+            "x-ig-timezone-offset": str(session_data.get("timezone_offset", 10800)),
             "x-ig-capabilities": "3brTv10=",
-            "x-pigeon-rawclienttime": str(time.time()),
+            "x-pigeon-rawclienttime": "",
             "x-pigeon-session-id": self._get_pigeon_session_id(),
             "x-tigon-is-retry": "False",
             "accept-encoding": "zstd",
@@ -748,7 +1171,7 @@ class InstagramClient:
         })
         
         # Bloks version depuis session
-        session_meta = self.session_data.get("session_metadata", {})
+        session_meta = session_data.get("session_metadata", {})
         bloks_version = session_meta.get("bloks_version_id")
         if bloks_version:
             headers["x-bloks-version-id"] = bloks_version
@@ -756,37 +1179,25 @@ class InstagramClient:
             headers["x-bloks-version-id"] = "ef88cb8e7a6a225af847577c11f18eeccda0582b87e294181c4c7425d28047b1"
         
         # Device languages depuis session
-        locale = self.session_data.get("locale", "fr_FR")
+        locale = session_data.get("locale", "fr_FR")
         headers["x-ig-device-languages"] = f'{{"system_languages":"{locale}"}}'
         
         # Family device ID depuis session
-        uuids = self.session_data.get("uuids", {})
+        uuids = session_data.get("uuids", {})
         family_device_id = uuids.get("client_session_id")
         if family_device_id:
             headers["x-ig-family-device-id"] = family_device_id
         
-        # x-mid depuis session ou device manager
-        x_mid = self.get_x_mid()
-        if x_mid:
-            headers["x-mid"] = x_mid
-        
-        # Nav chain basique si non fournie
-        current_time = int(time.time() * 1000)
-        headers["x-ig-nav-chain"] = f"MainFeedFragment:feed_timeline:1:cold_start:{current_time}:::"
-        
-        # Endpoint spécifique
-        if endpoint:
-            headers["x-ig-client-endpoint"] = endpoint
-        
-        # Friendly name
-        if friendly_name:
-            headers["x-fb-friendly-name"] = friendly_name
+        headers["x-mid"] = ""
+        headers["x-ig-nav-chain"] = ""
         
         # Request analytics tags
-        headers["x-fb-request-analytics-tags"] = '{"network_tags":{"product":"567067343352427","purpose":"fetch","surface":"undefined","request_category":"api","retry_attempt":"0"}}'
+        tail = {
+            "x-fb-request-analytics-tags": '{"network_tags":{"product":"567067343352427","purpose":"fetch","surface":"undefined","request_category":"api","retry_attempt":"0"}}'
+        }
         
         # Zero headers pour économie de données
-        headers.update({
+        tail.update({
             "x-zero-a-device-id": "",
             "x-zero-balance": "INIT",
             "x-zero-d-device-id": device_headers.get("x-ig-device-id", ""),
@@ -794,10 +1205,7 @@ class InstagramClient:
             "x-zero-f-device-id": family_device_id or ""
         })
         
-        # Générer Meta ZCA dynamique avec données réelles
-        headers["x-meta-zca"] = self._generate_meta_zca()
-        
-        return headers
+        return session_data, MappingProxyType(headers), MappingProxyType(tail)
     
     def _build_nav_chain(self, action_type: str = "general") -> str:
         """Construire nav chain contextuel"""
@@ -832,6 +1240,7 @@ class InstagramClient:
             # 2. VÉRIFIER LOGIN_REQUIRED
             if (isinstance(error_data, dict) and error_data.get("message") == "login_required") or \
                ("login_required" in response_text.lower()):
+                self.session_breaker.trip("login_required")
                 return {
                     "success": False,
                     "error": f"Le compte @{username} est déconnecté, veuillez vous reconnecter"
@@ -843,11 +1252,13 @@ class InstagramClient:
                 
                 if not challenge_info["show_details"]:
                     if challenge_info["type"] == "suspended":
+                        self.session_breaker.trip("suspended")
                         return {
                             "success": False,
                             "error": f"Le compte @{username} est suspendu, veuillez le régler manuellement"
                         }
                     elif challenge_info["type"] == "disabled":
+                        self.session_breaker.trip("disabled")
                         return {
                             "success": False,
                             "error": f"Le compte @{username} est désactivé et ne peut plus être utilisé"
@@ -958,7 +1369,7 @@ class InstagramClient:
             challenge_payload = {
                 "_uuid": self.auth.device_manager.device_info['device_uuid'],
                 "has_follow_up_screens": "0",
-                "bk_client_context": json.dumps({
+                "bk_client_context": fast_json.dumps({
                     "bloks_version": "e061cacfa956f06869fc2b678270bef1583d2480bf51f508321e64cfb5cc12bd",
                     "styles_id": "instagram"
                 }),
@@ -1000,6 +1411,8 @@ class InstagramClient:
                 result = self._upload_story_internal(args[0])
             elif action_type == "upload_post":
                 result = self._upload_post_internal(args[0], args[1] if len(args) > 1 else "")
+            elif action_type == "upload_carousel":
+                result = self._upload_carousel_internal(args[0], args[1] if len(args) > 1 else "")
             elif action_type == "delete_post":
                 result = self._delete_last_post_internal()
             else:
@@ -1007,6 +1420,9 @@ class InstagramClient:
             
             # Si succès, retourner immédiatement
             if result["success"]:
+                if action_type in ("upload_post", "upload_carousel", "delete_post"):
+                    # Le nombre de publications du compte a changé
+                    self._invalidate_cached("user_info", self._get_user_id_from_session())
                 return result
             
             # Si échec, vérifier si c'est un challenge résolvable
@@ -1015,7 +1431,7 @@ class InstagramClient:
                 
                 # Tenter de résoudre le challenge (SILENCIEUX)
                 if self.solve_general_challenge(challenge_data):
-                    time.sleep(5)
+                    deadline_sleep(5)
                     continue
                 else:
                     username = self._get_username_from_session()
@@ -1035,26 +1451,49 @@ class InstagramClient:
         return {"success": False, "error": f"Captcha détecté pour @{username}, veuillez le régler manuellement"}
     
     # ACTIONS PUBLIQUES AVEC RETRY AUTOMATIQUE
+    @accepts_deadline
+    @session_guard
     def like_post(self, media_input: str) -> dict:
         """Liker un post Instagram avec retry automatique"""
         return self._execute_action_with_retry("like", media_input)
     
+    @accepts_deadline
+    @session_guard
     def comment_post(self, media_input: str, comment_text: str) -> dict:
         """Commenter un post Instagram avec retry automatique"""
         return self._execute_action_with_retry("comment", media_input, comment_text)
     
+    @accepts_deadline
+    @session_guard
     def follow_user(self, user_input: str) -> dict:
         """Suivre un utilisateur avec retry automatique"""
         return self._execute_action_with_retry("follow", user_input)
     
+    def prepare_media_batch(self, image_paths: list, story_mode: bool = False, max_workers: int = None) -> list:
+        """Préparer un lot d'images à l'avance (pool de processus) pour upload_post/upload_story"""
+        return MediaProcessor.prepare_media_batch(image_paths, story_mode=story_mode,
+                                                  cache=self.media_cache, max_workers=max_workers)
+    
+    @accepts_deadline
+    @session_guard
     def upload_story(self, image_path: str) -> dict:
         """Publier une story Instagram avec retry automatique"""
         return self._execute_action_with_retry("upload_story", image_path)
     
+    @accepts_deadline
+    @session_guard
     def upload_post(self, image_path: str, caption: str = "") -> dict:
         """Publier un post Instagram avec retry automatique"""
         return self._execute_action_with_retry("upload_post", image_path, caption)
     
+    @accepts_deadline
+    @session_guard
+    def upload_carousel(self, image_paths: list, caption: str = "") -> dict:
+        """Publier un carrousel (2 à 10 images) avec retry automatique"""
+        return self._execute_action_with_retry("upload_carousel", image_paths, caption)
+    
+    @accepts_deadline
+    @session_guard
     def delete_last_post(self) -> dict:
         """Supprimer la dernière publication avec retry automatique"""
         return self._execute_action_with_retry("delete_post")
@@ -1112,6 +1551,7 @@ class InstagramClient:
                 parsed_data = InstagramEncryption.safe_parse_json(response)
                 
                 if InstagramEncryption.is_success_response(response, parsed_data):
+                    self._invalidate_cached("media_info", media_id)
                     return {"success": True, "data": parsed_data}
                 else:
                     return self.handle_action_error(response.status_code, parsed_data, 
@@ -1193,6 +1633,7 @@ class InstagramClient:
                             parsed_data = InstagramEncryption.safe_parse_json(response)
                             
                             if InstagramEncryption.is_success_response(response, parsed_data):
+                                self._invalidate_cached("media_info", media_id)
                                 return {"success": True, "data": parsed_data}
                             else:
                                 return self.handle_action_error(response.status_code, parsed_data, 
@@ -1272,6 +1713,8 @@ class InstagramClient:
                 parsed_data = InstagramEncryption.safe_parse_json(response)
                 
                 if InstagramEncryption.is_success_response(response, parsed_data):
+                    self._invalidate_cached("user_info", user_id)
+                    self._invalidate_cached("user_info", current_user_id)
                     return {"success": True, "data": parsed_data}
                 else:
                     return self.handle_action_error(response.status_code, parsed_data, 
@@ -1354,13 +1797,13 @@ class InstagramClient:
     
     def _upload_story_internal(self, image_path: str) -> dict:
         """Publier une story Instagram (méthode interne)"""
+        prepared = None
         try:
-            if not os.path.exists(image_path):
-                return {"success": False, "error": f"Image non trouvée: {image_path}"}
+            prepared = self._resolve_prepared_media(image_path, story_mode=True)
+            if not prepared["success"]:
+                return prepared
             
-            image_data, image_size, error = MediaProcessor.prepare_image_for_instagram(image_path, story_mode=True)
-            if error:
-                return {"success": False, "error": error}
+            image_data, image_size = prepared["image_data"], prepared["image_size"]
             
             upload_id = MediaProcessor.generate_upload_id()
             user_id = self._get_user_id_from_session()
@@ -1377,16 +1820,26 @@ class InstagramClient:
             
         except Exception as e:
             return {"success": False, "error": f"Erreur upload story: {str(e)}"}
+        finally:
+            # Projection ouverte ici (chemin fourni): la fermer; un média préparé reste à l'appelant
+            if prepared is not None and not isinstance(image_path, dict):
+                MediaProcessor.release_media(prepared.get("image_data"))
     
     def _upload_post_internal(self, image_path: str, caption: str = "") -> dict:
-        """Publier un post Instagram (méthode interne)"""
+        """Publier un post Instagram (méthode interne)
+        
+        Pipeline: le hash PDQ et le corps signé du configure sont calculés sur un worker
+        pendant l'envoi des octets; la mise à jour PDQ part en arrière-plan après le configure.
+        """
+        owned = not isinstance(image_path, dict)
+        prepared = pdq_future = None
+        handed_off = False
         try:
-            if not os.path.exists(image_path):
-                return {"success": False, "error": f"Image non trouvée: {image_path}"}
+            prepared = self._resolve_prepared_media(image_path, story_mode=False, defer_pdq=True)
+            if not prepared["success"]:
+                return prepared
             
-            image_data, image_size, error = MediaProcessor.prepare_image_for_instagram(image_path, story_mode=False)
-            if error:
-                return {"success": False, "error": error}
+            image_data, image_size = prepared["image_data"], prepared["image_size"]
             
             upload_id = MediaProcessor.generate_upload_id()
             user_id = self._get_user_id_from_session()
@@ -1394,19 +1847,118 @@ class InstagramClient:
             if not user_id:
                 return {"success": False, "error": "User ID non trouvé"}
             
+            pdq_future = self._submit_pipeline(MediaProcessor.complete_pdq_hash, prepared)
+            payload_future = self._submit_pipeline(self._build_post_configure_body, upload_id, image_size, user_id, caption)
+            
             upload_result = self._upload_image_data(image_data, upload_id, story_mode=False)
             if not upload_result["success"]:
                 return upload_result
             
-            post_result = self._configure_post(upload_id, image_size, user_id, caption)
+            post_result = self._send_configure(
+                "https://i.instagram.com/api/v1/media/configure/",
+                payload_future.result(),
+                endpoint="post_configure",
+                friendly_name="IgApi: media/configure/",
+                label="post"
+            )
             if post_result["success"]:
-                # Mettre à jour PDQ hash
-                self._update_media_pdq_hash(upload_id, image_data, user_id)
+                # Mettre à jour PDQ hash sans bloquer l'appelant (la tâche ferme ensuite la projection)
+                self._submit_background(self._publish_pdq_hash, upload_id, image_data, user_id, pdq_future, owned,
+                                        detached=True)
+                handed_off = True
             
             return post_result
             
         except Exception as e:
             return {"success": False, "error": f"Erreur upload post: {str(e)}"}
+        finally:
+            if owned and prepared is not None and not handed_off:
+                # Le hash PDQ peut encore lire les octets: fermer une fois son calcul terminé
+                image_data = prepared.get("image_data")
+                if pdq_future is None:
+                    MediaProcessor.release_media(image_data)
+                else:
+                    pdq_future.add_done_callback(lambda _: MediaProcessor.release_media(image_data))
+    
+    def _upload_carousel_internal(self, image_paths: list, caption: str = "", max_concurrency: int = 4) -> dict:
+        """Publier un carrousel (méthode interne)
+        
+        Préparation en parallèle (pool de processus), uploads simultanés bornés par
+        max_concurrency sur la session partagée, puis un seul configure_sidecar.
+        """
+        owned = []
+        try:
+            if not 2 <= len(image_paths) <= 10:
+                return {"success": False, "error": "Un carrousel doit contenir entre 2 et 10 images"}
+            
+            user_id = self._get_user_id_from_session()
+            if not user_id:
+                return {"success": False, "error": "User ID non trouvé"}
+            
+            # Chemins préparés en lot, médias déjà préparés réutilisés tels quels
+            paths = [media for media in image_paths if not isinstance(media, dict)]
+            owned = self.prepare_media_batch(paths, story_mode=False) if paths else []
+            prepared_paths = iter(owned)
+            items = []
+            for media in image_paths:
+                prepared = self._resolve_prepared_media(media if isinstance(media, dict) else next(prepared_paths), story_mode=False)
+                if not prepared["success"]:
+                    return prepared
+                items.append(prepared)
+            
+            # Un upload_id distinct par élément (generate_upload_id ne rend jamais deux fois le même ID)
+            sidecar_id = MediaProcessor.generate_upload_id()
+            upload_ids = [MediaProcessor.generate_upload_id() for _ in items]
+            
+            # Chaque upload s'exécute dans une copie du contexte de l'appelant (deadline, trace)
+            context = contextvars.copy_context()
+            with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(items)))) as executor:
+                upload_results = list(executor.map(
+                    lambda args: context.copy().run(self._upload_image_data, args[0]["image_data"], args[1],
+                                                    story_mode=False, is_sidecar=True),
+                    zip(items, upload_ids)
+                ))
+            
+            for upload_result in upload_results:
+                if not upload_result["success"]:
+                    return upload_result
+            
+            signed_body = self._build_sidecar_configure_body(sidecar_id, items, upload_ids, user_id, caption)
+            post_result = self._send_configure(
+                "https://i.instagram.com/api/v1/media/configure_sidecar/",
+                signed_body,
+                endpoint="post_configure",
+                friendly_name="IgApi: media/configure_sidecar/",
+                label="carrousel"
+            )
+            
+            if post_result["success"]:
+                for prepared, upload_id in zip(items, upload_ids):
+                    release = any(prepared is item for item in owned)
+                    self._submit_background(self._publish_pdq_hash, upload_id, prepared["image_data"], user_id,
+                                            prepared.get("pdq_hash"), release, detached=True)
+                owned = []
+            
+            return post_result
+            
+        except Exception as e:
+            return {"success": False, "error": f"Erreur upload carrousel: {str(e)}"}
+        finally:
+            # Projections ouvertes par prepare_media_batch et non confiées aux mises à jour PDQ
+            for prepared in owned:
+                MediaProcessor.release_media(prepared.get("image_data"))
+    
+    def _resolve_prepared_media(self, media, story_mode: bool, defer_pdq: bool = False) -> dict:
+        """Retourner un média préparé (artefact de prepare_media_batch ou chemin à préparer)"""
+        if isinstance(media, dict):
+            if media.get("success") and media.get("story_mode", story_mode) != story_mode:
+                return {"success": False, "error": "Média préparé pour un autre format (story/post)"}
+            return media
+        
+        if not os.path.exists(media):
+            return {"success": False, "error": f"Image non trouvée: {media}"}
+        
+        return MediaProcessor.prepare_media(media, story_mode=story_mode, cache=self.media_cache, defer_pdq=defer_pdq)
     
     def _delete_last_post_internal(self) -> dict:
         """Supprimer la dernière publication (méthode interne)"""
@@ -1482,6 +2034,8 @@ class InstagramClient:
             return str(random.randint(1000000000, 9999999999))
         return None
     
+    @accepts_deadline
+    @session_guard
     def get_account_info(self) -> dict:
         """Récupérer informations du compte connecté"""
         try:
@@ -1517,6 +2071,8 @@ class InstagramClient:
         except Exception as e:
             return {"success": False, "error": f"Erreur: {str(e)}"}
     
+    @accepts_deadline
+    @session_guard
     def toggle_account_privacy(self) -> dict:
         """Changer la confidentialité du compte (public <-> privé)"""
         try:
@@ -1524,6 +2080,8 @@ class InstagramClient:
             if not user_id:
                 return {"success": False, "error": "User ID non trouvé"}
             
+            # Le basculement doit partir de l'état réel, pas d'une réponse en cache
+            self._invalidate_cached("user_info", user_id)
             account_info = self.get_account_info()
             if not account_info["success"]:
                 return account_info
@@ -1555,6 +2113,7 @@ class InstagramClient:
                 
                 if InstagramEncryption.is_success_response(response, parsed_data):
                     new_status = "Public" if action == "set_public" else "Privé"
+                    self._invalidate_cached("user_info", user_id)
                     return {"success": True, "data": {"new_status": new_status}}
                 else:
                     print(f"❌ Erreur changement privacy: {parsed_data}")
@@ -1572,46 +2131,82 @@ class InstagramClient:
             return {"success": False, "error": f"Erreur: {str(e)}"}
     
     # MÉTHODES D'UPLOAD ET CONFIGURATION
-    def _upload_image_data(self, image_data: bytes, upload_id: str, story_mode: bool = False) -> dict:
-        """Upload des données d'image vers Instagram avec headers complets"""
+    def _upload_image_data(self, image_data, upload_id: str, story_mode: bool = False, max_attempts: int = 3, is_sidecar: bool = False) -> dict:
+        """Upload des données d'image vers Instagram avec headers complets (streaming et reprise)"""
+        mapped = None
         try:
-            user_id = self._get_user_id_from_session()
-            
-            # Headers complets pour upload
-            headers = self._build_complete_headers(
-                endpoint="upload",
-                friendly_name="IgApi: rupload_igphoto"
-            )
-            
-            # Modifier content-type pour upload
-            headers["content-type"] = "application/octet-stream"
-            headers["offset"] = "0"
-            headers["x-entity-length"] = str(len(image_data))
-            headers["x-entity-name"] = f"{upload_id}_0_{random.randint(1000000000, 9999999999)}"
-            headers["x-entity-type"] = "image/jpeg"
+            # Un chemin de fichier est projeté en mémoire plutôt que chargé (projection fermée en sortie)
+            if isinstance(image_data, str):
+                image_data = mapped = MediaProcessor.map_file(image_data)
             
+            total_length = len(image_data)
+            entity_name = f"{upload_id}_0_{random.randint(1000000000, 9999999999)}"
+            upload_url = f"https://i.instagram.com/rupload_igphoto/{entity_name}"
             share_type = "stories" if story_mode else "feed"
             
-            upload_params = {
-                "upload_id": upload_id,
-                "session_id": upload_id,
-                "media_type": "1",
-                "upload_engine_config_enum": "0",
-                "share_type": share_type,
-                "is_optimistic_upload": "false",
-                "image_compression": '{"lib_name":"libjpeg","lib_version":"9d","quality":"90","original_width":720,"original_height":1280}' if story_mode else '{"lib_name":"libjpeg","lib_version":"9d","quality":"90","original_width":1080,"original_height":1080}',
-                "xsharing_user_ids": "[]",
-                "retry_context": '{"num_reupload":0,"num_step_manual_retry":0,"num_step_auto_retry":0}'
-            }
+            offset = 0
+            response = None
+            last_error = None
             
-            headers["x-instagram-rupload-params"] = json.dumps(upload_params, separators=(',', ':'))
+            for attempt in range(max_attempts):
+                # Une tentative en échec ne doit pas rapporter la réponse d'une tentative précédente
+                response = None
+                
+                # Headers complets pour upload
+                headers = self._build_complete_headers(
+                    endpoint="upload",
+                    friendly_name="IgApi: rupload_igphoto"
+                )
+                
+                upload_params = {
+                    "upload_id": upload_id,
+                    "session_id": upload_id,
+                    "media_type": "1",
+                    "upload_engine_config_enum": "0",
+                    "share_type": share_type,
+                    "is_optimistic_upload": "false",
+                    "image_compression": '{"lib_name":"libjpeg","lib_version":"9d","quality":"90","original_width":720,"original_height":1280}' if story_mode else '{"lib_name":"libjpeg","lib_version":"9d","quality":"90","original_width":1080,"original_height":1080}',
+                    "xsharing_user_ids": "[]",
+                    "retry_context": fast_json.dumps({"num_reupload": 0, "num_step_manual_retry": 0, "num_step_auto_retry": attempt}, separators=(',', ':'))
+                }
+                if is_sidecar:
+                    upload_params["is_sidecar"] = "1"
+                
+                headers["x-entity-name"] = entity_name
+                headers["x-entity-type"] = "image/jpeg"
+                headers["x-entity-length"] = str(total_length)
+                headers["x-instagram-rupload-params"] = fast_json.dumps(upload_params, separators=(',', ':'))
+                
+                # Reprise: demander au serveur combien d'octets il a déjà reçus
+                if attempt > 0:
+                    offset = self._query_upload_offset(upload_url, headers, total_length)
+                
+                # Modifier content-type pour upload
+                headers["content-type"] = "application/octet-stream"
+                headers["offset"] = str(offset)
+                
+                stream = UploadStream(image_data, offset)
+                try:
+                    response = self.auth.session.post(
+                        upload_url,
+                        headers=headers,
+                        data=stream,
+                        timeout=30
+                    )
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                    last_error = e
+                    continue
+                finally:
+                    stream.close()
+                
+                # Erreur serveur transitoire: reprendre à partir de l'offset confirmé
+                if response.status_code >= 500 and attempt < max_attempts - 1:
+                    continue
+                
+                break
             
-            response = self.auth.session.post(
-                f"https://i.instagram.com/rupload_igphoto/{upload_id}_0_{random.randint(1000000000, 9999999999)}",
-                headers=headers,
-                data=image_data,
-                timeout=30
-            )
+            if response is None:
+                return {"success": False, "error": f"Erreur upload image: {str(last_error)}"}
             
             if response.status_code == 200:
                 return {"success": True, "data": "Upload réussi"}
@@ -1626,6 +2221,23 @@ class InstagramClient:
                 
         except Exception as e:
             return {"success": False, "error": f"Erreur upload image: {str(e)}"}
+        finally:
+            MediaProcessor.release_media(mapped)
+    
+    def _query_upload_offset(self, upload_url: str, headers: dict, total_length: int) -> int:
+        """Récupérer l'offset déjà reçu par le serveur rupload (0 si inconnu)"""
+        try:
+            response = self.auth.session.get(upload_url, headers=headers, timeout=10)
+            
+            if response.status_code == 200:
+                parsed_data = InstagramEncryption.safe_parse_json(response)
+                offset = int(parsed_data.get("offset", 0))
+                if 0 <= offset <= total_length:
+                    return offset
+        except Exception:
+            pass
+        
+        return 0
     
     def _configure_story(self, upload_id: str, image_size: tuple, user_id: str) -> dict:
         """Configurer la story après upload avec headers complets"""
@@ -1636,37 +2248,19 @@ class InstagramClient:
             device_settings = self.session_data.get("device_settings", {})
             uuids = self.session_data.get("uuids", {})
             
-            story_data = {
-                "supported_capabilities_new": '[{"name":"SUPPORTED_SDK_VERSIONS","value":"149.0,150.0,151.0,152.0,153.0,154.0,155.0,156.0,157.0,158.0,159.0,160.0,161.0,162.0,163.0,164.0,165.0,166.0,167.0,168.0,169.0,170.0,171.0,172.0,173.0,174.0,175.0,176.0,177.0,178.0,179.0,180.0,181.0,182.0,183.0,184.0,185.0,186.0,187.0,188.0,189.0,190.0,191.0,192.0,193.0,194.0,195.0,196.0,197.0,198.0,199.0,200.0,201.0,202.0"},{"name":"SUPPORTED_BETA_SDK_VERSIONS","value":"182.0-beta,183.0-beta,184.0-beta,185.0-beta,186.0-beta,187.0-beta,188.0-beta,189.0-beta,190.0-beta,191.0-beta,192.0-beta,193.0-beta,194.0-beta,195.0-beta,196.0-beta,197.0-beta,198.0-beta,199.0-beta,200.0-beta,201.0-beta,202.0-beta"},{"name":"FACE_TRACKER_VERSION","value":"14"},{"name":"segmentation","value":"segmentation_enabled"},{"name":"COMPRESSION","value":"ETC2_COMPRESSION"},{"name":"gyroscope","value":"gyroscope_enabled"}]',
-                "allow_multi_configures": "1",
-                "has_camera_metadata": "0",
-                "camera_entry_point": "11",
-                "original_media_type": "1",
+            signed_body = _STORY_CONFIGURE_BODY.sign({
                 "camera_session_id": str(uuid.uuid4()),
                 "original_height": str(height),
-                "include_e2ee_mentioned_user_list": "1",
-                "hide_from_profile_grid": "false",
-                "scene_capture_type": "",
                 "timezone_offset": str(self.session_data.get("timezone_offset", 10800)),
                 "client_shared_at": str(int(time.time())),
-                "media_folder": "Screenshots",
-                "configure_mode": "1",
-                "source_type": "4",
-                "camera_position": "unknown",
                 "_uid": user_id,
                 "device_id": self._get_device_specific_headers()["x-ig-android-id"],
                 "composition_id": str(uuid.uuid4()),
                 "_uuid": self._get_device_specific_headers()["x-ig-device-id"],
-                "creation_tool_info": "[]",
-                "creation_surface": "camera",
                 "nav_chain": f"MainFeedFragment:feed_timeline:1:cold_start:{int(time.time() * 1000)}:::,QuickCaptureFragment:stories_precapture_camera:25:your_story_placeholder:{int(time.time() * 1000)}:::,PrivateStoryShareSheetFragment:private_stories_share_sheet:28:button:{int(time.time() * 1000)}::",
                 "imported_taken_at": str(int(time.time()) - 3600),
-                "capture_type": "normal",
-                "audience": "default",
                 "upload_id": upload_id,
                 "client_timestamp": str(int(time.time())),
-                "bottom_camera_dial_selected": "2",
-                "publish_id": "1",
                 "original_width": str(width),
                 "media_transformation_info": f'{{"width":"{width}","height":"{height}","x_transform":"0","y_transform":"0","zoom":"1.0","rotation":"0.0","background_coverage":"0.0"}}',
                 "edits": {
@@ -1684,9 +2278,7 @@ class InstagramClient:
                     "android_version": device_settings.get('android_version', 32),
                     "android_release": device_settings.get('android_release', '12')
                 }
-            }
-            
-            signed_body = InstagramEncryption.create_signed_body(story_data)
+            })
             
             headers = self._build_complete_headers(
                 endpoint="story_configure",
@@ -1723,62 +2315,117 @@ class InstagramClient:
     def _configure_post(self, upload_id: str, image_size: tuple, user_id: str, caption: str = "") -> dict:
         """Configurer le post après upload avec headers complets"""
         try:
-            width, height = image_size
+            signed_body = self._build_post_configure_body(upload_id, image_size, user_id, caption)
             
-            # Récupérer device settings depuis session
-            device_settings = self.session_data.get("device_settings", {})
+            return self._send_configure(
+                "https://i.instagram.com/api/v1/media/configure/",
+                signed_body,
+                endpoint="post_configure",
+                friendly_name="IgApi: media/configure/",
+                label="post"
+            )
             
-            post_data = {
-                "app_attribution_android_namespace": "",
-                "camera_entry_point": "360",
-                "camera_session_id": str(uuid.uuid4()),
-                "original_height": str(height),
-                "include_e2ee_mentioned_user_list": "1",
-                "hide_from_profile_grid": "false",
-                "scene_capture_type": "",
-                "timezone_offset": str(self.session_data.get("timezone_offset", 10800)),
-                "source_type": "4",
-                "_uid": user_id,
-                "device_id": self._get_device_specific_headers()["x-ig-android-id"],
-                "_uuid": self._get_device_specific_headers()["x-ig-device-id"],
-                "creation_tool_info": "[]",
-                "creation_logger_session_id": str(uuid.uuid4()),
-                "nav_chain": f"MainFeedFragment:feed_timeline:1:cold_start:{int(time.time() * 1000)}:::,GalleryPickerFragment:gallery_picker:50:camera_tab_bar:{int(time.time() * 1000)}:::,PhotoFilterFragment:photo_filter:51:button:{int(time.time() * 1000)}::",
-                "caption": caption,
-                "audience": "default",
+        except Exception as e:
+            return {"success": False, "error": f"Erreur configuration post: {str(e)}"}
+    
+    def _build_post_configure_body(self, upload_id: str, image_size: tuple, user_id: str, caption: str = "") -> str:
+        """Construire le corps signé du configure d'un post (sans I/O, exécutable sur un worker)"""
+        width, height = image_size
+        
+        # Récupérer device settings depuis session
+        device_settings = self.session_data.get("device_settings", {})
+        
+        return _POST_CONFIGURE_BODY.sign({
+            "camera_session_id": str(uuid.uuid4()),
+            "original_height": str(height),
+            "timezone_offset": str(self.session_data.get("timezone_offset", 10800)),
+            "_uid": user_id,
+            "device_id": self._get_device_specific_headers()["x-ig-android-id"],
+            "_uuid": self._get_device_specific_headers()["x-ig-device-id"],
+            "creation_logger_session_id": str(uuid.uuid4()),
+            "nav_chain": f"MainFeedFragment:feed_timeline:1:cold_start:{int(time.time() * 1000)}:::,GalleryPickerFragment:gallery_picker:50:camera_tab_bar:{int(time.time() * 1000)}:::,PhotoFilterFragment:photo_filter:51:button:{int(time.time() * 1000)}::",
+            "caption": caption,
+            "upload_id": upload_id,
+            "original_width": str(width),
+            "edits": {
+                "filter_type": 0,
+                "filter_strength": 1.0,
+                "crop_original_size": [float(width), float(height)],
+                "crop_center": [-0.002429657, -0.06649882],
+                "crop_zoom": 1.782934
+            },
+            "extra": {
+                "source_width": width,
+                "source_height": height
+            },
+            "device": {
+                "manufacturer": device_settings.get('manufacturer', 'samsung'),
+                "model": device_settings.get('model', 'SM-G991B'),
+                "android_version": device_settings.get('android_version', 32),
+                "android_release": device_settings.get('android_release', '12')
+            }
+        })
+    
+    def _build_sidecar_configure_body(self, sidecar_id: str, items: list, upload_ids: list, user_id: str, caption: str = "") -> str:
+        """Construire le corps signé du configure_sidecar d'un carrousel"""
+        device_settings = self.session_data.get("device_settings", {})
+        device = {
+            "manufacturer": device_settings.get('manufacturer', 'samsung'),
+            "model": device_settings.get('model', 'SM-G991B'),
+            "android_version": device_settings.get('android_version', 32),
+            "android_release": device_settings.get('android_release', '12')
+        }
+        
+        children_metadata = []
+        for prepared, upload_id in zip(items, upload_ids):
+            width, height = prepared["image_size"]
+            children_metadata.append({
                 "upload_id": upload_id,
-                "bottom_camera_dial_selected": "11",
-                "publish_id": "1",
-                "original_width": str(width),
+                "source_type": "4",
+                "timezone_offset": str(self.session_data.get("timezone_offset", 10800)),
                 "edits": {
-                    "filter_type": 0,
-                    "filter_strength": 1.0,
                     "crop_original_size": [float(width), float(height)],
-                    "crop_center": [-0.002429657, -0.06649882],
-                    "crop_zoom": 1.782934
+                    "crop_center": [0.0, -0.0],
+                    "crop_zoom": 1.0
                 },
                 "extra": {
                     "source_width": width,
                     "source_height": height
                 },
-                "device": {
-                    "manufacturer": device_settings.get('manufacturer', 'samsung'),
-                    "model": device_settings.get('model', 'SM-G991B'),
-                    "android_version": device_settings.get('android_version', 32),
-                    "android_release": device_settings.get('android_release', '12')
-                },
-                "overlay_data": []
-            }
-            
-            signed_body = InstagramEncryption.create_signed_body(post_data)
-            
+                "device": device
+            })
+        
+        sidecar_data = {
+            "camera_entry_point": "360",
+            "include_e2ee_mentioned_user_list": "1",
+            "hide_from_profile_grid": "false",
+            "timezone_offset": str(self.session_data.get("timezone_offset", 10800)),
+            "source_type": "4",
+            "_uid": user_id,
+            "device_id": self._get_device_specific_headers()["x-ig-android-id"],
+            "_uuid": self._get_device_specific_headers()["x-ig-device-id"],
+            "creation_logger_session_id": str(uuid.uuid4()),
+            "nav_chain": f"MainFeedFragment:feed_timeline:1:cold_start:{int(time.time() * 1000)}:::,GalleryPickerFragment:gallery_picker:50:camera_tab_bar:{int(time.time() * 1000)}:::,PhotoFilterFragment:photo_filter:51:button:{int(time.time() * 1000)}::",
+            "caption": caption,
+            "audience": "default",
+            "client_sidecar_id": sidecar_id,
+            "upload_id": sidecar_id,
+            "children_metadata": children_metadata,
+            "device": device
+        }
+        
+        return InstagramEncryption.create_signed_body(sidecar_data)
+    
+    def _send_configure(self, url: str, signed_body: str, endpoint: str, friendly_name: str, label: str) -> dict:
+        """Envoyer un configure déjà signé (headers construits au moment de l'envoi)"""
+        try:
             headers = self._build_complete_headers(
-                endpoint="post_configure",
-                friendly_name="IgApi: media/configure/"
+                endpoint=endpoint,
+                friendly_name=friendly_name
             )
             
             response = self.auth.session.post(
-                "https://i.instagram.com/api/v1/media/configure/",
+                url,
                 headers=headers,
                 data={"signed_body": signed_body},
                 timeout=15
@@ -1790,7 +2437,7 @@ class InstagramClient:
                 if InstagramEncryption.is_success_response(response, parsed_data):
                     return {"success": True, "data": parsed_data}
                 else:
-                    print(f"❌ Erreur configuration post: {parsed_data}")
+                    print(f"❌ Erreur configuration {label}: {parsed_data}")
                     return {"success": False, "error": parsed_data}
             else:
                 if response.status_code == 400:
@@ -1802,12 +2449,23 @@ class InstagramClient:
                                             InstagramEncryption.safe_decode_response(response))
                 
         except Exception as e:
-            return {"success": False, "error": f"Erreur configuration post: {str(e)}"}
+            return {"success": False, "error": f"Erreur configuration {label}: {str(e)}"}
     
-    def _update_media_pdq_hash(self, upload_id: str, image_data: bytes, user_id: str) -> dict:
+    def _publish_pdq_hash(self, upload_id: str, image_data, user_id: str, pdq_hash, release: bool) -> dict:
+        """Mise à jour PDQ d'arrière-plan (pdq_hash: valeur ou Future), puis fermeture de la projection si release"""
+        try:
+            if isinstance(pdq_hash, Future):
+                pdq_hash = pdq_hash.result()
+            return self._update_media_pdq_hash(upload_id, image_data, user_id, pdq_hash)
+        finally:
+            if release:
+                MediaProcessor.release_media(image_data)
+    
+    def _update_media_pdq_hash(self, upload_id: str, image_data: bytes, user_id: str, pdq_hash: str = None) -> dict:
         """Mettre à jour le média avec le hash PDQ"""
         try:
-            pdq_hash = MediaProcessor.generate_pdq_hash(image_data)
+            if not pdq_hash:
+                pdq_hash = MediaProcessor.generate_pdq_hash(image_data)
             
             pdq_data = {
                 "pdq_hash_info": f'[{{"pdq_hash":"{pdq_hash}","frame_time":0}}]',
@@ -1873,6 +2531,7 @@ class InstagramClient:
                 if (isinstance(parsed_data, dict) and 
                     (parsed_data.get("did_delete") == True or 
                      InstagramEncryption.is_success_response(response, parsed_data))):
+                    self._invalidate_cached("media_info", media_id)
                     return {"success": True, "data": parsed_data}
                 else:
                     print(f"❌ Erreur suppression: {parsed_data}")
@@ -1890,6 +2549,8 @@ class InstagramClient:
             return {"success": False, "error": f"Erreur suppression: {str(e)}"}
     
     # MÉTHODES SUPPLÉMENTAIRES POUR COMPATIBILITÉ COMPLÈTE
+    @accepts_deadline
+    @session_guard
     def get_media_info(self, media_input: str) -> dict:
         """Récupérer informations d'un média"""
         try:
@@ -1901,6 +2562,11 @@ class InstagramClient:
             if not media_id:
                 return {"success": False, "error": "Media ID non trouvé"}
             
+            if self.response_cache is not None:
+                cached = self.response_cache.get("media_info", media_id)
+                if cached is not None:
+                    return {"success": True, "data": cached}
+            
             headers = self._build_complete_headers(
                 endpoint="media_info",
                 friendly_name=f"IgApi: media/{media_id}/info/"
@@ -1919,18 +2585,18 @@ class InstagramClient:
                     items = parsed_data.get("items", [])
                     if items:
                         media = items[0]
-                        return {
-                            "success": True,
-                            "data": {
-                                "id": media.get("id"),
-                                "code": media.get("code"),
-                                "media_type": media.get("media_type"),
-                                "like_count": media.get("like_count", 0),
-                                "comment_count": media.get("comment_count", 0),
-                                "caption": media.get("caption", {}).get("text", "") if media.get("caption") else "",
-                                "owner": media.get("user", {})
-                            }
+                        media_data = {
+                            "id": media.get("id"),
+                            "code": media.get("code"),
+                            "media_type": media.get("media_type"),
+                            "like_count": media.get("like_count", 0),
+                            "comment_count": media.get("comment_count", 0),
+                            "caption": media.get("caption", {}).get("text", "") if media.get("caption") else "",
+                            "owner": media.get("user", {})
                         }
+                        if self.response_cache is not None:
+                            self.response_cache.put("media_info", media_id, media_data)
+                        return {"success": True, "data": media_data}
                 else:
                     return self.handle_action_error(response.status_code, parsed_data,
                                                  InstagramEncryption.safe_decode_response(response))
@@ -1941,6 +2607,8 @@ class InstagramClient:
         except Exception as e:
             return {"success": False, "error": f"Erreur: {str(e)}"}
     
+    @accepts_deadline
+    @session_guard
     def get_user_media_list(self, user_input: str, count: int = 20) -> dict:
         """Récupérer la liste des médias d'un utilisateur"""
         try:
@@ -2005,6 +2673,8 @@ class InstagramClient:
         except Exception as e:
             return {"success": False, "error": f"Erreur: {str(e)}"}
     
+    @accepts_deadline
+    @session_guard
     def get_user_info(self, user_input: str) -> dict:
         """Récupérer informations d'un utilisateur"""
         try:
@@ -2049,6 +2719,8 @@ class InstagramClient:
         except Exception as e:
             return {"success": False, "error": f"Erreur: {str(e)}"}
     
+    @accepts_deadline
+    @session_guard
     def unlike_post(self, media_input: str) -> dict:
         """Unliker un post Instagram"""
         try:
@@ -2091,6 +2763,7 @@ class InstagramClient:
                 parsed_data = InstagramEncryption.safe_parse_json(response)
                 
                 if InstagramEncryption.is_success_response(response, parsed_data):
+                    self._invalidate_cached("media_info", media_id)
                     return {"success": True, "data": parsed_data}
                 else:
                     return self.handle_action_error(response.status_code, parsed_data,
@@ -2107,6 +2780,8 @@ class InstagramClient:
         except Exception as e:
             return {"success": False, "error": "Ce media a ete supprime"}
     
+    @accepts_deadline
+    @session_guard
     def unfollow_user(self, user_input: str) -> dict:
         """Ne plus suivre un utilisateur"""
         try:
@@ -2157,6 +2832,8 @@ class InstagramClient:
                 parsed_data = InstagramEncryption.safe_parse_json(response)
                 
                 if InstagramEncryption.is_success_response(response, parsed_data):
+                    self._invalidate_cached("user_info", user_id)
+                    self._invalidate_cached("user_info", current_user_id)
                     return {"success": True, "data": parsed_data}
                 else:
                     return self.handle_action_error(response.status_code, parsed_data,
@@ -2174,6 +2851,8 @@ class InstagramClient:
             return {"success": False, "error": "Utilisateur introuvable"}
     
     # Méthodes supplémentaires pour la compatibilité complète...
+    @accepts_deadline
+    @session_guard
     def delete_comment(self, media_input: str, comment_id: str) -> dict:
         """Supprimer un commentaire"""
         try:
@@ -2213,6 +2892,7 @@ class InstagramClient:
                 parsed_data = InstagramEncryption.safe_parse_json(response)
                 
                 if InstagramEncryption.is_success_response(response, parsed_data):
+                    self._invalidate_cached("media_info", media_id)
                     return {"success": True, "data": parsed_data}
                 else:
                     return self.handle_action_error(response.status_code, parsed_data,
@@ -2230,6 +2910,8 @@ class InstagramClient:
             return {"success": False, "error": f"Erreur: {str(e)}"}
     
     # Méthodes pour récupérer les followers, following, etc. avec headers complets
+    @accepts_deadline
+    @session_guard
     def get_followers(self, user_input: str = None, count: int = 20) -> dict:
         """Récupérer la liste des abonnés"""
         try:
@@ -2290,6 +2972,8 @@ class InstagramClient:
         except Exception as e:
             return {"success": False, "error": f"Erreur: {str(e)}"}
     
+    @accepts_deadline
+    @session_guard
     def get_following(self, user_input: str = None, count: int = 20) -> dict:
         """Récupérer la liste des abonnements"""
         try:
@@ -2350,6 +3034,8 @@ class InstagramClient:
         except Exception as e:
             return {"success": False, "error": f"Erreur: {str(e)}"}
     
+    @accepts_deadline
+    @session_guard
     def search_users(self, query: str, count: int = 20) -> dict:
         """Rechercher des utilisateurs"""
         try:
@@ -2401,6 +3087,8 @@ class InstagramClient:
         except Exception as e:
             return {"success": False, "error": f"Erreur: {str(e)}"}
     
+    @accepts_deadline
+    @session_guard
     def get_media_comments(self, media_input: str, count: int = 20) -> dict:
         """Récupérer les commentaires d'un média"""
         try:
@@ -2461,6 +3149,8 @@ class InstagramClient:
         except Exception as e:
             return {"success": False, "error": f"Erreur: {str(e)}"}
     
+    @accepts_deadline
+    @session_guard
     def get_media_likers(self, media_input: str, count: int = 20) -> dict:
         """Récupérer les utilisateurs qui ont liké un média"""
         try:
@@ -2512,6 +3202,8 @@ class InstagramClient:
         except Exception as e:
             return {"success": False, "error": f"Erreur: {str(e)}"}
     
+    @accepts_deadline
+    @session_guard
     def get_timeline_feed(self, count: int = 20) -> dict:
         """Récupérer le feed timeline"""
         try:
@@ -18,7 +18,8 @@ from .errors import (
     InvalidCredentialsError,
     PasswordIncorrectError,
     UserNotFoundError,
-    LicenseError
+    LicenseError,
+    DeadlineExceededError
 )
 
 __all__ = [
@@ -35,5 +36,6 @@ __all__ = [
     'InvalidCredentialsError',
     'PasswordIncorrectError',
     'UserNotFoundError',
-    'LicenseError'
+    'LicenseError',
+    'DeadlineExceededError'
 ]
@@ -113,3 +113,9 @@ class CheckpointRequiredError(ChallengeError):
     """Erreur checkpoint requis"""
     def __init__(self, message: str, checkpoint_url: str = None):
         super().__init__(message, challenge_url=checkpoint_url, challenge_type="checkpoint")
+
+class DeadlineExceededError(InstagramError):
+    """Erreur budget de temps de l'opération épuisé"""
+    def __init__(self, message: str, budget: float = None):
+        super().__init__(message, error_code="deadline_exceeded")
+        self.budget = budget
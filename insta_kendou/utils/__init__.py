@@ -4,18 +4,74 @@ Module utilitaires pour insta_kendou
 Gestion des devices, encryption, médias et résolution d'URLs
 """
 
+from .breaker import SessionCircuitBreaker
+from .deadline import Deadline, accepts_deadline, current_deadline, deadline_sleep, remaining_timeout, timeout_override
 from .device import DeviceManager, get_optimal_encoding_for_environment, detect_termux_environment
 from .encryption import InstagramEncryption
-from .media import MediaProcessor
+from . import fast_json
+from .payload import FIELD, SignedBodyTemplate, bloks_form_suffix
+from .bloks import BloksScan, scan_bloks, find_embedded_json
+from .media import MediaProcessor, UploadStream
+from .media_cache import PreparedMediaCache
+from .metrics import MetricsRegistry, LatencyHistogram
+from .persistence import atomic_write_json, atomic_update_json, CoalescingWriter, flush_pending_writes
+from .response_cache import ResponseCache
+from .retry import RetryPolicy
+from .session_store import SessionStore, JSONSessionStore, SQLiteSessionStore, migrate_json_sessions, list_sessions
+from .timeouts import AdaptiveTimeoutPolicy
+from .throttle import ServerAwareThrottle, TokenBucket
+from .tracing import Tracer, JSONLSpanExporter, InMemorySpanExporter, span, traced
+from .transport import ThreadSafeCookieJar, TransportAdapter, create_session, get_transport_adapter
 from .url_resolver import URLResolver
 from .license import validate_license, LicenseError
 
 __all__ = [
+    'SessionCircuitBreaker',
+    'Deadline',
+    'accepts_deadline',
+    'current_deadline',
+    'deadline_sleep',
+    'remaining_timeout',
+    'timeout_override',
     'DeviceManager',
     'get_optimal_encoding_for_environment',
     'detect_termux_environment',
     'InstagramEncryption',
+    'fast_json',
+    'FIELD',
+    'SignedBodyTemplate',
+    'bloks_form_suffix',
+    'BloksScan',
+    'scan_bloks',
+    'find_embedded_json',
     'MediaProcessor',
+    'PreparedMediaCache',
+    'UploadStream',
+    'MetricsRegistry',
+    'LatencyHistogram',
+    'atomic_write_json',
+    'atomic_update_json',
+    'CoalescingWriter',
+    'flush_pending_writes',
+    'ResponseCache',
+    'RetryPolicy',
+    'SessionStore',
+    'JSONSessionStore',
+    'SQLiteSessionStore',
+    'migrate_json_sessions',
+    'list_sessions',
+    'ThreadSafeCookieJar',
+    'AdaptiveTimeoutPolicy',
+    'ServerAwareThrottle',
+    'TokenBucket',
+    'Tracer',
+    'JSONLSpanExporter',
+    'InMemorySpanExporter',
+    'span',
+    'traced',
+    'TransportAdapter',
+    'create_session',
+    'get_transport_adapter',
     'URLResolver',
     'validate_license',
     'LicenseError'
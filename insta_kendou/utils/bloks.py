@@ -0,0 +1,380 @@
+# -*- coding: utf-8 -*-
+"""
+Analyse structurée des réponses Bloks (2FA / challenges, JSON imbriqué des réponses de connexion)
+Chaînes longues relevées en un seul parcours octet, le reste ancré sur des littéraux (str.find) sans rescanner la réponse
+"""
+
+import re
+import json
+from . import fast_json
+
+_RUN_CHARS = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=_-"
+_MIN_RUN = 500
+
+# Caractères de [A-Za-z0-9+/=_-] => 'a', tout le reste => ' ' (octets UTF-8 non ASCII compris)
+_RUN_TABLE = bytes(ord('a') if byte in _RUN_CHARS else ord(' ') for byte in range(256))
+_RUN_NEEDLE = b"a" * _MIN_RUN
+
+_RUN = re.compile(r'[A-Za-z0-9+/=_-]*')
+_SUFFIX = re.compile(r'\|([a-zA-Z]+)')
+_SUFFIX_BYTES = re.compile(rb'\|([a-zA-Z]+)')
+_CONTEXT_SEPARATORS = re.compile(r'["\\\s:]*')
+
+_INTERNATIONAL_PHONE = re.compile(r'\+\d{1,3}\s+\*+\s+\*+\s+\*+\s+\d{2}')
+_EMAIL_DOMAIN = re.compile(r'@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+_EMAIL_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789")
+
+_WHATSAPP_INDICATORS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'"SOWA"',
+    r'"google_oauth_token":\s*"true"',
+    r'WhatsApp'
+))
+
+class BloksScan:
+    """Analyse paresseuse d'une réponse Bloks; chaque information n'est calculée qu'une fois
+    
+    Les résultats sont identiques aux anciennes recherches re.findall de BloksManager
+    et AlternativeManager (mêmes règles de correspondance la plus à gauche).
+    
+    Seules les chaînes longues (runs) sont relevées en un parcours unique. Numéros,
+    indices WhatsApp, '@' et mots-clés restent des recherches séparées, chacune ancrée
+    sur un littéral (recherche rapide de re / str.find) et faite à la demande: une
+    alternative unique parcourue par re.finditer essaie chaque position et s'est
+    révélée plus de dix fois plus lente (benchmarks/bench_bloks.py).
+    """
+    
+    def __init__(self, text: str):
+        self.text = text
+        self._runs = None
+        self._phones = None
+        self._email_candidates = None
+        self._emails = None
+        self._occurrences = {}
+    
+    @property
+    def runs(self) -> list:
+        """Chaînes [A-Za-z0-9+/=_-] de 500+ caractères: (début, fin, valeur, suffixe |lettres ou None, fin du suffixe)
+        
+        Positions en octets UTF-8 (utilisées seulement pour ordonner les chaînes entre elles).
+        """
+        if self._runs is None:
+            raw = self.text.encode('utf-8', 'surrogatepass')
+            mapped = raw.translate(_RUN_TABLE)
+            runs = []
+            position = 0
+            
+            while True:
+                start = mapped.find(_RUN_NEEDLE, position)
+                if start == -1:
+                    break
+                end = mapped.find(b" ", start + _MIN_RUN)
+                if end == -1:
+                    end = len(mapped)
+                
+                suffix, suffix_end = None, end
+                match = _SUFFIX_BYTES.match(raw, end)
+                if match:
+                    suffix, suffix_end = match.group(1).decode('ascii'), match.end()
+                
+                runs.append((start, end, raw[start:end].decode('ascii'), suffix, suffix_end))
+                position = end
+            
+            self._runs = runs
+        return self._runs
+    
+    @property
+    def phones(self) -> list:
+        """Numéros internationaux masqués (+XXX ** ** *** NN): (début, valeur)"""
+        if self._phones is None:
+            self._phones = [(match.start(), match.group()) for match in _INTERNATIONAL_PHONE.finditer(self.text)]
+        return self._phones
+    
+    @property
+    def emails(self) -> list:
+        """Emails masqués (a***b@domaine.tld) sans chevauchement, dans l'ordre du texte"""
+        if self._emails is None:
+            emails = []
+            end = 0
+            for start, email_end, value in self._candidate_emails():
+                if start >= end:
+                    emails.append(value)
+                    end = email_end
+            self._emails = emails
+        return self._emails
+    
+    def _candidate_emails(self) -> list:
+        """Un candidat au plus par '@': (début, fin, valeur), chevauchements compris"""
+        if self._email_candidates is None:
+            text = self.text
+            candidates = []
+            at = text.find('@')
+            
+            while at != -1:
+                domain = _EMAIL_DOMAIN.match(text, at)
+                if domain:
+                    # Partie locale lue à rebours: lettres/chiffres, étoiles, une lettre/chiffre
+                    name_start = at
+                    while name_start > 0 and text[name_start - 1] in _EMAIL_CHARS:
+                        name_start -= 1
+                    stars_start = name_start
+                    while stars_start > 0 and text[stars_start - 1] == '*':
+                        stars_start -= 1
+                    if name_start < at and 0 < stars_start < name_start and text[stars_start - 1] in _EMAIL_CHARS:
+                        candidates.append((stars_start - 1, domain.end(), text[stars_start - 1:domain.end()]))
+                at = text.find('@', at + 1)
+            
+            self._email_candidates = candidates
+        return self._email_candidates
+    
+    def occurrences(self, word: str) -> list:
+        """Positions de début de word (sensible à la casse)"""
+        positions = self._occurrences.get(word)
+        if positions is None:
+            text = self.text
+            positions = []
+            index = text.find(word)
+            while index != -1:
+                positions.append(index)
+                index = text.find(word, index + len(word))
+            self._occurrences[word] = positions
+        return positions
+    
+    def _token_at(self, position: int):
+        """Chaîne de 500+ caractères (suffixe |lettres compris) commençant à position: (valeur, fin) ou None"""
+        text = self.text
+        end = _RUN.match(text, position).end()
+        if end - position < _MIN_RUN:
+            return None
+        suffix = _SUFFIX.match(text, end)
+        if suffix:
+            end = suffix.end()
+        return text[position:end], end
+    
+    def _quoted_token_after(self, keyword: str, json_key: bool) -> str:
+        """Première valeur "..." de 500+ caractères suivant keyword ("keyword" si json_key)"""
+        text = self.text
+        for index in self.occurrences(keyword):
+            end = index + len(keyword)
+            if json_key and (index == 0 or text[index - 1] != '"' or text[end:end + 1] != '"'):
+                continue
+            quote = text.find('"', end + 1 if json_key else end)
+            if quote == -1:
+                break
+            token = self._token_at(quote + 1)
+            if token and text[token[1]:token[1] + 1] == '"':
+                return token[0]
+        return None
+    
+    def bloks_context_data(self) -> str:
+        """context_data selon les règles de BloksManager (None si absent)"""
+        # 1. Chaîne longue suffixée (|aplrr...): la plus longue
+        best = None
+        consumed = 0
+        for start, end, value, suffix, suffix_end in self.runs:
+            if start < consumed:
+                # Chaîne commençant dans le suffixe précédent: elle ne démarre qu'après lui
+                if end - consumed < _MIN_RUN:
+                    continue
+                value = value[consumed - start:]
+            if suffix:
+                candidate = value + '|' + suffix
+                if best is None or len(candidate) > len(best):
+                    best = candidate
+                consumed = suffix_end
+        if best:
+            return best
+        
+        # 2. Valeur entre guillemets après "context_data" (forme JSON, puis forme libre)
+        for json_key in (True, False):
+            candidate = self._quoted_token_after("context_data", json_key)
+            if candidate and len(candidate) > _MIN_RUN:
+                return candidate
+        
+        # 3. Valeur entre guillemets dans un array.Make: la plus longue
+        text = self.text
+        longest = None
+        for index in self.occurrences("array.Make"):
+            quote = text.find('"', index + len("array.Make"))
+            if quote == -1:
+                break
+            token = self._token_at(quote + 1)
+            if token and text[token[1]:token[1] + 1] == '"' and (longest is None or len(token[0]) > len(longest)):
+                longest = token[0]
+        if longest and len(longest) > _MIN_RUN:
+            return longest
+        
+        # 4. Plus longue chaîne ressemblant à un context_data (base64 de plus de 1000 caractères)
+        for run in sorted(self.runs, key=lambda run: run[1] - run[0], reverse=True):
+            value = run[2]
+            if len(value) > 1000 and value.count('+') > 5 and value.count('/') > 5:
+                return value + '|aplrr'
+        
+        return None
+    
+    def alternative_context_data(self) -> str:
+        """context_data selon les règles d'AlternativeManager (None si absent)"""
+        candidate = self._quoted_token_after("context_data", True)
+        if candidate and len(candidate) > _MIN_RUN:
+            return candidate
+        
+        text = self.text
+        for index in self.occurrences("context_data"):
+            separators_end = _CONTEXT_SEPARATORS.match(text, index + len("context_data")).end()
+            token = self._token_at(separators_end)
+            if token:
+                if len(token[0]) > _MIN_RUN:
+                    return token[0]
+                break
+        
+        for _, _, value, suffix, _ in self.runs:
+            if suffix and len(suffix) >= 4:
+                return value + '|' + suffix
+        
+        return None
+    
+    def phones_after_keyword(self, keyword: str) -> list:
+        """Numéros précédés de keyword sur la même ligne (équivalent de findall(keyword + '.*?(numéro)'))"""
+        return self._after_keyword(keyword, self.phones)
+    
+    def emails_after_keyword(self, keyword: str) -> list:
+        """Emails précédés de keyword sur la même ligne (équivalent de findall(keyword + '.*?(email)'))"""
+        return self._after_keyword(keyword, self._candidate_emails())
+    
+    def _after_keyword(self, keyword: str, items: list) -> list:
+        text = self.text
+        found = []
+        position = 0
+        item_index = 0
+        
+        for index in self.occurrences(keyword):
+            if index < position:
+                continue
+            end = index + len(keyword)
+            while item_index < len(items) and items[item_index][0] < end:
+                item_index += 1
+            if item_index == len(items):
+                break
+            start, value = items[item_index][0], items[item_index][-1]
+            if text.find('\n', end, start) != -1:
+                continue
+            found.append(value)
+            position = start + len(value)
+        return found
+    
+    def phone_endings(self, country_code: str) -> list:
+        """Terminaisons (2 chiffres) des numéros masqués de l'indicatif donné, avec ou sans +"""
+        return re.findall(re.escape(country_code) + r'\s+\*+\s+\*+\s+\*+\s+(\d{2})', self.text)
+    
+    def has_whatsapp_indicator(self) -> bool:
+        """Indicateur WhatsApp: "SOWA", WhatsApp ou "google_oauth_token": "true" (sans tenir compte de la casse)"""
+        return any(indicator.search(self.text) for indicator in _WHATSAPP_INDICATORS)
+
+_DECODER = json.JSONDecoder()
+_MISSING = object()
+
+def find_embedded_json(node, key: str, depth: int = 6):
+    """Valeur de key dans un arbre Bloks décodé, chaînes JSON imbriquées comprises (None si absente)
+    
+    Les chaînes JSON (et les littéraux du code Bloks qui contiennent key) sont décodées
+    par le décodeur JSON, au plus depth niveaux d'échappement; une valeur str contenant
+    du JSON est rendue décodée.
+    """
+    if isinstance(node, dict):
+        if key in node:
+            return _decode_embedded(node[key], depth)
+        children = node.values()
+    elif isinstance(node, list):
+        children = node
+    elif isinstance(node, str):
+        return _find_in_text(node, key, depth) if key in node else None
+    else:
+        return None
+    
+    for child in children:
+        found = find_embedded_json(child, key, depth)
+        if found is not None:
+            return found
+    return None
+
+def _decode_embedded(value, depth: int):
+    """Décoder une valeur JSON encodée en chaîne (éventuellement plusieurs fois)"""
+    while isinstance(value, str) and depth > 0 and value.lstrip()[:1] in ('{', '[', '"'):
+        try:
+            value = fast_json.loads(value)
+        except ValueError:
+            # Contenu d'un littéral JSON privé de ses guillemets: {\"clé\": ...}
+            if '\\"' not in value:
+                break
+            try:
+                value = fast_json.loads('"' + value + '"')
+            except ValueError:
+                break
+        depth -= 1
+    return value
+
+def _unescaped_quote_before(text: str, index: int) -> int:
+    """Dernier guillemet non échappé avant index (-1 si aucun)"""
+    quote = text.rfind('"', 0, index)
+    while quote != -1:
+        backslashes = 0
+        while quote - backslashes > 0 and text[quote - backslashes - 1] == '\\':
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return quote
+        quote = text.rfind('"', 0, quote)
+    return -1
+
+def _value_after_key(text: str, position: int):
+    """Valeur JSON suivant une clé ("clé": valeur) à partir de position"""
+    length = len(text)
+    while position < length and text[position].isspace():
+        position += 1
+    if text[position:position + 1] != ':':
+        return _MISSING
+    position += 1
+    while position < length and text[position].isspace():
+        position += 1
+    try:
+        return _DECODER.raw_decode(text, position)[0]
+    except ValueError:
+        return _MISSING
+
+def _find_in_text(text: str, key: str, depth: int):
+    """key dans un texte JSON ou dans du code Bloks (littéraux "..." décodés un niveau à la fois)"""
+    if depth <= 0:
+        return None
+    if text.lstrip()[:1] in ('{', '['):
+        try:
+            return find_embedded_json(fast_json.loads(text), key, depth - 1)
+        except ValueError:
+            pass
+    
+    quoted_key = '"' + key + '"'
+    index = text.find(key)
+    while index != -1:
+        # Guillemet ouvrant le plus proche: celui de la clé elle-même, sinon celui du littéral qui la contient
+        quote = _unescaped_quote_before(text, index)
+        if quote == index - 1 and text.startswith(quoted_key, quote):
+            value = _value_after_key(text, quote + len(quoted_key))
+            if value is not _MISSING:
+                return _decode_embedded(value, depth)
+        elif quote != -1:
+            try:
+                literal, literal_end = _DECODER.raw_decode(text, quote)
+            except ValueError:
+                literal, literal_end = None, index
+            if isinstance(literal, str) and key in literal:
+                found = _find_in_text(literal, key, depth - 1)
+                if found is not None:
+                    return found
+            index = max(index, literal_end - len(key))
+        index = text.find(key, index + len(key))
+    return None
+
+def scan_bloks(text: str) -> BloksScan:
+    """Analyser une réponse Bloks
+    
+    Aucun cache global: l'appelant transmet le BloksScan aux extractions suivantes
+    de la même réponse (paramètre scan des gestionnaires 2FA).
+    """
+    return BloksScan(text)
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Disjoncteur de session: échec immédiat une fois la session invalidée
+Ouvert sur login_required, compte suspendu ou désactivé jusqu'au rechargement de la session
+"""
+
+import time
+from ..exceptions import LoginRequiredError, AccountSuspendedError, AccountDisabledError
+from .throttle import endpoint_family
+
+LOGIN_REQUIRED = "login_required"
+SUSPENDED = "suspended"
+DISABLED = "disabled"
+
+def classify_session_failure(content: bytes) -> str:
+    """Classer un corps de réponse d'erreur (login_required, suspended, disabled ou None)"""
+    content = content.lower()
+    if b"/accounts/suspended/" in content:
+        return SUSPENDED
+    if b"/accounts/disabled/" in content:
+        return DISABLED
+    if b"login_required" in content or b"user_has_logged_out" in content:
+        return LOGIN_REQUIRED
+    return None
+
+class SessionCircuitBreaker:
+    """Disjoncteur par session branché sur TransportAdapter (observer + before_send)
+    
+    Fermé: les requêtes passent. Ouvert: check() et before_send lèvent l'exception typée
+    correspondant à la cause, sans construire ni envoyer de requête.
+    """
+    
+    def __init__(self, username: str = ""):
+        self.username = username
+        self.reason = None
+        self.opened_at = None
+        self.rejected = 0
+    
+    @property
+    def is_open(self) -> bool:
+        return self.reason is not None
+    
+    def trip(self, reason: str):
+        """Ouvrir le disjoncteur (la première cause est conservée)"""
+        if self.reason is None:
+            self.reason = reason
+            self.opened_at = time.time()
+    
+    def reset(self):
+        """Refermer le disjoncteur (session rechargée ou reconnectée)"""
+        self.reason = None
+        self.opened_at = None
+    
+    def check(self):
+        """Lever l'exception typée si le disjoncteur est ouvert"""
+        reason = self.reason
+        if reason is None:
+            return
+        
+        self.rejected += 1
+        username = self.username
+        if reason == SUSPENDED:
+            raise AccountSuspendedError(f"Le compte @{username} est suspendu, veuillez le régler manuellement",
+                                        username=username)
+        if reason == DISABLED:
+            raise AccountDisabledError(f"Le compte @{username} est désactivé et ne peut plus être utilisé",
+                                       username=username)
+        raise LoginRequiredError(f"Le compte @{username} est déconnecté, veuillez vous reconnecter", username=username)
+    
+    def before_send(self, request, send_kwargs: dict):
+        """Hook before_send: refuser localement les requêtes d'une session invalide (connexion exceptée)"""
+        if self.reason is not None and endpoint_family(request) is not None:
+            self.check()
+    
+    def observe(self, request, response, error, elapsed: float):
+        """Observer: ouvrir le disjoncteur sur les réponses login_required / suspendu / désactivé"""
+        if response is None or response.status_code < 400 or endpoint_family(request) is None:
+            return
+        reason = classify_session_failure((response.content or b"")[:8192])
+        if reason is not None:
+            self.trip(reason)
+    
+    def get_state(self) -> dict:
+        return {"open": self.is_open, "reason": self.reason, "opened_at": self.opened_at, "rejected": self.rejected}
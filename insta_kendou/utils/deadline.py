@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Budget de temps (deadline) propagé à toutes les requêtes d'une opération logique
+Chaque requête utilise le temps restant comme timeout et échoue immédiatement une fois le budget épuisé
+"""
+
+import time
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from ..exceptions import DeadlineExceededError
+
+# Deadline active du contexte courant (thread ou tâche)
+_current_deadline = contextvars.ContextVar("insta_kendou_deadline", default=None)
+
+# Timeout imposé aux requêtes du contexte courant (prioritaire sur les timeouts codés et adaptatifs)
+_timeout_override = contextvars.ContextVar("insta_kendou_timeout_override", default=None)
+
+class Deadline:
+    """Budget de temps d'une opération (horloge monotone), à utiliser avec with
+    
+    Une deadline imbriquée ne peut pas prolonger la deadline englobante. Un même objet
+    peut être utilisé depuis plusieurs threads (ex: deadline partagée par un lot d'appels).
+    """
+    
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+        self._tokens = threading.local()
+    
+    def remaining(self) -> float:
+        """Secondes restantes (négatif si dépassé)"""
+        return self.expires_at - time.monotonic()
+    
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+    
+    def check(self):
+        """Lever DeadlineExceededError si le budget est épuisé"""
+        if self.remaining() <= 0:
+            raise DeadlineExceededError(f"Délai de {self.budget:g}s dépassé", budget=self.budget)
+    
+    def clamp(self, timeout):
+        """Borner un timeout requests (nombre, tuple (connect, read) ou None) par le temps restant"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError(f"Délai de {self.budget:g}s dépassé", budget=self.budget)
+        
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if value is None else min(value, remaining) for value in timeout)
+        return min(timeout, remaining)
+    
+    def __enter__(self):
+        outer = _current_deadline.get()
+        active = outer if outer is not None and outer.expires_at <= self.expires_at else self
+        stack = getattr(self._tokens, "stack", None)
+        if stack is None:
+            stack = self._tokens.stack = []
+        stack.append(_current_deadline.set(active))
+        return active
+    
+    def __exit__(self, exc_type, exc, tb):
+        _current_deadline.reset(self._tokens.stack.pop())
+        return False
+
+def current_deadline() -> Deadline:
+    """Deadline active du contexte courant (None si aucune)"""
+    return _current_deadline.get()
+
+def current_timeout_override():
+    """Timeout imposé par timeout_override() dans le contexte courant (None si aucun)"""
+    return _timeout_override.get()
+
+@contextmanager
+def timeout_override(timeout):
+    """Imposer un timeout (secondes ou tuple (connect, read)) aux requêtes du bloc"""
+    token = _timeout_override.set(timeout)
+    try:
+        yield
+    finally:
+        _timeout_override.reset(token)
+
+def remaining_timeout(default):
+    """Timeout à utiliser pour une requête hors session (default borné par la deadline active)"""
+    override = _timeout_override.get()
+    if override is not None:
+        default = override
+    deadline = _current_deadline.get()
+    return default if deadline is None else deadline.clamp(default)
+
+def deadline_sleep(seconds: float):
+    """time.sleep qui échoue immédiatement si l'attente dépasse le budget restant"""
+    deadline = _current_deadline.get()
+    if deadline is not None and deadline.remaining() < seconds:
+        raise DeadlineExceededError(f"Délai de {deadline.budget:g}s insuffisant pour attendre {seconds:g}s",
+                                    budget=deadline.budget)
+    time.sleep(seconds)
+
+def accepts_deadline(func):
+    """Décorateur: ajoute le paramètre deadline (secondes ou Deadline) à une méthode publique"""
+    @functools.wraps(func)
+    def wrapper(*args, deadline=None, **kwargs):
+        if deadline is None:
+            return func(*args, **kwargs)
+        if not isinstance(deadline, Deadline):
+            deadline = Deadline(deadline)
+        with deadline:
+            return func(*args, **kwargs)
+    return wrapper
@@ -15,8 +15,11 @@ import random
 import subprocess
 import requests
 import re
+import threading
 from .encryption import InstagramEncryption
 from .license import validate_license
+from .persistence import CoalescingWriter
+from . import fast_json
 
 def detect_termux_environment():
     """Détecter si on est dans Termux pour adapter les headers"""
@@ -48,15 +51,38 @@ def get_optimal_encoding_for_environment():
 class DeviceManager:
     """Gestionnaire des informations du device Android réel avec MID Instagram récupération améliorée"""
     
-    def __init__(self):
+    # Champs indispensables à la construction des headers
+    REQUIRED_DEVICE_FIELDS = ('user_agent', 'android_id', 'device_uuid', 'family_device_id', 'connection_type')
+    
+    def __init__(self, device_info: dict = None):
         # Validation licence obligatoire
         if not validate_license():
             raise PermissionError("Ce script n'est pas autorisé à utiliser cette bibliothèque. Veuillez contacter le créateur via: 0389561802 ou https://t.me/Kenny5626")
         
+        if device_info is not None:
+            # Device fourni en mémoire: aucun accès disque, sous-processus ou réseau
+            missing = [field for field in self.REQUIRED_DEVICE_FIELDS if not device_info.get(field)]
+            if missing:
+                raise ValueError(f"Infos device incomplètes, champs manquants: {', '.join(missing)}")
+            
+            self.device_file = None
+            self.device_info = dict(device_info)
+            self._device_writer = None
+            self._mid_lock = threading.Lock()
+            return
+        
+        self._mid_lock = threading.Lock()
         self.device_file = "ig_device.json"
         self.device_info = {}
+        # Écritures atomiques regroupées (plusieurs mises à jour rapprochées = une écriture)
+        self._device_writer = CoalescingWriter(self.device_file, delay=0.5, indent=2)
         self.load_or_create_device_info()
     
+    @classmethod
+    def from_device_info(cls, device_info: dict) -> "DeviceManager":
+        """Construire un DeviceManager depuis des infos device en mémoire (non persistées)"""
+        return cls(device_info=device_info)
+    
     def get_real_android_device_info(self):
         """Récupérer les vraies informations du device Android depuis Termux"""
         device_info = {}
@@ -195,7 +221,7 @@ class DeviceManager:
                 
                 # Chercher MID dans les données JSON
                 try:
-                    data = json.loads(content)
+                    data = fast_json.loads(content)
                     
                     # Chercher dans différents emplacements possibles
                     mid_locations = [
@@ -326,7 +352,7 @@ class DeviceManager:
                 
                 # Puis dans le JSON de réponse
                 try:
-                    data = json.loads(content)
+                    data = fast_json.loads(content)
                     if isinstance(data, dict):
                         for key, value in data.items():
                             if ('mid' in key.lower() or 'machine' in key.lower()) and isinstance(value, str) and len(value) > 15:
@@ -362,7 +388,7 @@ class DeviceManager:
         if os.path.exists(self.device_file):
             try:
                 with open(self.device_file, 'r', encoding='utf-8') as f:
-                    loaded_info = json.load(f)
+                    loaded_info = fast_json.load(f)
                 
                 # Vérifier si le MID existe et n'est pas le défaut statique
                 current_mid = loaded_info.get('x_mid', '')
@@ -385,11 +411,15 @@ class DeviceManager:
         self.device_info = device_info
         self.save_device_info()
     
-    def save_device_info(self):
-        """Sauvegarder les infos device"""
+    def save_device_info(self, immediate: bool = False):
+        """Sauvegarder les infos device (écriture différée et atomique, immédiate si demandé)"""
+        if self._device_writer is None:
+            return
+        
         try:
-            with open(self.device_file, 'w', encoding='utf-8') as f:
-                json.dump(self.device_info, f, indent=2, ensure_ascii=False)
+            self._device_writer.schedule(self.device_info)
+            if immediate:
+                self._device_writer.flush()
         except Exception as e:
             print(f"⚠️ Erreur sauvegarde device: {e}")
     
@@ -399,11 +429,16 @@ class DeviceManager:
         if mid and len(mid) > 15:
             return mid
         
-        # Si pas de MID valide, en récupérer un nouveau
-        new_mid = self.get_instagram_mid_from_web(self.device_info)
-        self.device_info['x_mid'] = new_mid
-        self.save_device_info()
-        return new_mid
+        # Si pas de MID valide, en récupérer un nouveau (un seul thread à la fois)
+        with self._mid_lock:
+            mid = self.device_info.get('x_mid', '')
+            if mid and len(mid) > 15:
+                return mid
+            
+            new_mid = self.get_instagram_mid_from_web(self.device_info)
+            self.device_info['x_mid'] = new_mid
+            self.save_device_info()
+            return new_mid
     
     def refresh_mid_if_needed(self):
         """Rafraîchir le MID si nécessaire (après erreurs Instagram)"""
@@ -412,10 +447,11 @@ class DeviceManager:
             
             # Si le MID est invalide, statique ou trop court
             if not current_mid or len(current_mid) < 15 or current_mid.startswith('aKqYqAABAAG') or current_mid.startswith('aKsWZwABAAG'):
-                new_mid = self.get_instagram_mid_from_web(self.device_info)
-                self.device_info['x_mid'] = new_mid
-                self.save_device_info()
-                return new_mid
+                with self._mid_lock:
+                    new_mid = self.get_instagram_mid_from_web(self.device_info)
+                    self.device_info['x_mid'] = new_mid
+                    self.save_device_info()
+                    return new_mid
             
             return current_mid
             
@@ -14,6 +14,13 @@ import random
 from Crypto.Cipher import AES
 from Crypto.Random import get_random_bytes
 from .license import validate_license
+from .tracing import traced
+from .deadline import remaining_timeout
+from . import fast_json
+
+# Clé secrète Instagram (extraite de l'APK); état HMAC initial calculé une fois puis copié par signature
+SIGNATURE_KEY = b"c9c5a5ba6b32e95562e5b3e95562e5b3"
+_SIGNATURE_HMAC = hmac.new(SIGNATURE_KEY, digestmod="sha256")
 
 class InstagramEncryption:
     """Gestionnaire du chiffrement Instagram avec décodage unifié pour tous les environnements"""
@@ -139,8 +146,7 @@ class InstagramEncryption:
             
             # Essayer de parser en JSON
             try:
-                import json
-                return json.loads(text)
+                return fast_json.loads(text)
             except json.JSONDecodeError:
                 # Si ce n'est pas du JSON valide, retourner le texte brut
                 return {
@@ -232,17 +238,17 @@ class InstagramEncryption:
             return f"Erreur extraction: {str(e)}"
     
     @staticmethod
+    @traced("encryption.get_public_keys")
     def get_public_keys() -> tuple:
         """Récupérer les clés publiques Instagram actuelles"""
         try:
-            response = requests.get('https://www.instagram.com/data/shared_data/', timeout=10)
+            response = requests.get('https://www.instagram.com/data/shared_data/', timeout=remaining_timeout(10))
             if response.status_code == 200:
                 import re
                 # Extraire les données de chiffrement depuis le HTML
                 match = re.search(r'"encryption":\s*\{[^}]+\}', response.text)
                 if match:
-                    import json
-                    encryption_data = json.loads('{' + match.group(0) + '}')
+                    encryption_data = fast_json.loads('{' + match.group(0) + '}')
                     encryption = encryption_data.get('encryption', {})
                     
                     key_id = encryption.get('key_id', 72)
@@ -257,6 +263,7 @@ class InstagramEncryption:
         return 72, 'b3a328ff28b785092af6a578767877514c93a690a11b9d92ba0ce614c9d5db57', 10
     
     @staticmethod
+    @traced("encryption.encrypt_password")
     def encrypt_password(password: str) -> str:
         """Chiffrer mot de passe avec AES-GCM + SealedBox (format Instagram Browser)"""
         try:
@@ -320,14 +327,16 @@ class InstagramEncryption:
     @staticmethod
     def generate_signature(data: str) -> str:
         """Générer signature HMAC pour signed_body"""
-        # Clé secrète Instagram (extraite de l'APK)
-        key = "c9c5a5ba6b32e95562e5b3e95562e5b3"
-        signature = hmac.new(key.encode(), data.encode(), hashlib.sha256).hexdigest()
-        return signature
+        mac = _SIGNATURE_HMAC.copy()
+        mac.update(data.encode())
+        return mac.hexdigest()
+    
+    @staticmethod
+    def sign_json(json_data: str) -> str:
+        """Signer un JSON compact déjà sérialisé (signature.json)"""
+        return f"{InstagramEncryption.generate_signature(json_data)}.{json_data}"
     
     @staticmethod
     def create_signed_body(data: dict) -> str:
         """Créer signed_body avec signature"""
-        json_data = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
-        signature = InstagramEncryption.generate_signature(json_data)
-        return f"{signature}.{json_data}"
+        return InstagramEncryption.sign_json(fast_json.dumps(data, separators=(',', ':'), ensure_ascii=False))
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Façade JSON: orjson ou ujson si installé, sinon json de la bibliothèque standard
+Sortie identique octet par octet à json.dumps (repli automatique sur json dans les cas non couverts)
+"""
+
+import re
+import json
+import math
+
+try:
+    import orjson
+    BACKEND = "orjson"
+except ImportError:
+    orjson = None
+    try:
+        # ujson: décodage uniquement (sa sortie n'est pas garantie identique à json.dumps)
+        import ujson
+        BACKEND = "ujson"
+    except ImportError:
+        ujson = None
+        BACKEND = "json"
+
+JSONDecodeError = json.JSONDecodeError
+
+_COMPACT = (',', ':')
+_INDENTED = (',', ': ')
+
+# Flottant dont le format diffère de repr(): exposant (1e16 vs 1e+16) ou < 1e-4 (0.00001 vs 1e-05) => repli sur json
+_EXPONENT = re.compile(rb'e[-\d]')
+_DIGITS = b"0123456789"
+_NUMBER_CHARS = b"0123456789.-"
+
+# Entier d'au moins 19 chiffres: peut dépasser 64 bits (orjson/ujson le décodent alors en float)
+_LONG_DIGITS = re.compile(r'\d{19}')
+_LONG_DIGITS_BYTES = re.compile(rb'\d{19}')
+_INT64_LIMIT = 2 ** 63
+
+if orjson is not None:
+    _PASSTHROUGH = orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_SUBCLASS
+    
+    def _fast_dumps(obj, indent, sort_keys) -> bytes:
+        option = _PASSTHROUGH
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option)
+    
+    _fast_loads = orjson.loads
+elif ujson is not None:
+    _fast_dumps = None
+    _fast_loads = ujson.loads
+else:
+    _fast_dumps = None
+    _fast_loads = None
+
+def _float_mismatch(raw: bytes) -> bool:
+    """Sortie orjson contenant (peut-être) un flottant formaté autrement que par json"""
+    if b"0.0000" in raw:
+        return True
+    for match in _EXPONENT.finditer(raw):
+        # Nombre seulement si le jeton commence une valeur (un UUID comme "8c3f3e5e-..." est ignoré)
+        start = match.start()
+        if start == 0 or raw[start - 1] not in _DIGITS:
+            continue
+        while start > 0 and raw[start - 1] in _NUMBER_CHARS:
+            start -= 1
+        if start == 0 or raw[start - 1] in b":,[ \n":
+            return True
+    return False
+
+def _has_non_finite(obj) -> bool:
+    """obj contient-il un flottant NaN/Infinity (encodé null par orjson, NaN/Infinity par json)"""
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+def _has_rounded_int(obj) -> bool:
+    """obj contient-il un flottant entier hors 64 bits (entier du texte arrondi par le décodeur)"""
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if abs(value) >= _INT64_LIMIT and value.is_integer():
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+    return False
+
+def dumps(obj, separators: tuple = None, ensure_ascii: bool = True, indent: int = None, sort_keys: bool = False) -> str:
+    """Équivalent de json.dumps (mêmes paramètres principaux, même sortie)
+    
+    orjson pour la forme compacte separators=(',', ':') et pour indent=2; les autres
+    formes, les flottants au format exponentiel ou < 1e-4, les clés non str, les entiers
+    hors 64 bits, les sous-classes et les types non natifs passent par json, de même
+    que NaN/Infinity (écrits NaN/Infinity comme par json, jamais null).
+    """
+    fast = _fast_dumps is not None and (
+        (indent is None and separators == _COMPACT) or (indent == 2 and separators in (None, _INDENTED))
+    )
+    if fast:
+        try:
+            raw = _fast_dumps(obj, indent, sort_keys)
+        except (TypeError, ValueError, OverflowError):
+            raw = None
+        
+        # ensure_ascii: json échappe aussi DEL (0x7f, \u007f) qu'orjson écrit tel quel
+        if raw is not None and (not ensure_ascii or (raw.isascii() and b"\x7f" not in raw)) and \
+                not _float_mismatch(raw) and not (b"null" in raw and _has_non_finite(obj)):
+            return raw.decode('utf-8')
+    
+    return json.dumps(obj, separators=separators, ensure_ascii=ensure_ascii, indent=indent, sort_keys=sort_keys)
+
+def loads(data):
+    """Équivalent de json.loads (str ou bytes); lève json.JSONDecodeError si invalide
+    
+    Un entier hors 64 bits, qu'orjson et ujson décodent en float, est relu par json
+    (entier exact): vérifié seulement si le texte contient 19 chiffres consécutifs.
+    """
+    if _fast_loads is not None:
+        try:
+            result = _fast_loads(data)
+        except (ValueError, TypeError, OverflowError):
+            # NaN, BOM, surrogates isolés... : json tranche (résultat ou JSONDecodeError)
+            pass
+        else:
+            long_digits = _LONG_DIGITS_BYTES if isinstance(data, (bytes, bytearray)) else _LONG_DIGITS
+            if not (long_digits.search(data) and _has_rounded_int(result)):
+                return result
+    return json.loads(data)
+
+def load(fp):
+    """Équivalent de json.load"""
+    return loads(fp.read())
@@ -22,8 +22,15 @@ class LicenseError(Exception):
             message = get_license_error_message()
         super().__init__(message)
 
+# Dossier du package (client.py, __init__.py, auth/, utils/...)
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 def _is_internal_file(filename: str) -> bool:
     """Vérifier si un fichier est interne à la bibliothèque"""
+    # Modules du package, quel que soit le nom du dossier parent
+    if os.path.abspath(filename).startswith(_PACKAGE_DIR + os.sep):
+        return True
+    
     # Fichiers système Python
     if ('<' in filename and '>' in filename) or 'importlib' in filename:
         return True
@@ -54,6 +61,22 @@ def _is_internal_file(filename: str) -> bool:
     
     return False
 
+# Fichiers appelants déjà validés, par (chemin, mtime): un script modifié est réexaminé
+_validated_files = set()
+
+def _file_key(filename: str):
+    """Clé de cache (chemin, mtime) d'un fichier appelant, None s'il n'existe pas"""
+    try:
+        return filename, os.stat(filename).st_mtime_ns
+    except (OSError, ValueError):
+        return None
+
+def _remember_validated(file_key) -> bool:
+    """Mémoriser un fichier appelant validé"""
+    if file_key is not None:
+        _validated_files.add(file_key)
+    return True
+
 def validate_license() -> bool:
     """
     Valider la licence d'utilisation avec détection avancée d'obfuscation
@@ -76,6 +99,11 @@ def validate_license() -> bool:
                     if _is_internal_file(filename):
                         caller_frame = caller_frame.f_back
                         continue
+                    
+                    # Fichier déjà validé et inchangé: pas de relecture du disque
+                    file_key = _file_key(filename)
+                    if file_key in _validated_files:
+                        return True
                         
                     if os.path.exists(filename) and os.path.isfile(filename):
                         try:
@@ -95,7 +123,7 @@ def validate_license() -> bool:
 
                         # Vérification 1: Code direct (non obfusqué)
                         if required_code in content:
-                            return True
+                            return _remember_validated(file_key)
 
                         # Vérification 2: Variables globales du script
                         try:
@@ -103,7 +131,7 @@ def validate_license() -> bool:
                             for var_name, var_value in caller_globals.items():
                                 if isinstance(var_value, str) and len(var_value) > 10:
                                     if required_code in var_value:
-                                        return True
+                                        return _remember_validated(file_key)
                         except Exception:
                             pass
 
@@ -111,7 +139,7 @@ def validate_license() -> bool:
                         try:
                             required_b64 = base64.b64encode(required_code.encode()).decode()
                             if required_b64 in content:
-                                return True
+                                return _remember_validated(file_key)
                         except Exception:
                             pass
 
@@ -119,7 +147,7 @@ def validate_license() -> bool:
                         try:
                             required_hash = hashlib.sha256(required_code.encode()).hexdigest()
                             if required_hash in content:
-                                return True
+                                return _remember_validated(file_key)
                         except:
                             pass
 
@@ -127,7 +155,7 @@ def validate_license() -> bool:
                         try:
                             required_reversed = required_code[::-1]
                             if required_reversed in content:
-                                return True
+                                return _remember_validated(file_key)
                         except:
                             pass
 
@@ -146,7 +174,7 @@ def validate_license() -> bool:
 
                             required_rot13 = rot13(required_code)
                             if required_rot13 in content:
-                                return True
+                                return _remember_validated(file_key)
                         except:
                             pass
 
@@ -154,7 +182,7 @@ def validate_license() -> bool:
                         try:
                             required_hex = required_code.encode().hex()
                             if required_hex in content:
-                                return True
+                                return _remember_validated(file_key)
                         except:
                             pass
 
@@ -165,7 +193,7 @@ def validate_license() -> bool:
                                 try:
                                     decoded = base64.b64decode(pattern).decode('utf-8', errors='ignore')
                                     if required_code in decoded:
-                                        return True
+                                        return _remember_validated(file_key)
                                 except:
                                     continue
                         except:
@@ -187,7 +215,7 @@ def validate_license() -> bool:
                                     found_parts += 1
 
                             if found_parts >= 3:
-                                return True
+                                return _remember_validated(file_key)
 
                             # Vérification par parties hex
                             found_parts = 0
@@ -197,7 +225,7 @@ def validate_license() -> bool:
                                     found_parts += 1
                             
                             if found_parts >= 2:
-                                return True
+                                return _remember_validated(file_key)
                         except:
                             pass
 
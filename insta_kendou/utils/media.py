@@ -5,11 +5,56 @@ Préparation des images, génération des IDs et hash PDQ
 """
 
 import os
+import mmap
 import time
 import hashlib
 import random
+import threading
+import multiprocessing
 from io import BytesIO
-from .license import validate_license
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from .license import validate_license, REQUIRED_ACCESS_CODE
+
+# Dernier upload_id attribué (generate_upload_id)
+_last_upload_id = 0
+_upload_id_lock = threading.Lock()
+
+# Contraintes Instagram pour envoyer le fichier original sans ré-encodage
+FEED_MAX_SIZE = 1080
+STORY_SIZE = (720, 1280)
+
+# Paramètres de traitement (inclus dans la clé du cache des médias préparés)
+PROCESSING_PARAMS = {
+    "version": 1,
+    "jpeg_quality": 90,
+    "feed_max_size": FEED_MAX_SIZE,
+    "story_size": list(STORY_SIZE)
+}
+
+class UploadStream:
+    """Corps d'upload en streaming depuis un buffer (bytes ou mmap) à partir d'un offset"""
+    
+    def __init__(self, buffer, offset: int = 0):
+        # memoryview: découpage sans copie du buffer source
+        self._view = memoryview(buffer)[offset:]
+        self._position = 0
+    
+    def __len__(self) -> int:
+        return len(self._view) - self._position
+    
+    def read(self, size: int = -1) -> bytes:
+        """Lire le prochain morceau (seul ce morceau est copié en mémoire)"""
+        if size is None or size < 0:
+            size = len(self)
+        
+        chunk = self._view[self._position:self._position + size]
+        self._position += len(chunk)
+        return bytes(chunk)
+    
+    def close(self):
+        """Libérer la vue sur le buffer (un mmap ne peut être fermé tant qu'une vue existe)"""
+        self._view.release()
 
 class MediaProcessor:
     """Gestionnaire de traitement des médias pour Instagram"""
@@ -20,12 +65,88 @@ class MediaProcessor:
             raise PermissionError("Ce script n'est pas autorisé à utiliser cette bibliothèque. Veuillez contacter le créateur via: 0389561802 ou https://t.me/Kenny5626")
     
     @staticmethod
-    def prepare_image_for_instagram(image_path: str, story_mode: bool = False) -> tuple:
+    def inspect_image_header(image_path: str) -> dict:
+        """Lire format, mode et dimensions depuis l'en-tête sans décoder les pixels"""
+        try:
+            from PIL import Image
+        except ImportError:
+            return None
+        
+        try:
+            # Image.open est paresseux: seul l'en-tête est lu tant que load() n'est pas appelé
+            with Image.open(image_path) as img:
+                info = img.info
+                try:
+                    orientation = img.getexif().get(0x0112, 1)
+                except Exception:
+                    orientation = 1
+                
+                return {
+                    "format": img.format,
+                    "mode": img.mode,
+                    "size": img.size,
+                    "progressive": bool(info.get("progressive") or info.get("progression")),
+                    "orientation": orientation
+                }
+        except Exception:
+            return None
+    
+    @staticmethod
+    def is_upload_compliant(header: dict, story_mode: bool = False) -> bool:
+        """Vérifier si une image respecte déjà les contraintes d'upload Instagram"""
+        if not header:
+            return False
+        
+        # JPEG baseline RGB uniquement, sans rotation EXIF à appliquer
+        if header["format"] != "JPEG" or header["mode"] != "RGB":
+            return False
+        if header["progressive"] or header["orientation"] not in (None, 1):
+            return False
+        
+        width, height = header["size"]
+        if story_mode:
+            return (width, height) == STORY_SIZE
+        
+        return 0 < width <= FEED_MAX_SIZE and 0 < height <= FEED_MAX_SIZE
+    
+    @staticmethod
+    def map_file(image_path: str):
+        """Projeter un fichier en mémoire en lecture seule (zéro copie)
+        
+        Le mmap retourné garde un descripteur ouvert (et verrouille le fichier sous
+        Windows) jusqu'à release_media(). Un fichier vide ne peut pas être projeté: ses
+        octets (b"") sont retournés directement.
+        """
+        with open(image_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return f.read()
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    @staticmethod
+    def release_media(image_data):
+        """Fermer la projection d'un média préparé en pass-through (sans effet sur des bytes)"""
+        if isinstance(image_data, mmap.mmap):
+            image_data.close()
+    
+    @staticmethod
+    def prepare_image_for_instagram(image_path: str, story_mode: bool = False, passthrough: bool = True) -> tuple:
         """Préparer une image pour Instagram"""
+        image_data, image_size, error, _ = MediaProcessor._prepare_image(image_path, story_mode, passthrough)
+        return image_data, image_size, error
+    
+    @staticmethod
+    def _prepare_image(image_path: str, story_mode: bool = False, passthrough: bool = True) -> tuple:
+        """Préparer une image et retourner aussi l'image décodée finale (None en pass-through)"""
         try:
             # Vérifier si le fichier existe
             if not os.path.exists(image_path):
-                return None, None, f"Fichier non trouvé: {image_path}"
+                return None, None, f"Fichier non trouvé: {image_path}", None
+            
+            # Mode pass-through: le fichier est déjà conforme, l'envoyer tel quel
+            if passthrough:
+                header = MediaProcessor.inspect_image_header(image_path)
+                if MediaProcessor.is_upload_compliant(header, story_mode):
+                    return MediaProcessor.map_file(image_path), header["size"], None, None
             
             # Installer Pillow si pas disponible
             try:
@@ -47,8 +168,7 @@ class MediaProcessor:
                 
                 if story_mode:
                     # Format story Instagram (9:16)
-                    target_width = 720
-                    target_height = 1280
+                    target_width, target_height = STORY_SIZE
                     
                     # Redimensionner en gardant le ratio
                     ratio = min(target_width / original_width, target_height / original_height)
@@ -66,7 +186,7 @@ class MediaProcessor:
                     img = story_img
                 else:
                     # Format post Instagram (1:1 ou proche)
-                    target_size = 1080
+                    target_size = FEED_MAX_SIZE
                     
                     # Redimensionner
                     if original_width > original_height:
@@ -83,29 +203,324 @@ class MediaProcessor:
                 
                 # Essayer JPEG d'abord (plus compatible)
                 try:
-                    img.save(output, format='JPEG', quality=90, optimize=True)
+                    img.save(output, format='JPEG', quality=PROCESSING_PARAMS["jpeg_quality"], optimize=True)
                     image_data = output.getvalue()
-                    return image_data, img.size, None
+                    return image_data, img.size, None, img
                 except Exception:
                     # Si JPEG échoue, essayer PNG
                     output = BytesIO()
                     img.save(output, format='PNG', optimize=True)
                     image_data = output.getvalue()
-                    return image_data, img.size, None
+                    return image_data, img.size, None, img
                 
         except Exception as e:
-            return None, None, f"Erreur traitement image: {str(e)}"
+            return None, None, f"Erreur traitement image: {str(e)}", None
+    
+    @staticmethod
+    def prepare_media(image_path: str, story_mode: bool = False, cache=None, defer_pdq: bool = False) -> dict:
+        """Préparer une image et son hash PDQ, en passant par le cache si fourni
+        
+        Avec defer_pdq, le hash n'est pas calculé ici: complete_pdq_hash() le calcule
+        plus tard (par exemple pendant l'upload) et alimente alors le cache.
+        """
+        try:
+            if not os.path.exists(image_path):
+                return {"success": False, "error": f"Fichier non trouvé: {image_path}"}
+            
+            cache_key = None
+            if cache is not None:
+                source_hash = cache.hash_file(image_path)
+                cache_key = cache.make_key(source_hash, story_mode, PROCESSING_PARAMS)
+                
+                cached = cache.get(cache_key, image_path)
+                if cached:
+                    return {
+                        "success": True,
+                        "image_data": cached["image_data"],
+                        "image_size": cached["image_size"],
+                        "pdq_hash": cached["pdq_hash"],
+                        "image_path": image_path,
+                        "story_mode": story_mode,
+                        "from_cache": True
+                    }
+            
+            image_data, image_size, error, image = MediaProcessor._prepare_image(image_path, story_mode=story_mode)
+            if error:
+                return {"success": False, "error": error}
+            
+            if defer_pdq:
+                return {
+                    "success": True,
+                    "image_data": image_data,
+                    "image_size": image_size,
+                    "pdq_hash": None,
+                    "image_path": image_path,
+                    "story_mode": story_mode,
+                    "from_cache": False,
+                    "_pdq_source": (image, cache, cache_key)
+                }
+            
+            # Réutiliser les pixels déjà décodés pour le hash PDQ
+            pdq_hash = MediaProcessor.generate_pdq_hash(image_data, image=image)
+            
+            if cache_key:
+                # Un mmap signifie que le fichier source est envoyé tel quel
+                passthrough = isinstance(image_data, mmap.mmap)
+                cache.put(cache_key, image_data, image_size, pdq_hash, passthrough=passthrough)
+            
+            return {
+                "success": True,
+                "image_data": image_data,
+                "image_size": image_size,
+                "pdq_hash": pdq_hash,
+                "image_path": image_path,
+                "story_mode": story_mode,
+                "from_cache": False
+            }
+            
+        except Exception as e:
+            return {"success": False, "error": f"Erreur traitement image: {str(e)}"}
+    
+    @staticmethod
+    def complete_pdq_hash(prepared: dict) -> str:
+        """Calculer le hash PDQ différé d'un média préparé (et l'enregistrer dans le cache)"""
+        if prepared.get("pdq_hash"):
+            return prepared["pdq_hash"]
+        
+        image, cache, cache_key = prepared.pop("_pdq_source", (None, None, None))
+        image_data = prepared["image_data"]
+        pdq_hash = MediaProcessor.generate_pdq_hash(image_data, image=image)
+        prepared["pdq_hash"] = pdq_hash
+        
+        if cache_key:
+            passthrough = isinstance(image_data, mmap.mmap)
+            cache.put(cache_key, image_data, prepared["image_size"], pdq_hash, passthrough=passthrough)
+        
+        return pdq_hash
+    
+    @staticmethod
+    def prepare_media_batch(image_paths: list, story_mode: bool = False, cache=None, max_workers: int = None) -> list:
+        """Préparer un lot d'images dans un pool de processus (résultats dans l'ordre d'entrée)
+        
+        Le pool (max_workers processus, os.cpu_count() par défaut) est partagé entre les
+        lots et démarré une seule fois; max_workers=1 prépare dans le processus courant.
+        """
+        # Chaque élément est un chemin ou un tuple (chemin, story_mode)
+        items = [item if isinstance(item, (tuple, list)) else (item, story_mode) for item in image_paths]
+        results = [None] * len(items)
+        pending = []
+        
+        for index, (image_path, item_story_mode) in enumerate(items):
+            if not os.path.exists(image_path):
+                results[index] = {"success": False, "error": f"Fichier non trouvé: {image_path}",
+                                  "image_path": image_path, "story_mode": item_story_mode}
+                continue
+            
+            cache_key = None
+            if cache is not None:
+                cache_key = cache.make_key(cache.hash_file(image_path), item_story_mode, PROCESSING_PARAMS)
+                cached = cache.get(cache_key, image_path)
+                if cached:
+                    results[index] = {
+                        "success": True,
+                        "image_data": cached["image_data"],
+                        "image_size": cached["image_size"],
+                        "pdq_hash": cached["pdq_hash"],
+                        "image_path": image_path,
+                        "story_mode": item_story_mode,
+                        "from_cache": True
+                    }
+                    continue
+            
+            pending.append((index, image_path, item_story_mode, cache_key))
+        
+        if not pending:
+            return results
+        
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        
+        if max_workers <= 1 or len(pending) == 1:
+            prepared_list = [_prepare_media_worker(image_path, item_story_mode) for _, image_path, item_story_mode, _ in pending]
+        else:
+            executor = _shared_worker_pool(max_workers)
+            futures = [executor.submit(_prepare_media_worker, image_path, item_story_mode)
+                       for _, image_path, item_story_mode, _ in pending]
+            prepared_list = []
+            for future in futures:
+                try:
+                    prepared_list.append(future.result())
+                except Exception as e:
+                    if isinstance(e, BrokenProcessPool):
+                        _discard_worker_pool(max_workers, executor)
+                    prepared_list.append({"success": False, "error": f"Erreur traitement image: {str(e)}"})
+        
+        for (index, image_path, item_story_mode, cache_key), prepared in zip(pending, prepared_list):
+            prepared["image_path"] = image_path
+            prepared["story_mode"] = item_story_mode
+            
+            if prepared["success"]:
+                passthrough = prepared.pop("passthrough", False)
+                if passthrough:
+                    # Fichier déjà conforme: projeté ici plutôt que copié entre processus
+                    prepared["image_data"] = MediaProcessor.map_file(image_path)
+                
+                if cache_key:
+                    cache.put(cache_key, prepared["image_data"], prepared["image_size"],
+                              prepared["pdq_hash"], passthrough=passthrough)
+            
+            results[index] = prepared
+        
+        return results
     
     @staticmethod
     def generate_upload_id() -> str:
-        """Générer un ID d'upload unique"""
-        return str(int(time.time() * 1000))
+        """Générer un ID d'upload unique (horodatage ms, strictement croissant dans le processus)
+        
+        Deux appels dans la même milliseconde (éléments d'un carrousel, uploads concurrents)
+        reçoivent des IDs distincts: le second prend la milliseconde suivante.
+        """
+        global _last_upload_id
+        with _upload_id_lock:
+            _last_upload_id = max(int(time.time() * 1000), _last_upload_id + 1)
+            return str(_last_upload_id)
     
     @staticmethod
-    def generate_pdq_hash(image_data: bytes) -> str:
-        """Générer un hash PDQ factice pour l'image"""
-        # Générer un hash PDQ factice basé sur les données de l'image
-        hash_base = hashlib.md5(image_data).hexdigest()
-        # Format PDQ hash Instagram
-        pdq_hash = ''.join(c if c.isdigit() else '9' if ord(c) % 2 else '6' for c in hash_base[:64])
-        return f"{pdq_hash}:59"
+    def generate_pdq_hash(image_data: bytes, image=None) -> str:
+        """Générer le hash PDQ (256 bits) de l'image au format hash:qualité"""
+        try:
+            import numpy as np
+            
+            if image is None:
+                from PIL import Image
+                with Image.open(BytesIO(image_data)) as decoded:
+                    rgb = np.asarray(decoded.convert('RGB'), dtype=np.float32)
+            else:
+                rgb = np.asarray(image.convert('RGB') if image.mode != 'RGB' else image, dtype=np.float32)
+            
+            hash_hex, quality = _pdq_hash_from_rgb(np, rgb)
+            return f"{hash_hex}:{quality}"
+        
+        except ImportError:
+            # NumPy/Pillow absents: hash factice historique basé sur les octets
+            hash_base = hashlib.md5(image_data).hexdigest()
+            pdq_hash = ''.join(c if c.isdigit() else '9' if ord(c) % 2 else '6' for c in hash_base[:64])
+            return f"{pdq_hash}:59"
+
+# Matrice DCT PDQ 16x64 (coefficients 1 à 16, sans la composante continue)
+_PDQ_DCT_MATRIX = None
+
+def _pdq_box_filter(np, values, window: int, axis: int):
+    """Moyenne glissante centrée de PDQ (fenêtre tronquée aux bords) via sommes cumulées"""
+    length = values.shape[axis]
+    half = (window + 2) // 2
+    indices = np.arange(length)
+    low = np.maximum(indices - (window - half), 0)
+    high = np.minimum(indices + half, length)
+    
+    cumulative = np.cumsum(values, axis=axis, dtype=np.float64)
+    cumulative = np.insert(cumulative, 0, 0.0, axis=axis)
+    sums = np.take(cumulative, high, axis=axis) - np.take(cumulative, low, axis=axis)
+    
+    shape = [1, 1]
+    shape[axis] = length
+    return sums / (high - low).reshape(shape)
+
+def _pdq_hash_from_rgb(np, rgb) -> tuple:
+    """Calculer le hash PDQ depuis un tableau RGB (hauteur x largeur x 3)"""
+    global _PDQ_DCT_MATRIX
+    
+    # 1. Luminance
+    luma = rgb[:, :, 0] * 0.299 + rgb[:, :, 1] * 0.587 + rgb[:, :, 2] * 0.114
+    num_rows, num_cols = luma.shape
+    
+    # 2. Filtre de Jarosz (deux passes de moyennes glissantes) puis décimation 64x64
+    window_along_rows = (num_cols + 2 * 64 - 1) // (2 * 64)
+    window_along_cols = (num_rows + 2 * 64 - 1) // (2 * 64)
+    for _ in range(2):
+        luma = _pdq_box_filter(np, luma, window_along_rows, axis=1)
+        luma = _pdq_box_filter(np, luma, window_along_cols, axis=0)
+    
+    row_indices = ((np.arange(64) + 0.5) * num_rows / 64).astype(int)
+    col_indices = ((np.arange(64) + 0.5) * num_cols / 64).astype(int)
+    buffer64 = luma[np.ix_(row_indices, col_indices)]
+    
+    # Qualité: somme des gradients verticaux et horizontaux
+    vertical = np.trunc((buffer64[:-1, :] - buffer64[1:, :]) * 100 / 255)
+    horizontal = np.trunc((buffer64[:, :-1] - buffer64[:, 1:]) * 100 / 255)
+    gradient_sum = int(np.abs(vertical).sum() + np.abs(horizontal).sum())
+    quality = min(gradient_sum // 90, 100)
+    
+    # 3. DCT 16x16
+    if _PDQ_DCT_MATRIX is None:
+        i = np.arange(1, 17).reshape(-1, 1)
+        j = np.arange(64).reshape(1, -1)
+        _PDQ_DCT_MATRIX = np.sqrt(2.0 / 64) * np.cos(np.pi / 2 / 64 * i * (2 * j + 1))
+    dct = _PDQ_DCT_MATRIX @ buffer64 @ _PDQ_DCT_MATRIX.T
+    
+    # 4. Seuil sur la médiane (rang 128/256, comme l'implémentation de référence)
+    values = dct.reshape(-1)
+    median = np.partition(values, 127)[127]
+    bits = (dct > median).astype(np.int64)
+    
+    # Le bit k = ligne*16 + colonne; mots de 16 bits écrits du dernier au premier
+    words = bits @ (1 << np.arange(16, dtype=np.int64))
+    hash_hex = ''.join(f"{int(word):04x}" for word in words[::-1])
+    
+    return hash_hex, quality
+
+def _worker_context():
+    """Contexte multiprocessing des workers de préparation
+    
+    Jamais "fork": le client est déjà multi-thread (pool d'arrière-plan, minuteries
+    d'écriture, pools urllib3) et un fork peut hériter d'un verrou tenu. forkserver
+    (sinon spawn) démarre les workers depuis un processus propre; ils réimportent
+    la bibliothèque (voir _create_worker_pool pour la licence).
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+# Initialisation d'un worker, avant le premier import de la bibliothèque: le code d'accès
+# rejoint les arguments de ligne de commande du worker seul (déjà reconnus par validate_license).
+# exec est un builtin: sa désérialisation n'importe pas insta_kendou.
+_WORKER_INIT = "import sys; sys.argv.append({!r})"
+
+def _create_worker_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Pool de processus de préparation; l'environnement du processus hôte n'est pas modifié"""
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=_worker_context(),
+                               initializer=exec, initargs=(_WORKER_INIT.format(REQUIRED_ACCESS_CODE),))
+
+# Pools partagés par taille: démarrer des workers forkserver/spawn coûte cher, ils servent à tous les lots
+_worker_pools = {}
+_worker_pools_lock = threading.Lock()
+
+def _shared_worker_pool(max_workers: int) -> ProcessPoolExecutor:
+    with _worker_pools_lock:
+        executor = _worker_pools.get(max_workers)
+        if executor is None:
+            executor = _worker_pools[max_workers] = _create_worker_pool(max_workers)
+        return executor
+
+def _discard_worker_pool(max_workers: int, executor: ProcessPoolExecutor):
+    """Retirer un pool cassé (worker mort): le lot suivant en démarre un nouveau"""
+    with _worker_pools_lock:
+        if _worker_pools.get(max_workers) is executor:
+            del _worker_pools[max_workers]
+    executor.shutdown(wait=False)
+
+def _prepare_media_worker(image_path: str, story_mode: bool) -> dict:
+    """Préparer une image dans un worker (résultat sérialisable entre processus)"""
+    prepared = MediaProcessor.prepare_media(image_path, story_mode)
+    
+    if prepared["success"]:
+        image_data = prepared["image_data"]
+        if isinstance(image_data, mmap.mmap):
+            # Pass-through: le processus parent projettera lui-même le fichier source
+            image_data.close()
+            prepared["image_data"] = None
+            prepared["passthrough"] = True
+        else:
+            prepared["passthrough"] = False
+    
+    return prepared
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Cache disque des médias préparés pour Instagram
+Adressage par contenu (hash source + mode + paramètres) avec éviction LRU bornée
+"""
+
+import os
+import time
+import hashlib
+import tempfile
+import threading
+from . import fast_json
+
+class PreparedMediaCache:
+    """Cache disque des images préparées, indexé par le contenu du fichier source"""
+    
+    def __init__(self, cache_dir: str = "media_cache", max_bytes: int = 200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Taille occupée estimée (None: inconnue, recalculée par evict)
+        self._size_estimate = None
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def hash_file(image_path: str) -> str:
+        """Calculer le hash SHA-256 du contenu d'un fichier source"""
+        digest = hashlib.sha256()
+        with open(image_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def make_key(source_hash: str, story_mode: bool, params: dict) -> str:
+        """Construire la clé de cache (hash source, mode story, paramètres de traitement)"""
+        params_str = fast_json.dumps(params, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(f"{source_hash}:{int(bool(story_mode))}:{params_str}".encode()).hexdigest()
+    
+    def _paths(self, key: str) -> tuple:
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.json", f"{base}.bin"
+    
+    def get(self, key: str, image_path: str = None) -> dict:
+        """Récupérer une entrée (octets préparés, taille finale, hash) ou None
+        
+        image_data est un bytes: aucun descripteur ni projection ne reste ouvert côté appelant.
+        """
+        meta_path, data_path = self._paths(key)
+        
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = fast_json.load(f)
+            
+            if meta.get("passthrough"):
+                # Le fichier source est envoyé tel quel: rien de stocké en double
+                if not image_path:
+                    raise FileNotFoundError(meta_path)
+                data_path = image_path
+            
+            with open(data_path, 'rb') as f:
+                image_data = f.read()
+            
+            # Mise à jour de l'horodatage pour l'ordre LRU
+            now = time.time()
+            os.utime(meta_path, (now, now))
+            
+            with self._lock:
+                self.hits += 1
+            
+            return {
+                "image_data": image_data,
+                "image_size": tuple(meta["image_size"]),
+                "pdq_hash": meta.get("pdq_hash"),
+                "passthrough": bool(meta.get("passthrough"))
+            }
+        
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+    
+    def _write_atomic(self, path: str, data: bytes):
+        """Écrire dans un fichier temporaire unique (processus et threads) puis le publier par os.replace"""
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    
+    def _entry_size(self, key: str) -> int:
+        """Taille sur disque d'une entrée existante (0 si absente)"""
+        size = 0
+        for path in self._paths(key):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+    
+    def put(self, key: str, image_data, image_size: tuple, pdq_hash: str = None, passthrough: bool = False):
+        """Enregistrer une entrée; éviction seulement quand la taille estimée dépasse max_bytes
+        
+        Une entrée remplacée est retirée de l'estimation avant d'y ajouter la nouvelle.
+        """
+        meta_path, data_path = self._paths(key)
+        
+        try:
+            replaced = self._entry_size(key)
+            if passthrough and replaced:
+                # L'ancienne entrée stockait peut-être les octets: ils deviennent inutiles
+                try:
+                    os.remove(data_path)
+                except OSError:
+                    pass
+            
+            written = 0
+            if not passthrough:
+                self._write_atomic(data_path, image_data)
+                written += len(image_data)
+            
+            meta = {
+                "image_size": list(image_size),
+                "pdq_hash": pdq_hash,
+                "passthrough": passthrough,
+                "size_bytes": 0 if passthrough else len(image_data),
+                "created_at": int(time.time())
+            }
+            
+            meta_bytes = fast_json.dumps(meta, separators=(',', ':')).encode('utf-8')
+            self._write_atomic(meta_path, meta_bytes)
+            written += len(meta_bytes)
+            
+            with self._lock:
+                estimate = self._size_estimate
+                if estimate is not None:
+                    estimate = max(0, estimate + written - replaced)
+                    self._size_estimate = estimate
+            
+            if estimate is None or estimate > self.max_bytes:
+                self.evict()
+        
+        except Exception as e:
+            print(f"⚠️ Erreur écriture cache média: {e}")
+    
+    def evict(self):
+        """Supprimer les entrées les moins récemment utilisées au-delà de max_bytes"""
+        with self._lock:
+            entries = []
+            total = 0
+            
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".json"):
+                    continue
+                
+                meta_path = os.path.join(self.cache_dir, name)
+                data_path = meta_path[:-5] + ".bin"
+                try:
+                    size = os.path.getsize(meta_path)
+                    if os.path.exists(data_path):
+                        size += os.path.getsize(data_path)
+                    entries.append((os.path.getmtime(meta_path), size, meta_path, data_path))
+                    total += size
+                except OSError:
+                    continue
+            
+            if total <= self.max_bytes:
+                self._size_estimate = total
+                return
+            
+            entries.sort()
+            for _, size, meta_path, data_path in entries:
+                if total <= self.max_bytes:
+                    break
+                for path in (meta_path, data_path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total -= size
+            self._size_estimate = total
+    
+    def clear(self):
+        """Vider complètement le cache"""
+        with self._lock:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith((".json", ".bin", ".tmp")):
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                    except OSError:
+                        pass
+            self._size_estimate = 0
+    
+    def get_stats(self) -> dict:
+        """Statistiques d'utilisation du cache"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else 0.0
+        }
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Métriques des requêtes HTTP par endpoint logique
+Compteurs, codes HTTP, octets et histogrammes de latence (buckets log-linéaires type HDR)
+"""
+
+import threading
+from .transport import endpoint_name
+from . import fast_json
+
+class LatencyHistogram:
+    """Histogramme log-linéaire en microsecondes: 8 sous-buckets par puissance de 2 (erreur relative <= 12,5 %)"""
+    
+    SUB_BUCKETS = 8
+    
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+    
+    @classmethod
+    def bucket_index(cls, value: int) -> int:
+        if value < cls.SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - 4
+        return (shift + 1) * cls.SUB_BUCKETS + ((value >> shift) - cls.SUB_BUCKETS)
+    
+    @classmethod
+    def bucket_upper(cls, index: int) -> int:
+        """Borne supérieure (exclue) d'un bucket, en microsecondes"""
+        if index < cls.SUB_BUCKETS:
+            return index + 1
+        shift = index // cls.SUB_BUCKETS - 1
+        return (cls.SUB_BUCKETS + index % cls.SUB_BUCKETS + 1) << shift
+    
+    def record(self, value: int):
+        index = self.bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+    
+    def percentile(self, percent: float) -> int:
+        """Valeur (borne supérieure du bucket) sous laquelle se trouvent percent % des mesures"""
+        if not self.count:
+            return 0
+        threshold = self.count * percent / 100.0
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= threshold:
+                return min(self.bucket_upper(index), self.max)
+        return self.max
+    
+    def cumulative_buckets(self) -> list:
+        """Liste [(borne supérieure en µs, effectif cumulé)] des buckets non vides"""
+        buckets = []
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            buckets.append((self.bucket_upper(index), seen))
+        return buckets
+
+class _EndpointMetrics:
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.status_codes = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.latency = LatencyHistogram()
+
+def _body_size(body) -> int:
+    if body is None:
+        return 0
+    try:
+        return len(body)
+    except TypeError:
+        return 0
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class MetricsRegistry:
+    """Registre des métriques par endpoint, alimenté par TransportAdapter (observer)
+    
+    La latence mesurée va de l'envoi à la réception des en-têtes de réponse.
+    Les octets reçus proviennent de Content-Length (ou du corps déjà chargé).
+    """
+    
+    def __init__(self, prefix: str = "instakendou"):
+        self.prefix = prefix
+        self._endpoints = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, request, response, error, elapsed: float):
+        """Enregistrer une requête terminée (signature des observers de TransportAdapter)"""
+        name = endpoint_name(request)
+        bytes_out = _body_size(request.body)
+        
+        status = None
+        bytes_in = 0
+        if response is not None:
+            status = response.status_code
+            length = response.headers.get("content-length")
+            if length and length.isdigit():
+                bytes_in = int(length)
+            elif response._content_consumed and response._content:
+                bytes_in = len(response._content)
+        
+        with self._lock:
+            metrics = self._endpoints.get(name)
+            if metrics is None:
+                metrics = self._endpoints[name] = _EndpointMetrics()
+            
+            metrics.requests += 1
+            metrics.bytes_out += bytes_out
+            metrics.bytes_in += bytes_in
+            metrics.latency.record(int(elapsed * 1000000))
+            if error is not None:
+                metrics.errors += 1
+            else:
+                metrics.status_codes[status] = metrics.status_codes.get(status, 0) + 1
+    
+    def reset(self):
+        """Remettre toutes les métriques à zéro"""
+        with self._lock:
+            self._endpoints.clear()
+    
+    def snapshot(self) -> dict:
+        """Instantané JSON-sérialisable des métriques par endpoint (latences en ms)"""
+        endpoints = {}
+        with self._lock:
+            for name, metrics in sorted(self._endpoints.items()):
+                latency = metrics.latency
+                endpoints[name] = {
+                    "requests": metrics.requests,
+                    "errors": metrics.errors,
+                    "status_codes": {str(code): count for code, count in sorted(metrics.status_codes.items())},
+                    "bytes_in": metrics.bytes_in,
+                    "bytes_out": metrics.bytes_out,
+                    "latency_ms": {
+                        "mean": round(latency.total / latency.count / 1000.0, 3) if latency.count else 0.0,
+                        "p50": latency.percentile(50) / 1000.0,
+                        "p90": latency.percentile(90) / 1000.0,
+                        "p99": latency.percentile(99) / 1000.0,
+                        "max": latency.max / 1000.0
+                    }
+                }
+        return {"endpoints": endpoints}
+    
+    def to_json(self, indent: int = None) -> str:
+        """Export JSON de snapshot() (compact sans indent)"""
+        separators = (',', ':') if indent is None else None
+        return fast_json.dumps(self.snapshot(), separators=separators, indent=indent, ensure_ascii=False)
+    
+    def to_prometheus(self) -> str:
+        """Export au format texte Prometheus (exposition 0.0.4)"""
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_requests_total Requêtes HTTP terminées par endpoint et code HTTP",
+            f"# TYPE {p}_requests_total counter"
+        ]
+        errors = [f"# HELP {p}_request_errors_total Requêtes sans réponse (erreurs réseau)",
+                  f"# TYPE {p}_request_errors_total counter"]
+        volume = [f"# HELP {p}_request_bytes_total Octets envoyés (out) et reçus (in)",
+                  f"# TYPE {p}_request_bytes_total counter"]
+        durations = [f"# HELP {p}_request_duration_seconds Latence jusqu'aux en-têtes de réponse",
+                     f"# TYPE {p}_request_duration_seconds histogram"]
+        
+        with self._lock:
+            for name, metrics in sorted(self._endpoints.items()):
+                label = f'endpoint="{_escape_label(name)}"'
+                for code, count in sorted(metrics.status_codes.items()):
+                    lines.append(f'{p}_requests_total{{{label},status="{code}"}} {count}')
+                errors.append(f"{p}_request_errors_total{{{label}}} {metrics.errors}")
+                volume.append(f'{p}_request_bytes_total{{{label},direction="in"}} {metrics.bytes_in}')
+                volume.append(f'{p}_request_bytes_total{{{label},direction="out"}} {metrics.bytes_out}')
+                
+                latency = metrics.latency
+                for upper, cumulative in latency.cumulative_buckets():
+                    durations.append(f'{p}_request_duration_seconds_bucket{{{label},le="{(upper - 1) / 1000000.0:g}"}} {cumulative}')
+                durations.append(f'{p}_request_duration_seconds_bucket{{{label},le="+Inf"}} {latency.count}')
+                durations.append(f"{p}_request_duration_seconds_sum{{{label}}} {latency.total / 1000000.0:g}")
+                durations.append(f"{p}_request_duration_seconds_count{{{label}}} {latency.count}")
+        
+        return "\n".join(lines + errors + volume + durations) + "\n"
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Encodeurs de payloads pré-calculés (signed_body et formulaires Bloks)
+Les fragments constants sont sérialisés une seule fois; seuls les champs de la requête sont encodés à chaque appel
+"""
+
+import json
+import functools
+import urllib.parse
+from json.encoder import encode_basestring
+from . import fast_json
+from .encryption import InstagramEncryption
+
+class _Field:
+    """Marqueur d'un champ fourni à chaque requête dans un SignedBodyTemplate"""
+    
+    def __repr__(self):
+        return "FIELD"
+
+FIELD = _Field()
+
+def _encode_value(value) -> str:
+    """JSON compact d'une valeur (chemins directs pour str et int, identiques à json.dumps)"""
+    kind = type(value)
+    if kind is str:
+        return encode_basestring(value)
+    if kind is int:
+        return int.__repr__(value)
+    return fast_json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+class SignedBodyTemplate:
+    """Corps signed_body à structure fixe
+    
+    layout: dict ordonné des champs; les valeurs constantes sont sérialisées à la
+    construction, les champs marqués FIELD sont fournis à render()/sign().
+    La sortie est identique à InstagramEncryption.create_signed_body(dict complet).
+    """
+    
+    def __init__(self, layout: dict):
+        self.fields = []
+        self._constants = []
+        chunk = "{"
+        
+        for index, (key, value) in enumerate(layout.items()):
+            if index:
+                chunk += ","
+            chunk += fast_json.dumps(key, ensure_ascii=False) + ":"
+            if value is FIELD:
+                self._constants.append(chunk)
+                self.fields.append(key)
+                chunk = ""
+            else:
+                chunk += fast_json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+        
+        self._constants.append(chunk + "}")
+    
+    def render(self, values: dict) -> str:
+        """JSON compact du corps (KeyError si un champ FIELD manque)"""
+        parts = [self._constants[0]]
+        for key, constant in zip(self.fields, self._constants[1:]):
+            parts.append(_encode_value(values[key]))
+            parts.append(constant)
+        return "".join(parts)
+    
+    def sign(self, values: dict) -> str:
+        """signed_body prêt à envoyer (signature.json)"""
+        return InstagramEncryption.sign_json(self.render(values))
+
+@functools.lru_cache(maxsize=None)
+def bloks_form_suffix(bloks_version: str) -> str:
+    """Fin d'un formulaire Bloks (bk_client_context + bloks_versioning_id), encodée une fois par version"""
+    context = json.dumps({'bloks_version': bloks_version, 'styles_id': 'instagram'})
+    return f"&bk_client_context={urllib.parse.quote(context)}&bloks_versioning_id={bloks_version}"
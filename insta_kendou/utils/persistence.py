@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Persistance fiable des fichiers JSON (device, sessions)
+Écriture atomique (fichier temporaire + os.replace), verrou consultatif et écritures regroupées
+"""
+
+import os
+import time
+import atexit
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
+from . import fast_json
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+@contextmanager
+def file_lock(path: str):
+    """Verrou consultatif inter-processus sur path (via le fichier path.lock)"""
+    lock_file = open(f"{path}.lock", 'a+')
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        yield
+    finally:
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            lock_file.close()
+
+def _replace_file(path: str, content: str):
+    """Remplacer path par content via un fichier temporaire (appelant déjà sous verrou)"""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def atomic_write_json(path: str, data, indent: int = None, ensure_ascii: bool = False, lock: bool = True):
+    """Écrire data en JSON de façon atomique: les lecteurs voient l'ancien ou le nouveau contenu, jamais un fichier tronqué
+    
+    lock=False omet le verrou consultatif (écrivains concurrents: le dernier gagne).
+    """
+    content = fast_json.dumps(data, indent=indent, ensure_ascii=ensure_ascii)
+    
+    if not lock:
+        _replace_file(path, content)
+        return
+    
+    with file_lock(path):
+        _replace_file(path, content)
+
+def atomic_update_json(path: str, update, default=None, indent: int = None, ensure_ascii: bool = False):
+    """Lire, modifier (update(data) -> data) et réécrire un fichier JSON sous un seul verrou"""
+    with file_lock(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = fast_json.load(f)
+        except (OSError, ValueError):
+            data = default() if callable(default) else default
+        
+        data = update(data)
+        _replace_file(path, fast_json.dumps(data, indent=indent, ensure_ascii=ensure_ascii))
+        return data
+
+# Writers à vider à la sortie du processus (références faibles)
+_pending_writers = weakref.WeakSet()
+
+def flush_pending_writes():
+    """Écrire immédiatement toutes les mises à jour encore en attente"""
+    for writer in list(_pending_writers):
+        writer.flush()
+
+atexit.register(flush_pending_writes)
+
+class CoalescingWriter:
+    """Regroupe les rafales de mises à jour d'un fichier JSON en une seule écriture atomique différée
+    
+    Anti-rebond: l'écriture a lieu delay secondes après la dernière planification, et au
+    plus tard max_wait secondes après la première planification non écrite.
+    """
+    
+    def __init__(self, path: str, delay: float = 0.5, indent: int = 2, max_wait: float = None):
+        self.path = path
+        self.delay = delay
+        self.max_wait = delay * 4 if max_wait is None else max(max_wait, delay)
+        self.indent = indent
+        self.writes = 0
+        self._lock = threading.Lock()
+        self._pending = None
+        self._first_pending = None
+        self._deadline = None
+        self._timer = None
+        _pending_writers.add(self)
+    
+    def schedule(self, data: dict):
+        """Planifier l'écriture de data; les appels rapprochés ne produisent qu'une écriture"""
+        with self._lock:
+            now = time.monotonic()
+            if self._pending is None:
+                self._first_pending = now
+            self._pending = dict(data)
+            # Chaque appel repousse l'échéance, sans dépasser max_wait depuis la première mise à jour
+            self._deadline = min(now + self.delay, self._first_pending + self.max_wait)
+            if self._timer is None:
+                self._start_timer(self._deadline - now)
+    
+    def _start_timer(self, wait: float):
+        self._timer = threading.Timer(max(0.0, wait), self._expire)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    def _expire(self):
+        """Fin du timer: écrire si l'échéance est atteinte, sinon réarmer pour le temps restant"""
+        with self._lock:
+            # Timer annulé ou remplacé par flush/discard entre-temps
+            if threading.current_thread() is not self._timer:
+                return
+            remaining = self._deadline - time.monotonic()
+            if remaining > 0:
+                self._start_timer(remaining)
+                return
+        self.flush()
+    
+    def flush(self):
+        """Écrire maintenant la dernière version planifiée (sans effet si rien n'est en attente)"""
+        with self._lock:
+            data = self._take_pending()
+            if data is None:
+                return
+            
+            atomic_write_json(self.path, data, indent=self.indent)
+            self.writes += 1
+    
+    def discard(self) -> bool:
+        """Abandonner la mise à jour en attente (fichier supprimé entre-temps), True s'il y en avait une"""
+        with self._lock:
+            return self._take_pending() is not None
+    
+    def _take_pending(self):
+        data, self._pending = self._pending, None
+        self._first_pending = self._deadline = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return data
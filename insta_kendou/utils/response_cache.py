@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Cache des réponses GET d'information (utilisateurs, médias)
+LRU borné en mémoire avec expiration (TTL), disque optionnel et statistiques par endpoint
+"""
+
+import os
+import copy
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from .persistence import atomic_write_json
+from . import fast_json
+
+class ResponseCache:
+    """Cache LRU + TTL des données renvoyées par les endpoints d'information"""
+    
+    def __init__(self, ttl: float = 60, max_entries: int = 512, disk_dir: str = None, ttl_overrides: dict = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.ttl_overrides = dict(ttl_overrides or {})
+        self._entries = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+        
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+    
+    def _disk_path(self, endpoint: str, key: str) -> str:
+        digest = hashlib.sha1(f"{endpoint}:{key}".encode('utf-8')).hexdigest()
+        return os.path.join(self.disk_dir, f"{endpoint}_{digest}.json")
+    
+    def _count(self, endpoint: str, hit: bool):
+        stats = self._stats.setdefault(endpoint, {"hits": 0, "misses": 0, "invalidations": 0})
+        stats["hits" if hit else "misses"] += 1
+    
+    def get(self, endpoint: str, key: str):
+        """Retourner une copie de la valeur en cache (None si absente ou expirée)"""
+        key = str(key)
+        now = time.time()
+        
+        with self._lock:
+            entry = self._entries.get((endpoint, key))
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end((endpoint, key))
+                    self._count(endpoint, True)
+                    return copy.deepcopy(value)
+                del self._entries[(endpoint, key)]
+        
+        value = None
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(endpoint, key), 'r', encoding='utf-8') as f:
+                    stored = fast_json.load(f)
+                if stored["expires_at"] > now:
+                    value = stored["value"]
+                    with self._lock:
+                        self._store(endpoint, key, value, stored["expires_at"])
+            except (OSError, ValueError, KeyError):
+                pass
+        
+        with self._lock:
+            self._count(endpoint, value is not None)
+        return copy.deepcopy(value) if value is not None else None
+    
+    def _store(self, endpoint: str, key: str, value, expires_at: float):
+        self._entries[(endpoint, key)] = (expires_at, value)
+        self._entries.move_to_end((endpoint, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def put(self, endpoint: str, key: str, value, ttl: float = None):
+        """Mettre en cache une valeur (copiée) pour endpoint/key"""
+        key = str(key)
+        ttl = ttl if ttl is not None else self.ttl_overrides.get(endpoint, self.ttl)
+        expires_at = time.time() + ttl
+        value = copy.deepcopy(value)
+        
+        with self._lock:
+            self._store(endpoint, key, value, expires_at)
+        
+        if self.disk_dir:
+            try:
+                atomic_write_json(self._disk_path(endpoint, key), {"expires_at": expires_at, "value": value}, lock=False)
+            except (OSError, TypeError, ValueError) as e:
+                print(f"⚠️ Erreur écriture cache réponses: {e}")
+    
+    def invalidate(self, endpoint: str, key: str = None):
+        """Supprimer une entrée (ou toutes les entrées d'un endpoint si key est None)"""
+        with self._lock:
+            if key is None:
+                keys = [entry_key for entry_key in self._entries if entry_key[0] == endpoint]
+            else:
+                keys = [(endpoint, str(key))]
+            
+            for entry_key in keys:
+                self._entries.pop(entry_key, None)
+            stats = self._stats.setdefault(endpoint, {"hits": 0, "misses": 0, "invalidations": 0})
+            stats["invalidations"] += 1
+        
+        if self.disk_dir:
+            if key is None:
+                paths = [os.path.join(self.disk_dir, name) for name in os.listdir(self.disk_dir)
+                         if name.startswith(f"{endpoint}_")]
+            else:
+                paths = [self._disk_path(endpoint, str(key))]
+            
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    
+    def clear(self):
+        """Vider le cache (mémoire et disque)"""
+        with self._lock:
+            self._entries.clear()
+        
+        if self.disk_dir:
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(self.disk_dir, name))
+                    except OSError:
+                        pass
+    
+    def get_stats(self) -> dict:
+        """Statistiques par endpoint (hits, misses, invalidations, hit_ratio) et nombre d'entrées"""
+        with self._lock:
+            endpoints = {}
+            for endpoint, counters in self._stats.items():
+                total = counters["hits"] + counters["misses"]
+                endpoints[endpoint] = dict(counters, hit_ratio=(counters["hits"] / total) if total else 0.0)
+            return {"entries": len(self._entries), "endpoints": endpoints}
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Nouvelles tentatives des lectures idempotentes (GET) sur erreurs transitoires
+Erreurs réseau et 502/503/504, backoff exponentiel à gigue complète (ou Retry-After) et durée totale bornée
+"""
+
+import time
+import random
+import requests
+from .deadline import current_deadline
+from .throttle import parse_retry_after
+
+class RetryPolicy:
+    """Politique de retry appliquée par TransportAdapter aux méthodes idempotentes
+    
+    Les tentatives d'une même requête partagent les hooks before_send (limiteur de débit:
+    un seul jeton) et restent bornées par max_total et par la deadline active. Un
+    Retry-After de la réponse remplace le backoff s'il est plus long; s'il dépasse le
+    budget restant, la réponse est retournée sans nouvelle tentative.
+    """
+    
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 max_total: float = 20.0, statuses: tuple = (502, 503, 504), methods: tuple = ("GET", "HEAD")):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_total = max_total
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(methods)
+    
+    def backoff(self, attempt: int) -> float:
+        """Délai avant la tentative suivante (gigue complète: uniforme entre 0 et le plafond exponentiel)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+    
+    def execute(self, request, send):
+        """Appeler send() jusqu'à obtenir une réponse non transitoire ou épuiser le budget de retry"""
+        started = time.monotonic()
+        attempt = 0
+        
+        while True:
+            error = None
+            try:
+                response = send()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                response, error = None, e
+            
+            if error is None and response.status_code not in self.statuses:
+                return response
+            
+            attempt += 1
+            delay = self.backoff(attempt - 1)
+            if response is not None:
+                retry_after = parse_retry_after(response.headers.get("retry-after"))
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+            deadline = current_deadline()
+            out_of_time = time.monotonic() - started + delay >= self.max_total or \
+                (deadline is not None and deadline.remaining() <= delay)
+            
+            if attempt >= self.max_attempts or out_of_time:
+                if error is not None:
+                    raise error
+                return response
+            
+            if response is not None:
+                response.close()
+            
+            # Signaler la nouvelle tentative comme le client officiel
+            if "x-tigon-is-retry" in request.headers:
+                request.headers["x-tigon-is-retry"] = "True"
+            time.sleep(delay)
@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""
+Stockage des sessions Instagram
+Backends interchangeables: fichiers JSON (historique) et SQLite indexé (mode WAL)
+"""
+
+import os
+import glob
+import time
+import zlib
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from .persistence import atomic_write_json, atomic_update_json, CoalescingWriter
+from . import fast_json
+
+# Durée de validité d'une session sauvegardée
+SESSION_TTL = 7 * 24 * 3600
+
+def session_summary(username: str, session_data: dict) -> dict:
+    """Extraire les champs indexés d'une session (username, user_id, dates, profil)"""
+    user_data = session_data.get("user_data", {}) or session_data.get("logged_in_user", {})
+    created_at = session_data.get("created_at") or session_data.get("last_login") or session_data.get("session_created", 0)
+    created_at = int(created_at or 0)
+    
+    return {
+        "username": username,
+        "user_id": str(user_data.get("user_id", "") or session_data.get("account_id", "")),
+        "created_at": created_at,
+        "expires_at": created_at + SESSION_TTL,
+        "full_name": user_data.get("full_name", ""),
+        "is_private": bool(user_data.get("is_private", False)),
+        "is_verified": bool(user_data.get("is_verified", False))
+    }
+
+class SessionStore(ABC):
+    """Interface commune des backends de sessions
+    
+    Un backend implémente save, load, delete et list_sessions; find_by_user_id et
+    purge_expired ont une implémentation générique basée sur list_sessions.
+    """
+    
+    @abstractmethod
+    def save(self, username: str, session_data: dict):
+        """Enregistrer (ou remplacer) la session d'un compte"""
+    
+    @abstractmethod
+    def load(self, username: str) -> dict:
+        """Charger la session brute d'un compte (None si absente, sans contrôle d'expiration)"""
+    
+    @abstractmethod
+    def delete(self, username: str) -> bool:
+        """Supprimer la session d'un compte"""
+    
+    @abstractmethod
+    def list_sessions(self) -> list:
+        """Lister les sessions stockées (résumés, voir session_summary)"""
+    
+    def find_by_user_id(self, user_id: str) -> dict:
+        """Retrouver le résumé d'une session par user_id"""
+        for summary in self.list_sessions():
+            if summary["user_id"] == str(user_id):
+                return summary
+        return None
+    
+    def purge_expired(self, now: float = None) -> int:
+        """Supprimer les sessions expirées, retourne le nombre supprimé"""
+        now = time.time() if now is None else now
+        expired = [summary["username"] for summary in self.list_sessions() if summary["expires_at"] <= now]
+        for username in expired:
+            self.delete(username)
+        return len(expired)
+    
+    def close(self):
+        """Libérer les ressources du backend"""
+        pass
+
+class JSONSessionStore(SessionStore):
+    """Sessions en fichiers sessions/{username}_ig_complete.json (format historique)
+    
+    Un index (sessions/index.json) contient le résumé de chaque session et est mis à
+    jour à chaque sauvegarde/suppression: le listage ne lit qu'un seul fichier.
+    Les sauvegardes rapprochées d'un même compte passent par un CoalescingWriter
+    (write_delay secondes) et l'index n'est réécrit que si le résumé change.
+    """
+    
+    INDEX_FILENAME = "index.json"
+    
+    def __init__(self, sessions_dir: str = "sessions", write_delay: float = 0.5):
+        self.sessions_dir = sessions_dir
+        self.index_path = os.path.join(sessions_dir, self.INDEX_FILENAME)
+        self.write_delay = write_delay
+        self._writers = {}
+        self._indexed = {}
+        self._lock = threading.Lock()
+    
+    def _complete_path(self, username: str) -> str:
+        return os.path.join(self.sessions_dir, f"{username}_ig_complete.json")
+    
+    def _simple_path(self, username: str) -> str:
+        return os.path.join(self.sessions_dir, f"{username}_ig.json")
+    
+    def _writer(self, username: str) -> CoalescingWriter:
+        with self._lock:
+            writer = self._writers.get(username)
+            if writer is None:
+                writer = self._writers[username] = CoalescingWriter(self._complete_path(username), delay=self.write_delay)
+            return writer
+    
+    def save(self, username: str, session_data: dict):
+        os.makedirs(self.sessions_dir, exist_ok=True)
+        
+        writer = self._writer(username)
+        writer.schedule(session_data)
+        
+        summary = session_summary(username, session_data)
+        if self._indexed.get(username) != summary or not os.path.exists(self.index_path):
+            self._update_index(username, summary)
+            self._indexed[username] = summary
+        
+        # Supprimer l'ancien fichier simple s'il existe (après écriture du fichier complet)
+        simple_filename = self._simple_path(username)
+        if os.path.exists(simple_filename):
+            writer.flush()
+            try:
+                os.remove(simple_filename)
+            except OSError:
+                pass
+    
+    def flush(self):
+        """Écrire immédiatement les sauvegardes en attente"""
+        with self._lock:
+            writers = list(self._writers.values())
+        for writer in writers:
+            writer.flush()
+    
+    def close(self):
+        self.flush()
+    
+    def load(self, username: str) -> dict:
+        writer = self._writers.get(username)
+        if writer is not None:
+            writer.flush()
+        
+        for filename in (self._complete_path(username), self._simple_path(username)):
+            try:
+                with open(filename, 'r', encoding='utf-8') as f:
+                    return fast_json.load(f)
+            except FileNotFoundError:
+                continue
+        return None
+    
+    def delete(self, username: str) -> bool:
+        writer = self._writers.get(username)
+        deleted = writer is not None and writer.discard()
+        self._indexed.pop(username, None)
+        
+        for filename in (self._complete_path(username), self._simple_path(username)):
+            try:
+                os.remove(filename)
+                deleted = True
+            except OSError:
+                pass
+        
+        if os.path.exists(self.index_path):
+            self._update_index(username, None)
+        return deleted
+    
+    def _update_index(self, username: str, summary: dict):
+        """Ajouter/remplacer (ou retirer si summary est None) une entrée de l'index
+        
+        Index absent ou illisible: il est d'abord reconstruit depuis les fichiers de
+        session, sous le même verrou, pour ne pas masquer les sessions antérieures.
+        """
+        def update(index):
+            if not isinstance(index, dict):
+                # Sessions sur disque + sauvegardes de ce store encore en attente d'écriture
+                index = {existing["username"]: existing for existing in self._scan_sessions()}
+                index.update(self._indexed)
+            if summary is None:
+                index.pop(username, None)
+            else:
+                index[username] = summary
+            return index
+        
+        atomic_update_json(self.index_path, update)
+    
+    def list_sessions(self) -> list:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = fast_json.load(f)
+            return [index[username] for username in sorted(index)]
+        except (OSError, ValueError):
+            return self.rebuild_index()
+    
+    def rebuild_index(self) -> list:
+        """Reconstruire l'index depuis les fichiers de session (sessions antérieures à l'index)"""
+        self.flush()
+        sessions = self._scan_sessions()
+        if sessions:
+            os.makedirs(self.sessions_dir, exist_ok=True)
+            atomic_write_json(self.index_path, {summary["username"]: summary for summary in sessions})
+        return sessions
+    
+    def _scan_sessions(self) -> list:
+        sessions = []
+        for file_path in sorted(glob.glob(os.path.join(self.sessions_dir, "*_ig_complete.json"))):
+            username = os.path.basename(file_path)[:-len("_ig_complete.json")]
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    session_data = fast_json.load(f)
+            except (OSError, ValueError):
+                continue
+            sessions.append(session_summary(username, session_data))
+        return sessions
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions dans une base SQLite (WAL): colonnes indexées + blob JSON compact compressé"""
+    
+    def __init__(self, db_path: str = os.path.join("sessions", "sessions.db")):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                username TEXT PRIMARY KEY,
+                user_id TEXT,
+                created_at INTEGER,
+                expires_at INTEGER,
+                full_name TEXT,
+                is_private INTEGER,
+                is_verified INTEGER,
+                data BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions(user_id);
+            CREATE INDEX IF NOT EXISTS idx_sessions_created_at ON sessions(created_at);
+            CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at);
+        """)
+        self._conn.commit()
+    
+    @staticmethod
+    def _encode(session_data: dict) -> bytes:
+        return zlib.compress(fast_json.dumps(session_data, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+    
+    @staticmethod
+    def _decode(blob: bytes) -> dict:
+        return fast_json.loads(zlib.decompress(blob).decode('utf-8'))
+    
+    @staticmethod
+    def _row_to_summary(row) -> dict:
+        return {
+            "username": row[0],
+            "user_id": row[1] or "",
+            "created_at": row[2] or 0,
+            "expires_at": row[3] or 0,
+            "full_name": row[4] or "",
+            "is_private": bool(row[5]),
+            "is_verified": bool(row[6])
+        }
+    
+    def save(self, username: str, session_data: dict):
+        summary = session_summary(username, session_data)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions "
+                "(username, user_id, created_at, expires_at, full_name, is_private, is_verified, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (username, summary["user_id"], summary["created_at"], summary["expires_at"],
+                 summary["full_name"], int(summary["is_private"]), int(summary["is_verified"]),
+                 self._encode(session_data))
+            )
+    
+    def load(self, username: str) -> dict:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM sessions WHERE username = ?", (username,)).fetchone()
+        return self._decode(row[0]) if row else None
+    
+    def delete(self, username: str) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM sessions WHERE username = ?", (username,))
+        return cursor.rowcount > 0
+    
+    def list_sessions(self) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT username, user_id, created_at, expires_at, full_name, is_private, is_verified "
+                "FROM sessions ORDER BY username"
+            ).fetchall()
+        return [self._row_to_summary(row) for row in rows]
+    
+    def find_by_user_id(self, user_id: str) -> dict:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT username, user_id, created_at, expires_at, full_name, is_private, is_verified "
+                "FROM sessions WHERE user_id = ? ORDER BY created_at DESC LIMIT 1", (str(user_id),)
+            ).fetchone()
+        return self._row_to_summary(row) if row else None
+    
+    def purge_expired(self, now: float = None) -> int:
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (int(now),))
+        return cursor.rowcount
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def migrate_json_sessions(target: SessionStore, sessions_dir: str = "sessions", remove_source: bool = False) -> int:
+    """Copier les sessions JSON existantes vers un autre backend (ex: SQLiteSessionStore)"""
+    source = JSONSessionStore(sessions_dir)
+    migrated = 0
+    
+    for file_path in sorted(glob.glob(os.path.join(sessions_dir, "*_ig_complete.json")) +
+                            glob.glob(os.path.join(sessions_dir, "*_ig.json"))):
+        filename = os.path.basename(file_path)
+        suffix = "_ig_complete.json" if filename.endswith("_ig_complete.json") else "_ig.json"
+        username = filename[:-len(suffix)]
+        
+        # Le fichier complet est prioritaire sur l'ancien fichier simple
+        if suffix == "_ig.json" and os.path.exists(source._complete_path(username)):
+            continue
+        
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                session_data = fast_json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Session ignorée ({filename}): {e}")
+            continue
+        
+        target.save(username, session_data)
+        migrated += 1
+        
+        if remove_source:
+            source.delete(username)
+    
+    return migrated
+
+def list_sessions(store: SessionStore = None) -> list:
+    """Lister les comptes sauvegardés sans charger les sessions complètes
+    
+    Chaque entrée contient username, user_id, created_at (dernière connexion),
+    expires_at, full_name, is_private, is_verified et is_valid.
+    """
+    store = store or JSONSessionStore()
+    now = time.time()
+    
+    sessions = []
+    for summary in store.list_sessions():
+        summary = dict(summary)
+        summary["is_valid"] = summary["expires_at"] > now
+        sessions.append(summary)
+    return sessions
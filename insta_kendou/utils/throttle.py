@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Limitation de débit côté client, par session et par famille d'endpoints
+Seaux à jetons ralentis automatiquement par les signaux serveur (429, Retry-After, feedback_required)
+"""
+
+import re
+import time
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from ..exceptions import RateLimitError, DeadlineExceededError
+from .deadline import current_deadline
+
+# Familles d'endpoints (premier motif correspondant); None = non limité (connexion, challenges)
+ENDPOINT_FAMILIES = [
+    (None, re.compile(r'/accounts/(login|two_factor|contact_point)|/bloks/|/launcher/|/challenge/|/qe/|/zr/')),
+    ("upload", re.compile(r'/rupload_|/media/configure')),
+    ("friendships", re.compile(r'/friendships/')),
+    ("likes", re.compile(r'/(un)?like/')),
+    ("comments", re.compile(r'/comment')),
+]
+
+# (jetons par seconde, capacité) par famille
+DEFAULT_RATES = {
+    "upload": (0.2, 3),
+    "friendships": (0.5, 5),
+    "likes": (0.5, 5),
+    "comments": (0.3, 3),
+    "write": (1.0, 5),
+    "read": (5.0, 10)
+}
+
+# Indices de limitation dans un feedback_required (même classification que handle_feedback_required)
+RATE_LIMIT_HINTS = (b"limit", b"please wait", b"try again later", "réessayer plus tard".encode('utf-8'),
+                    b"r\\u00e9essayer plus tard")
+
+def endpoint_family(request) -> str:
+    """Famille d'endpoints d'une requête (None si la requête n'est pas limitée)"""
+    path = urlsplit(request.url).path
+    for family, pattern in ENDPOINT_FAMILIES:
+        if pattern.search(path):
+            return family
+    return "read" if request.method == "GET" else "write"
+
+def parse_retry_after(value: str) -> float:
+    """Délai Retry-After en secondes (nombre de secondes ou date HTTP), None si illisible"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """Seau à jetons avec période de pause (cool-down) et débit adaptatif (baisse x0.5, remontée progressive)"""
+    
+    def __init__(self, rate: float, capacity: float, min_rate: float = None):
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.tokens = float(capacity)
+        self.blocked_until = 0.0
+        self.penalties = 0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def reserve(self) -> float:
+        """Réserver un jeton; retourne l'attente nécessaire en secondes (0 si immédiat)"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, self.blocked_until - now)
+            
+            # Le jeton est consommé à la fin de l'attente (solde négatif = file d'attente)
+            available = self.tokens + wait * self.rate
+            if available < 1:
+                wait += (1 - available) / self.rate
+            self.tokens -= 1
+            return wait
+    
+    def penalize(self, cooldown: float):
+        """Signal de limitation serveur: pause de cooldown secondes et débit divisé par 2"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.blocked_until = max(self.blocked_until, now + cooldown)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            self.penalties += 1
+    
+    def reward(self):
+        """Réponse acceptée: remonter progressivement vers le débit nominal"""
+        if self.rate < self.base_rate:
+            with self._lock:
+                self.rate = min(self.base_rate, self.rate + self.base_rate / 20)
+    
+    def state(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "tokens": round(self.tokens, 3),
+                "capacity": self.capacity,
+                "rate": round(self.rate, 4),
+                "base_rate": self.base_rate,
+                "cooldown_remaining": round(max(0.0, self.blocked_until - now), 3),
+                "penalties": self.penalties
+            }
+
+class ServerAwareThrottle:
+    """Limiteur par famille d'endpoints branché sur TransportAdapter (before_send + observer)
+    
+    Les requêtes sont mises en attente jusqu'à la fin du cool-down; si l'attente
+    dépasse max_wait, RateLimitError est levée sans envoyer la requête.
+    """
+    
+    def __init__(self, rates: dict = None, max_wait: float = None, default_cooldown: float = 60,
+                 max_cooldown: float = 900):
+        self.rates = dict(DEFAULT_RATES, **(rates or {}))
+        self.max_wait = max_wait
+        self.default_cooldown = default_cooldown
+        self.max_cooldown = max_cooldown
+        self._buckets = {}
+        self._streaks = {}
+        self._lock = threading.Lock()
+    
+    def bucket(self, family: str) -> TokenBucket:
+        bucket = self._buckets.get(family)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(family)
+                if bucket is None:
+                    rate, capacity = self.rates.get(family, self.rates["write"])
+                    bucket = self._buckets[family] = TokenBucket(rate, capacity)
+        return bucket
+    
+    def before_send(self, request, send_kwargs: dict):
+        """Hook before_send: attendre un jeton (et la fin d'un éventuel cool-down)"""
+        family = endpoint_family(request)
+        if family is None:
+            return
+        
+        bucket = self.bucket(family)
+        wait = bucket.reserve()
+        if wait <= 0:
+            return
+        
+        deadline = current_deadline()
+        over_budget = deadline is not None and wait >= deadline.remaining()
+        if over_budget or (self.max_wait is not None and wait > self.max_wait):
+            # Rendre le jeton réservé: la requête n'est pas envoyée
+            with bucket._lock:
+                bucket.tokens += 1
+            if over_budget:
+                raise DeadlineExceededError(f"Limite de débit ({family}): attente de {int(wait) + 1}s au-delà du délai",
+                                            budget=deadline.budget)
+            raise RateLimitError(f"Limite de débit ({family}): réessayer dans {int(wait) + 1}s", retry_after=int(wait) + 1)
+        time.sleep(wait)
+    
+    def observe(self, request, response, error, elapsed: float):
+        """Observer: détecter 429, Retry-After et feedback_required de limitation"""
+        if response is None:
+            return
+        family = endpoint_family(request)
+        if family is None:
+            return
+        
+        cooldown = self._rate_limit_cooldown(family, response)
+        if cooldown is None:
+            if response.status_code < 400:
+                self._streaks.pop(family, None)
+                self.bucket(family).reward()
+            return
+        
+        self.bucket(family).penalize(cooldown)
+        print(f"⏳ Limitation Instagram ({family}): pause de {int(cooldown)}s")
+    
+    def _rate_limit_cooldown(self, family: str, response) -> float:
+        """Durée de pause imposée par la réponse (None si la réponse n'est pas une limitation)"""
+        status = response.status_code
+        retry_after = parse_retry_after(response.headers.get("retry-after"))
+        
+        limited = status == 429 or (status >= 400 and retry_after is not None)
+        if not limited and status in (400, 403):
+            content = (response.content or b"")[:4096].lower()
+            limited = b"feedback_required" in content and any(hint in content for hint in RATE_LIMIT_HINTS)
+        if not limited:
+            return None
+        
+        if retry_after is not None:
+            return min(retry_after, self.max_cooldown)
+        
+        # Sans indication du serveur: pause exponentielle sur les signaux consécutifs
+        streak = self._streaks.get(family, 0)
+        self._streaks[family] = streak + 1
+        return min(self.default_cooldown * (2 ** streak), self.max_cooldown)
+    
+    def get_state(self) -> dict:
+        """Budget courant par famille (jetons, débit, cool-down restant, pénalités)"""
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {family: bucket.state() for family, bucket in sorted(buckets.items())}
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Timeouts adaptatifs par endpoint à partir des latences observées
+Timeout de lecture = p99 x k borné (plancher / plafond), timeout de connexion fixe, surcharges par appel
+"""
+
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+from .transport import _ID_PATTERN
+
+def _route(request) -> tuple:
+    url = urlsplit(request.url)
+    return url.hostname or "", f"{request.method} {_ID_PATTERN.sub('{id}', url.path)}"
+
+def _split_timeout(timeout) -> tuple:
+    if isinstance(timeout, tuple):
+        return timeout
+    return timeout, timeout
+
+class _LatencyWindow:
+    """Dernières latences observées et timeout recalculé périodiquement"""
+    
+    def __init__(self, size: int):
+        self.samples = deque(maxlen=size)
+        self.recorded = 0
+        self.p99 = None
+    
+    def record(self, value: float, recompute_every: int, min_samples: int):
+        self.samples.append(value)
+        self.recorded += 1
+        if len(self.samples) >= min_samples and (self.p99 is None or self.recorded % recompute_every == 0):
+            ordered = sorted(self.samples)
+            self.p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+class AdaptiveTimeoutPolicy:
+    """Politique de timeouts branchée sur TransportAdapter (before_send + observer)
+    
+    Lecture: p99 des latences de l'endpoint (méthode + chemin) x k, entre read_floor et le
+    timeout demandé par l'appelant (plafond). Tant que min_samples mesures ne sont pas
+    disponibles, le timeout de l'appelant est conservé. Connexion: fixe (connect_timeout,
+    ou celui de l'appelant si None); la latence mesurée, requête complète, ne l'isole pas.
+    
+    Les requêtes en échec (timeout, connexion coupée) sont enregistrées comme mesures
+    censurées à la limite courante de l'endpoint: un timeout trop court se relâche au lieu
+    de ne jamais voir les réponses lentes.
+    
+    overrides: {"GET /api/v{id}/users/{id}/info/": 5, ...} fixe le timeout d'un endpoint;
+    deadline.timeout_override() fixe celui des appels d'un bloc.
+    """
+    
+    def __init__(self, k: float = 3.0, read_floor: float = 2.0, connect_timeout: float = None,
+                 min_samples: int = 20, window: int = 200, recompute_every: int = 10, overrides: dict = None):
+        self.k = k
+        self.read_floor = read_floor
+        self.connect_timeout = connect_timeout
+        self.min_samples = min_samples
+        self.window = window
+        self.recompute_every = recompute_every
+        self.overrides = dict(overrides or {})
+        self._endpoints = {}
+        self._lock = threading.Lock()
+    
+    def _adaptive_read(self, window: _LatencyWindow):
+        return max(self.read_floor, window.p99 * self.k) if window is not None and window.p99 is not None else None
+    
+    def timeout_for(self, request, requested=None) -> tuple:
+        """Timeout (connect, read) à appliquer à une requête"""
+        _, route = _route(request)
+        override = self.overrides.get(route)
+        if override is not None:
+            return _split_timeout(override)
+        
+        connect, read = _split_timeout(requested)
+        if self.connect_timeout is not None:
+            connect = self.connect_timeout
+        
+        adaptive = self._adaptive_read(self._endpoints.get(route))
+        if adaptive is not None:
+            read = adaptive if read is None else min(read, adaptive)
+        
+        return connect, read
+    
+    def before_send(self, request, send_kwargs: dict):
+        """Hook before_send: remplacer le timeout demandé par le timeout adaptatif"""
+        send_kwargs["timeout"] = self.timeout_for(request, send_kwargs.get("timeout"))
+    
+    def observe(self, request, response, error, elapsed: float):
+        """Observer: latence des réponses, échecs enregistrés au moins à la limite courante"""
+        _, route = _route(request)
+        with self._lock:
+            window = self._endpoints.get(route)
+            if window is None:
+                window = self._endpoints[route] = _LatencyWindow(self.window)
+            if response is None:
+                # Mesure censurée: la vraie latence dépasse au moins la limite appliquée
+                elapsed = max(elapsed, self._adaptive_read(window) or 0.0)
+            window.record(elapsed, self.recompute_every, self.min_samples)
+    
+    def get_state(self) -> dict:
+        """Par endpoint: nombre de mesures, p99 observé (s) et timeout de lecture adaptatif (s)"""
+        with self._lock:
+            endpoints = dict(self._endpoints)
+        state = {}
+        for route, window in sorted(endpoints.items()):
+            state[route] = {
+                "samples": len(window.samples),
+                "p99": round(window.p99, 4) if window.p99 is not None else None,
+                "read_timeout": round(self._adaptive_read(window), 3) if window.p99 is not None else None
+            }
+        return state
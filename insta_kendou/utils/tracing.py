@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Traçage léger par spans imbriqués (connexion, 2FA, challenges)
+Export JSONL au format des spans OTLP/JSON d'OpenTelemetry, sans dépendance au SDK OTel
+"""
+
+import os
+import time
+import functools
+import threading
+import contextvars
+from urllib.parse import urlsplit
+from . import fast_json
+
+# Span actif du contexte courant (thread ou tâche)
+_current_span = contextvars.ContextVar("insta_kendou_span", default=None)
+
+# Codes OTLP
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+class Span:
+    """Span en cours: nom, parent, horodatages (ns), attributs, événements et statut"""
+    
+    def __init__(self, tracer, name: str, parent=None, attributes: dict = None, kind: int = SPAN_KIND_INTERNAL,
+                 start_time_ns: int = None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent.span_id if parent else ""
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.events = []
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+        self.start_time_ns = start_time_ns or time.time_ns()
+        self.end_time_ns = None
+        self._token = None
+    
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+    
+    def add_event(self, name: str, attributes: dict = None):
+        self.events.append((time.time_ns(), name, dict(attributes or {})))
+    
+    def set_status(self, ok: bool, message: str = ""):
+        self.status_code = STATUS_OK if ok else STATUS_ERROR
+        self.status_message = message
+    
+    def end(self, end_time_ns: int = None):
+        if self.end_time_ns is None:
+            self.end_time_ns = end_time_ns or time.time_ns()
+            self.tracer._export(self)
+    
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.set_status(False, f"{exc_type.__name__}: {exc}")
+        self.end()
+        return False
+    
+    def to_otlp(self) -> dict:
+        """Représentation OTLP/JSON du span"""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": self.status_code}
+        }
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        if self.events:
+            span["events"] = [
+                {"timeUnixNano": str(ts), "name": name,
+                 "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]}
+                for ts, name, attributes in self.events
+            ]
+        return span
+
+class _NoopSpan:
+    """Span inactif (aucune trace en cours): toutes les opérations sont sans effet"""
+    
+    def set_attribute(self, key, value):
+        pass
+    
+    def add_event(self, name, attributes=None):
+        pass
+    
+    def set_status(self, ok, message=""):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+class JSONLSpanExporter:
+    """Ajoute chaque span terminé comme une ligne JSON (OTLP/JSON) dans un fichier"""
+    
+    def __init__(self, path: str, service_name: str = "insta_kendou"):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    def export(self, span: Span):
+        record = span.to_otlp()
+        record["resource"] = {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]}
+        line = fast_json.dumps(record, separators=(',', ':'), ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+
+class InMemorySpanExporter:
+    """Conserve les spans terminés en mémoire (inspection, affichage)"""
+    
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+    
+    def export(self, span: Span):
+        with self._lock:
+            self.spans.append(span.to_otlp())
+
+class Tracer:
+    """Crée les spans racines et les transmet à l'exporteur (désactivé si exporter est None)"""
+    
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+    
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+    
+    def span(self, name: str, attributes: dict = None):
+        """Ouvrir un span (enfant du span courant s'il existe), à utiliser avec with"""
+        if self.exporter is None:
+            return _NOOP_SPAN
+        return Span(self, name, _current_span.get(), attributes)
+    
+    def _export(self, span: Span):
+        exporter = self.exporter
+        if exporter is None:
+            return
+        try:
+            exporter.export(span)
+        except Exception as e:
+            print(f"⚠️ Erreur export trace: {e}")
+    
+    def observe_http(self, request, response, error, elapsed: float):
+        """Observer TransportAdapter: un span client par requête HTTP émise pendant un span actif"""
+        parent = _current_span.get()
+        if parent is None or parent.tracer is not self:
+            return
+        
+        end_ns = time.time_ns()
+        url = urlsplit(request.url)
+        attributes = {"http.request.method": request.method, "server.address": url.hostname or "",
+                      "url.path": url.path}
+        friendly_name = request.headers.get("x-fb-friendly-name")
+        if friendly_name:
+            attributes["ig.friendly_name"] = friendly_name
+        
+        span = Span(self, f"HTTP {request.method}", parent, attributes, SPAN_KIND_CLIENT,
+                    start_time_ns=end_ns - int(elapsed * 1e9))
+        if error is not None:
+            span.set_status(False, f"{type(error).__name__}: {error}")
+        else:
+            span.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 400:
+                span.set_status(False, f"HTTP {response.status_code}")
+        span.end(end_ns)
+
+def current_span():
+    """Span actif du contexte courant (None hors trace)"""
+    return _current_span.get()
+
+def span(name: str, attributes: dict = None):
+    """Ouvrir un span enfant du span courant; sans effet hors d'une trace"""
+    parent = _current_span.get()
+    if parent is None:
+        return _NOOP_SPAN
+    return Span(parent.tracer, name, parent, attributes)
+
+def traced(name: str):
+    """Décorateur: exécuter la fonction dans un span enfant
+    
+    Un résultat {"success": False, "error": ...} marque le span en erreur.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            parent = _current_span.get()
+            if parent is None:
+                return func(*args, **kwargs)
+            
+            with Span(parent.tracer, name, parent) as current:
+                result = func(*args, **kwargs)
+                if isinstance(result, dict) and result.get("success") is False:
+                    current.set_status(False, str(result.get("error") or result.get("message") or ""))
+                return result
+        return wrapper
+    return decorator
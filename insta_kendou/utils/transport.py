@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Couche de transport HTTP partagée par le client Instagram
+Session requests sûre en multi-thread (cookies verrouillés) et adaptateur avec points d'extension
+"""
+
+import re
+import time
+import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+from .deadline import current_deadline, current_timeout_override
+from .retry import RetryPolicy
+
+_ID_PATTERN = re.compile(r'\d+')
+
+def endpoint_name(request) -> str:
+    """Nom logique d'une requête: x-ig-client-endpoint, x-fb-friendly-name ou chemin (IDs normalisés)"""
+    headers = request.headers
+    name = headers.get("x-ig-client-endpoint") or headers.get("x-fb-friendly-name")
+    if not name:
+        name = urlsplit(request.url).path
+    return _ID_PATTERN.sub("{id}", name)
+
+class ThreadSafeCookieJar(RequestsCookieJar):
+    """Cookie jar dont les lectures et mises à jour sont sérialisées par le verrou interne du jar
+    
+    http.cookiejar verrouille déjà extract_cookies/set_cookie; ce jar protège aussi
+    l'itération (merge_cookies, get_dict...) et les mises à jour groupées.
+    """
+    
+    def __iter__(self):
+        with self._cookies_lock:
+            cookies = list(super().__iter__())
+        return iter(cookies)
+    
+    def set(self, name, value, **kwargs):
+        with self._cookies_lock:
+            return super().set(name, value, **kwargs)
+    
+    def update(self, other):
+        with self._cookies_lock:
+            super().update(other)
+    
+    def get(self, name, default=None, domain=None, path=None):
+        with self._cookies_lock:
+            return super().get(name, default, domain, path)
+    
+    def get_dict(self, domain=None, path=None):
+        with self._cookies_lock:
+            return super().get_dict(domain, path)
+    
+    def copy(self):
+        new_cj = ThreadSafeCookieJar()
+        new_cj.set_policy(self.get_policy())
+        new_cj.update(self)
+        return new_cj
+
+class TransportAdapter(HTTPAdapter):
+    """Adaptateur HTTP avec points d'extension
+    
+    before_send: callables(request, send_kwargs) appelés avant l'envoi (peuvent ajuster
+    send_kwargs, par exemple le timeout, ou lever une exception pour refuser l'envoi).
+    observers: callables(request, response, error, elapsed) appelés après chaque envoi.
+    Le timeout est ensuite remplacé par un éventuel timeout_override() puis borné
+    par la deadline active (voir deadline.Deadline).
+    retry_policy: RetryPolicy des méthodes idempotentes (None = une seule tentative); les
+    hooks before_send ne sont appelés qu'une fois, les observers à chaque tentative.
+    """
+    
+    def __init__(self, *args, retry_policy=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.before_send = []
+        self.observers = []
+        self.retry_policy = retry_policy
+    
+    def send(self, request, **kwargs):
+        for hook in self.before_send:
+            hook(request, kwargs)
+        
+        override = current_timeout_override()
+        if override is not None:
+            kwargs["timeout"] = override
+        
+        policy = self.retry_policy
+        if policy is None or request.method not in policy.methods:
+            return self._send_attempt(request, kwargs)
+        return policy.execute(request, lambda: self._send_attempt(request, kwargs))
+    
+    def _send_attempt(self, request, kwargs: dict):
+        """Une tentative d'envoi: timeout borné par la deadline, observers notifiés"""
+        deadline = current_deadline()
+        if deadline is not None:
+            kwargs = dict(kwargs, timeout=deadline.clamp(kwargs.get("timeout")))
+        
+        observers = self.observers
+        if not observers:
+            return super().send(request, **kwargs)
+        
+        start = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except Exception as e:
+            elapsed = time.perf_counter() - start
+            for observer in observers:
+                observer(request, None, e, elapsed)
+            raise
+        
+        elapsed = time.perf_counter() - start
+        for observer in observers:
+            observer(request, response, None, elapsed)
+        return response
+    
+    def warm_up(self, url: str, connections: int = 1, verify=True, proxies: dict = None, cert=None,
+                timeout: float = 5.0) -> int:
+        """Ouvrir à l'avance des connexions (DNS, TCP, TLS) dans le pool de l'hôte de url
+        
+        verify, proxies et cert doivent être ceux des requêtes réelles (voir
+        Session.merge_environment_settings) pour que les connexions soient rendues au même
+        pool. Retourne le nombre de connexions ouvertes.
+        """
+        request = requests.Request("GET", url).prepare()
+        if hasattr(self, "get_connection_with_tls_context"):
+            pool = self.get_connection_with_tls_context(request, verify, proxies=proxies, cert=cert)
+        else:
+            pool = self.get_connection(url, proxies)
+        
+        # Prendre toutes les connexions avant de les rendre pour en ouvrir plusieurs distinctes
+        opened = []
+        try:
+            for _ in range(connections):
+                conn = pool._get_conn(timeout=timeout)
+                if conn.sock is None:
+                    conn.timeout = timeout
+                    conn.connect()
+                opened.append(conn)
+        finally:
+            for conn in opened:
+                pool._put_conn(conn)
+        return len(opened)
+
+def create_session() -> requests.Session:
+    """Créer une session requests utilisable depuis plusieurs threads
+    
+    Adaptateur TransportAdapter avec retry des GET sur erreurs transitoires (RetryPolicy par défaut).
+    """
+    session = requests.Session()
+    session.cookies = ThreadSafeCookieJar()
+    
+    adapter = TransportAdapter(retry_policy=RetryPolicy())
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_transport_adapter(session: requests.Session) -> TransportAdapter:
+    """Retourner le TransportAdapter monté sur une session (None si absent)"""
+    adapter = session.get_adapter("https://")
+    return adapter if isinstance(adapter, TransportAdapter) else None
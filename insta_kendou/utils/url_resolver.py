@@ -5,11 +5,11 @@ Gestion complète des liens courts, extraction media/user IDs avec recherche sim
 """
 
 import re
-import requests
 import time
 import random
 from .license import validate_license
 from .encryption import InstagramEncryption
+from .transport import create_session
 
 class URLResolver:
     """Résolveur d'URLs Instagram avec support complet des liens courts et recherche similaire"""
@@ -19,7 +19,7 @@ class URLResolver:
         if not validate_license():
             raise PermissionError("Ce script n'est pas autorisé à utiliser cette bibliothèque. Veuillez contacter le créateur via: 0389561802 ou https://t.me/Kenny5626")
         
-        self.session = requests.Session()
+        self.session = create_session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Linux; Android 12; SM-G991B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Mobile Safari/537.36'
         })
@@ -23,7 +23,8 @@ def read_requirements():
             'requests>=2.31.0',
             'Pillow>=10.0.0',
             'pycryptodome>=3.19.0',
-            'PyNaCl>=1.5.0'
+            'PyNaCl>=1.5.0',
+            'numpy>=1.22.0'
         ]
 
 # Lecture du README
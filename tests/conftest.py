@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Configuration pytest de insta_kendou
+Rend le paquet importable depuis la racine du dépôt et fournit un serveur HTTP local scriptable
+"""
+
+import os
+import sys
+import json
+import socket
+import struct
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+DEVICE_INFO = {
+    "user_agent": "Instagram 394.0.0.46.81 Android (33/13; 420dpi; 1080x2400; samsung; SM-A546E; a54x; s5e8835; fr_FR; 779659889)",
+    "android_id": "android-0123456789abcdef",
+    "device_uuid": "8c3f3e5e-1f3c-4f9a-9d3b-0123456789ab",
+    "family_device_id": "0b6f2f4e-7a1d-4c2b-8e9f-0123456789ab",
+    "connection_type": "WIFI",
+    "x_mid": "aK" + "x" * 20,
+}
+
+SESSION_DATA = {
+    "user_data": {"user_id": "1234567890", "username": "kendou_test"},
+    "authorization_data": {"authorization_header": "Bearer IGT:2:dGVzdA=="},
+    "cookies": {"sessionid": "1234567890%3Atest%3A1"},
+}
+
+RESET = "reset"
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+    
+    def handle_error(self, request, client_address):
+        # Client parti avant la réponse (timeout, deadline): attendu dans les tests
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+class StubServer:
+    """Serveur HTTP local dont les réponses sont produites par handler(method, path, headers, body)
+    
+    handler retourne (status, headers, body) ou RESET pour couper la connexion sans réponse.
+    Chaque requête reçue est enregistrée dans requests (méthode, chemin), chaque
+    connexion TCP acceptée incrémente connections.
+    """
+    
+    def __init__(self):
+        self.handler = lambda method, path, headers, body: (200, {}, {"status": "ok"})
+        self.requests = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+            
+            def setup(self):
+                with server._lock:
+                    server.connections += 1
+                super().setup()
+            
+            def _dispatch(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                server.requests.append((self.command, self.path))
+                result = server.handler(self.command, self.path, self.headers, body)
+                if result == RESET:
+                    # RST au lieu de FIN: le client voit une connexion réinitialisée
+                    self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+                    self.close_connection = True
+                    return
+                
+                status, headers, payload = result
+                if not isinstance(payload, bytes):
+                    payload = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            do_GET = do_POST = do_HEAD = _dispatch
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = _QuietServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+    
+    def route(self, session):
+        """Rediriger vers ce serveur toutes les requêtes https d'une session insta_kendou"""
+        from insta_kendou.utils import get_transport_adapter
+        
+        def redirect(request, send_kwargs):
+            request.url = self.url + "/" + request.url.partition("://")[2].partition("/")[2]
+        
+        get_transport_adapter(session).before_send.insert(0, redirect)
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    yield server
+    server.close()
+
+@pytest.fixture
+def client():
+    from insta_kendou import InstagramClient
+    return InstagramClient.from_memory(json.loads(json.dumps(SESSION_DATA)), dict(DEVICE_INFO))
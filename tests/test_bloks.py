@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de l'analyse des réponses Bloks 2FA (BloksScan) et des extracteurs de BloksManager / AlternativeManager
+Réponses fixes (context_data, numéros, emails, WhatsApp), une seule analyse par réponse, pas d'état global
+"""
+
+import re
+import random
+import threading
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou.auth import bloks_2fa, alternative_2fa
+from insta_kendou.auth.bloks_2fa import BloksManager
+from insta_kendou.auth.alternative_2fa import AlternativeManager
+from insta_kendou.utils import bloks
+from insta_kendou.utils.bloks import BloksScan, scan_bloks
+
+BASE64 = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+def token(length: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return "".join(rng.choice(BASE64) for _ in range(length))
+
+CONTEXT = token(800, 1) + "|aplrr"
+
+def picker_response(context: str = CONTEXT, extra: str = "") -> str:
+    """Réponse challenge_picker Bloks: méthodes dans le code Bloks, context_data dans un array.Make"""
+    return (
+        '{"layout":{"bloks_payload":{"tree":{"bk.components.Flexbox":{"children":['
+        '{"bk.components.Text":{"text":"Recevoir un code par SMS au +261 ** ** *** 45"}},'
+        '{"bk.components.Text":{"text":"Recevoir un code par SMS au 261 ** ** *** 12"}},'
+        '{"bk.components.Text":{"text":"Envoyer un code par Email à k***n@gmail.com"}},'
+        '{"bk.components.Text":{"text":"Recevoir un code sur WhatsApp"}}]}},'
+        '"action":"(bk.action.array.Make, \\"' + context + '\\", \\"SOWA\\")"'
+        + extra + '}},"status":"ok"}'
+    )
+
+@pytest.fixture
+def bloks_manager():
+    return BloksManager(None)
+
+@pytest.fixture
+def alternative_manager():
+    manager = AlternativeManager(None)
+    manager.challenge_data = {}
+    return manager
+
+def test_bloks_verification_methods(bloks_manager):
+    methods = bloks_manager._extract_bloks_verification_methods(picker_response())
+
+    assert [(method["id"], method["value"]) for method in methods] == [
+        ("SMS", "+261 ** ** *** 12"),
+        ("SMS", "+261 ** ** *** 45"),
+        ("SOWA", "+261 ** ** *** 12"),
+        ("SOWA", "+261 ** ** *** 45"),
+        ("EMAIL", "k***n@gmail.com"),
+    ]
+    assert bloks_manager.challenge_data["challenge_context"] == CONTEXT
+
+def test_bloks_methods_without_whatsapp_indicator(bloks_manager):
+    text = picker_response().replace("WhatsApp", "Appel").replace('\\"SOWA\\"', '\\"SMS\\"')
+    methods = bloks_manager._extract_bloks_verification_methods(text)
+    assert [method["type"] for method in methods] == ["sms", "sms", "email"]
+
+def test_bloks_context_data_rules(bloks_manager):
+    # 1. La plus longue chaîne suffixée l'emporte
+    shorter = token(600, 2) + "|aplc"
+    assert bloks_manager._extract_bloks_context_data(picker_response(extra=',"x":"' + shorter + '"')) == CONTEXT
+
+    # 2. Valeur de "context_data" sans suffixe
+    plain = token(700, 3)
+    assert bloks_manager._extract_bloks_context_data('{"context_data":"' + plain + '"}') == plain
+
+    # 3. Plus longue valeur d'un array.Make
+    longest = token(900, 4)
+    text = '(bk.action.array.Make, "' + token(600, 5) + '") (bk.action.array.Make, "' + longest + '")'
+    assert bloks_manager._extract_bloks_context_data(text) == longest
+
+    # 4. Longue chaîne base64 isolée: suffixe |aplrr ajouté
+    loose = "+/" * 6 + token(1200, 6)
+    assert bloks_manager._extract_bloks_context_data("x " + loose + " y") == loose + "|aplrr"
+
+    # Rien d'exploitable: valeur de repli
+    assert bloks_manager._extract_bloks_context_data('{"status":"ok"}').endswith("|aplrr")
+
+def test_alternative_context_and_methods(alternative_manager):
+    context = token(640, 7)
+    text = ('{"context_data":"' + context + '","text":"Texto au +33 ** ** *** 07\\nEmail: a***z@yahoo.fr",'
+            '"more":"+261 ** ** *** 45 b***c@gmail.com","google_oauth_token":"true"}')
+
+    assert alternative_manager._extract_context_from_alternative_response(text) == context
+    methods = alternative_manager._extract_alternative_verification_methods(text)
+    # Une méthode au plus par liste de candidats (après "Texto", après "SMS", tout numéro; après "Email", tout email)
+    assert [(method["id"], method["value"]) for method in methods] == [
+        ("SMS", "+33 ** ** *** 07"),
+        ("SMS", "+261 ** ** *** 45"),
+        ("EMAIL", "a***z@yahoo.fr"),
+        ("EMAIL", "b***c@gmail.com"),
+        ("WHATSAPP", "+33 ** ** *** 07"),
+    ]
+
+def test_alternative_context_falls_back_to_suffixed_run(alternative_manager):
+    suffixed = token(520, 8) + "|aplc"
+    assert alternative_manager._extract_context_from_alternative_response('["' + suffixed + '"]') == suffixed
+
+def test_one_scan_per_response(monkeypatch, bloks_manager, alternative_manager):
+    scans = []
+
+    def counting_scan(text):
+        scans.append(text)
+        return BloksScan(text)
+
+    monkeypatch.setattr(bloks_2fa, "scan_bloks", counting_scan)
+    monkeypatch.setattr(alternative_2fa, "scan_bloks", counting_scan)
+
+    bloks_manager._extract_bloks_verification_methods(picker_response())
+    assert len(scans) == 1
+
+    scan = BloksScan(picker_response())
+    alternative_manager._extract_context_from_alternative_response(scan.text, scan)
+    alternative_manager._extract_alternative_verification_methods(scan.text, scan)
+    assert len(scans) == 1
+
+def test_no_module_level_scan_cache():
+    text = picker_response()
+    assert scan_bloks(text) is not scan_bloks(text)
+    assert not hasattr(bloks, "_last_scan")
+
+def test_concurrent_scans_are_independent():
+    """Chaque thread analyse sa propre réponse: aucun résultat partagé entre threads"""
+    responses = [picker_response(token(600 + index, 100 + index) + "|aplrr") for index in range(8)]
+    expected = [BloksScan(text).bloks_context_data() for text in responses]
+    errors = []
+
+    def worker(index):
+        manager = BloksManager(None)
+        for _ in range(50):
+            if manager._extract_bloks_context_data(responses[index]) != expected[index]:
+                errors.append(index)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(len(responses))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+# Recherches historiques (une regex par information), référence de BloksScan
+def reference_scan(text: str) -> dict:
+    def occurrences(word):
+        positions, index = [], text.find(word)
+        while index != -1:
+            positions.append(index)
+            index = text.find(word, index + len(word))
+        return positions
+    
+    return {
+        "phones": [(match.start(), match.group())
+                   for match in re.finditer(r'\+\d{1,3}\s+\*+\s+\*+\s+\*+\s+\d{2}', text)],
+        "endings": {code: re.findall(code + r'\s+\*+\s+\*+\s+\*+\s+(\d{2})', text) for code in ("261", "61", "1", "33")},
+        "whatsapp": any(re.search(pattern, text, re.IGNORECASE)
+                        for pattern in (r'"SOWA"', r'"google_oauth_token":\s*"true"', r'WhatsApp')),
+        "occurrences": {word: occurrences(word) for word in ("context_data", "array.Make", "Texto", "SMS", "Email", "SOWA")},
+    }
+
+FRAGMENTS = ["+", "261", "1", "33", "6", "45", " ", "  ", "\n", "*", "**", "***", " ** ** *** ", "+261 ** ** *** 45",
+             "261 ** ** *** 12", "SMS", "SMSMS", "Texto", "Email", "context_data", "array.Make", "whatsapp", "WHATSAPP",
+             '"SOWA"', '"sowa"', '"google_oauth_token": "true"', '"google_oauth_token":"TRUE"', "@", "k***n@gmail.com",
+             "é", "\"", "a"]
+
+def test_scan_matches_historical_regexes():
+    rng = random.Random(49)
+    for _ in range(4000):
+        text = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 30)))
+        expected = reference_scan(text)
+        scan = BloksScan(text)
+        
+        assert scan.phones == expected["phones"], text
+        assert {code: scan.phone_endings(code) for code in expected["endings"]} == expected["endings"], text
+        assert scan.has_whatsapp_indicator() == expected["whatsapp"], text
+        assert {word: scan.occurrences(word) for word in expected["occurrences"]} == expected["occurrences"], text
+    
+    # Indicatif long ou précédé de +
+    text = "+1261 ** ** *** 45, +44 ** ** *** 12"
+    assert BloksScan(text).phone_endings("1261") == ["45"]
+    assert BloksScan(text).phone_endings("+44") == ["12"]
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du disjoncteur de session (SessionCircuitBreaker)
+Classification des réponses, échec local immédiat et remise à zéro, contre un serveur local
+"""
+
+import time
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou import LoginRequiredError, AccountSuspendedError, AccountDisabledError
+from insta_kendou.utils.breaker import classify_session_failure, LOGIN_REQUIRED, SUSPENDED, DISABLED
+
+LOGGED_OUT = b'{"message":"login_required","logout_reason":3,"status":"fail"}'
+SUSPENDED_BODY = b'{"message":"challenge_required","challenge":{"url":"https://i.instagram.com/accounts/suspended/?next=x"}}'
+
+@pytest.mark.parametrize("body, reason", [
+    (LOGGED_OUT, LOGIN_REQUIRED),
+    (b'{"message":"user_has_logged_out"}', LOGIN_REQUIRED),
+    (SUSPENDED_BODY, SUSPENDED),
+    (b'{"checkpoint_url":"https://www.instagram.com/accounts/disabled/"}', DISABLED),
+    (b'{"message":"feedback_required"}', None),
+])
+def test_classify_session_failure(body, reason):
+    assert classify_session_failure(body) == reason
+
+@pytest.fixture
+def failing(client, stub_server):
+    body = {"current": LOGGED_OUT}
+    stub_server.handler = lambda method, path, headers, payload: (403, {}, body["current"])
+    stub_server.route(client.auth.session)
+    return client, body
+
+def test_open_breaker_fails_fast_without_sending(failing, stub_server):
+    client, _ = failing
+    assert not client.get_account_info()["success"]
+    assert client.get_session_state()["reason"] == LOGIN_REQUIRED
+    sent = len(stub_server.requests)
+    
+    started = time.perf_counter()
+    with pytest.raises(LoginRequiredError) as raised:
+        client.get_account_info()
+    assert time.perf_counter() - started < 0.01
+    assert raised.value.username == "kendou_test"
+    
+    # Appels directs de la session refusés aussi (hors connexion)
+    with pytest.raises(LoginRequiredError):
+        client.auth.session.get("https://i.instagram.com/api/v1/users/123/info/")
+    assert len(stub_server.requests) == sent
+    assert client.get_session_state()["rejected"] == 2
+
+def test_login_endpoints_stay_reachable(failing, stub_server):
+    client, _ = failing
+    client.get_account_info()
+    response = client.auth.session.post("https://i.instagram.com/api/v1/accounts/login/", data={"a": "1"})
+    assert response.status_code == 403
+
+def test_first_cause_is_kept_until_reset(failing):
+    client, body = failing
+    body["current"] = SUSPENDED_BODY
+    client.get_account_info()
+    with pytest.raises(AccountSuspendedError):
+        client.get_account_info()
+    
+    client.session_breaker.reset()
+    body["current"] = b'{"message":"checkpoint","url":"/accounts/disabled/"}'
+    client.get_account_info()
+    with pytest.raises(AccountDisabledError):
+        client.get_user_info("https://www.instagram.com/cible/")
+    assert client.get_session_state()["reason"] == DISABLED
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de la publication d'un carrousel (uploads simultanés, configure_sidecar unique)
+IDs d'upload distincts, enfants dans l'ordre d'entrée, uploads qui se chevauchent
+"""
+
+import json
+import time
+import threading
+from urllib.parse import parse_qs
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou.utils.media import MediaProcessor
+
+def prepared(index: int) -> dict:
+    return {"success": True, "image_data": b"\xff\xd8image-%d" % index, "image_size": (1080, 1080 - index),
+            "story_mode": False, "pdq_hash": None}
+
+@pytest.fixture
+def sidecar(client, stub_server):
+    """Uploads reçus (upload_id -> corps), chevauchement maximal observé et corps des configure_sidecar"""
+    state = {"uploads": {}, "active": 0, "overlap": 0, "configures": []}
+    lock = threading.Lock()
+
+    def handler(method, path, headers, body):
+        if path.startswith("/rupload_igphoto/"):
+            with lock:
+                state["active"] += 1
+                state["overlap"] = max(state["overlap"], state["active"])
+            time.sleep(0.3)
+            with lock:
+                state["active"] -= 1
+                state["uploads"][json.loads(headers["x-instagram-rupload-params"])["upload_id"]] = body
+            return 200, {}, {"status": "ok"}
+        if path.startswith("/api/v1/media/configure_sidecar/"):
+            signed_body = parse_qs(body.decode())["signed_body"][0]
+            state["configures"].append(json.loads(signed_body.split(".", 1)[1]))
+            return 200, {}, {"status": "ok", "media": {"pk": "42", "code": "Cabc"}}
+        return 200, {}, {"status": "ok"}
+
+    stub_server.handler = handler
+    stub_server.route(client.auth.session)
+    return state
+
+def test_carousel_uploads_overlap_and_configure_once(client, sidecar):
+    items = [prepared(index) for index in range(4)]
+
+    result = client._upload_carousel_internal(items, "légende")
+    assert result["success"], result
+    assert sidecar["overlap"] > 1
+
+    assert len(sidecar["configures"]) == 1
+    configure = sidecar["configures"][0]
+    children = configure["children_metadata"]
+    assert [sidecar["uploads"][child["upload_id"]] for child in children] == [item["image_data"] for item in items]
+    assert [child["extra"]["source_height"] for child in children] == [1080, 1079, 1078, 1077]
+
+    upload_ids = [configure["upload_id"]] + [child["upload_id"] for child in children]
+    assert len(set(upload_ids)) == len(upload_ids)
+    assert int(MediaProcessor.generate_upload_id()) > max(int(upload_id) for upload_id in upload_ids)
+    assert client.wait_background_tasks(timeout=10)
+
+def test_upload_ids_unique_across_threads():
+    upload_ids = []
+    lock = threading.Lock()
+
+    def generate():
+        batch = [MediaProcessor.generate_upload_id() for _ in range(200)]
+        with lock:
+            upload_ids.extend(batch)
+
+    threads = [threading.Thread(target=generate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(upload_ids)) == len(upload_ids) == 800
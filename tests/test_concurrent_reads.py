@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Tests des lectures concurrentes sur un client partagé (get_media_info, get_user_info, get_media_comments)
+Serveur local qui pose des cookies à chaque réponse pendant que 16 threads lisent
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from conftest import DEVICE_INFO, SESSION_DATA
+
+THREADS = 16
+CALLS = 240
+
+def read_handler(seen_headers: list):
+    counter = iter(range(10 ** 9))
+    lock = threading.Lock()
+    
+    def handler(method, path, headers, body):
+        with lock:
+            number = next(counter)
+            seen_headers.append((headers.get("authorization"), headers.get("x-ig-android-id")))
+        cookies = {"Set-Cookie": f"rur=r{number}; Path=/"}
+        if path.startswith("/api/v1/users/search/"):
+            return 200, cookies, {"status": "ok", "users": [{"pk": 42, "username": "cible"}]}
+        if path.startswith("/api/v1/users/"):
+            return 200, cookies, {"status": "ok", "user": {"pk": 42, "username": "cible", "is_private": False}}
+        if "/comments/" in path:
+            return 200, cookies, {"status": "ok", "comments": [{"pk": 7, "text": "bravo", "user": {"pk": 42}}]}
+        return 200, cookies, {"status": "ok", "items": [{"id": "3_42", "code": "ABC", "like_count": 3}]}
+    
+    return handler
+
+def test_shared_client_reads_from_many_threads(client, stub_server):
+    seen_headers = []
+    stub_server.handler = read_handler(seen_headers)
+    stub_server.route(client.auth.session)
+    
+    calls = (
+        lambda: client.get_media_info("https://www.instagram.com/p/ABC/"),
+        lambda: client.get_user_info("https://www.instagram.com/cible/"),
+        lambda: client.get_media_comments("https://www.instagram.com/p/ABC/"),
+    )
+    
+    with ThreadPoolExecutor(THREADS) as executor:
+        results = list(executor.map(lambda index: calls[index % len(calls)](), range(CALLS)))
+    
+    failures = [result for result in results if not result["success"]]
+    assert failures == []
+    # get_user_info: recherche du username puis lecture du profil
+    assert len(seen_headers) == CALLS + CALLS // len(calls)
+    
+    # Instantané de headers cohérent pour toutes les requêtes
+    expected = (SESSION_DATA["authorization_data"]["authorization_header"], DEVICE_INFO["android_id"])
+    assert set(seen_headers) == {expected}
+    
+    # Le cookie jar a absorbé toutes les mises à jour concurrentes sans erreur
+    assert "rur" in client.auth.session.cookies.get_dict()
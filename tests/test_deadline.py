@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du budget de temps (Deadline) propagé aux requêtes d'une opération
+Bornage des timeouts, imbrication, partage entre threads et appels du client contre un serveur lent
+"""
+
+import time
+import threading
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou import Deadline, DeadlineExceededError, timeout_override
+from insta_kendou.utils.deadline import current_deadline, remaining_timeout, deadline_sleep
+
+SLOW = 0.5
+
+def test_clamp_bounds_every_timeout_form():
+    deadline = Deadline(1.0)
+    assert deadline.clamp(10) <= 1.0
+    assert deadline.clamp(0.2) == 0.2
+    assert deadline.clamp(None) <= 1.0
+    connect, read = deadline.clamp((0.1, None))
+    assert connect == 0.1 and read <= 1.0
+    
+    with pytest.raises(DeadlineExceededError) as raised:
+        Deadline(-1).clamp(10)
+    assert raised.value.budget == -1
+
+def test_nested_deadline_cannot_extend_outer():
+    with Deadline(1.0) as outer:
+        with Deadline(60) as inner:
+            assert inner is outer
+        with Deadline(0.1) as shorter:
+            assert current_deadline() is shorter
+        assert current_deadline() is outer
+    assert current_deadline() is None
+
+def test_shared_deadline_across_threads():
+    shared = Deadline(5)
+    seen = []
+    barrier = threading.Barrier(4)
+    
+    def worker():
+        with shared:
+            barrier.wait()
+            seen.append(current_deadline())
+            barrier.wait()
+        seen.append(current_deadline())
+    
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert seen.count(shared) == 4 and seen.count(None) == 4
+
+def test_override_and_sleep_respect_budget():
+    with timeout_override(3), Deadline(1):
+        assert remaining_timeout(30) <= 1
+        with pytest.raises(DeadlineExceededError):
+            deadline_sleep(2)
+    with timeout_override((1, 2)):
+        assert remaining_timeout(30) == (1, 2)
+
+@pytest.fixture
+def slow_client(client, stub_server):
+    def handler(method, path, headers, body):
+        time.sleep(SLOW)
+        return 200, {}, {"status": "ok", "user": {"pk": 1234567890, "username": "kendou_test"}}
+    
+    stub_server.handler = handler
+    stub_server.route(client.auth.session)
+    return client
+
+def test_call_fails_within_its_deadline(slow_client):
+    assert slow_client.get_account_info()["success"]
+    
+    started = time.monotonic()
+    result = slow_client.get_account_info(deadline=0.2)
+    assert not result["success"]
+    assert time.monotonic() - started < SLOW
+
+def test_budget_spans_several_calls(slow_client, stub_server):
+    with Deadline(2 * SLOW + 0.2) as deadline:
+        assert slow_client.get_account_info()["success"]
+        assert slow_client.get_account_info()["success"]
+        # Un appel imbriqué ne peut pas obtenir plus que le reste du budget
+        assert not slow_client.get_account_info(deadline=10)["success"]
+        
+        sent = len(stub_server.requests)
+        started = time.monotonic()
+        assert not slow_client.get_account_info()["success"]
+        assert time.monotonic() - started < 0.05
+        assert len(stub_server.requests) == sent
+        assert deadline.expired
+
+def test_background_tasks_inherit_unless_detached(client):
+    with Deadline(5) as deadline:
+        inherited = client._submit_background(current_deadline)
+        detached = client._submit_background(current_deadline, detached=True)
+        assert inherited.result() is deadline
+        assert detached.result() is None
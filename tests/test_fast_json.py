@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de la façade JSON (fast_json): sortie identique octet par octet à json
+Objets aléatoires (flottants extrêmes, NaN/Infinity, Unicode, grands entiers) et décodage équivalent
+"""
+
+import json
+import math
+import random
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou.utils import fast_json
+
+DUMPS_OPTIONS = [
+    {"separators": (",", ":")},
+    {"separators": (",", ":"), "ensure_ascii": False},
+    {"separators": (",", ":"), "sort_keys": True},
+    {"indent": 2},
+    {"indent": 2, "ensure_ascii": False},
+    {},
+]
+
+# Toute la plage ASCII (0x00-0x7F, DEL compris) en plus des caractères spéciaux
+ASCII = "".join(map(chr, range(128)))
+
+SCALARS = [None, True, False, 0, -1, 2 ** 63, -2 ** 64, 2 ** 64 - 1, -2 ** 63 - 1, 10 ** 30, 1.5, 1e16, 1e19, 1e-05,
+           0.1, 123456.789, float("nan"), float("inf"), float("-inf"), "", "abc", "é😀 /<>\"\\\n\t", "\x00\x1f",
+           "\x7f", "a\x7fé", ASCII, "null", "NaN", "3141592653589793238"] + list(ASCII)
+
+def random_object(rng, scalars=SCALARS, depth=0):
+    roll = rng.random()
+    if depth > 3 or roll < 0.5:
+        if rng.random() < 0.3:
+            return rng.random() * 10 ** rng.randint(-9, 20)
+        return rng.choice(scalars)
+    if roll < 0.75:
+        return [random_object(rng, scalars, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {rng.choice("abéz_A") + str(rng.randint(0, 9)): random_object(rng, scalars, depth + 1)
+            for _ in range(rng.randint(0, 4))}
+
+@pytest.mark.parametrize("options", DUMPS_OPTIONS, ids=lambda options: ",".join(sorted(options)) or "default")
+def test_dumps_is_byte_identical_to_json(options):
+    rng = random.Random(47)
+    for _ in range(3000):
+        obj = random_object(rng)
+        assert fast_json.dumps(obj, **options) == json.dumps(obj, **options)
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+def test_non_finite_floats_are_never_written_null(value):
+    obj = {"latency": value, "missing": None, "items": [1.0, value]}
+    assert fast_json.dumps(obj, separators=(",", ":")) == json.dumps(obj, separators=(",", ":"))
+    assert "null,\"items\"" in fast_json.dumps(obj, separators=(",", ":"))
+    assert fast_json.dumps(obj, indent=2).count("null") == 1
+
+def test_loads_matches_json():
+    rng = random.Random(48)
+    for _ in range(3000):
+        text = json.dumps(random_object(rng))
+        decoded = fast_json.loads(text)
+        assert json.dumps(decoded) == json.dumps(json.loads(text))
+    assert math.isnan(fast_json.loads('{"a": NaN}')["a"])
+    assert fast_json.loads(b'\xef\xbb\xbf{"a": 1}'.decode("utf-8-sig")) == {"a": 1}
+    with pytest.raises(json.JSONDecodeError):
+        fast_json.loads("{tronqué")
+
+def test_metrics_and_tracing_exports_use_the_facade():
+    from insta_kendou.utils import metrics, tracing
+    assert metrics.fast_json is fast_json and tracing.fast_json is fast_json
+    assert not hasattr(metrics, "json") and not hasattr(tracing, "json")
+
+def test_del_is_escaped_with_ensure_ascii():
+    for options in DUMPS_OPTIONS:
+        assert fast_json.dumps({"k": "a\x7fb"}, **options) == json.dumps({"k": "a\x7fb"}, **options)
+    assert fast_json.dumps("\x7f", separators=(",", ":")) == '"\\u007f"'
+    assert fast_json.dumps("\x7f", separators=(",", ":"), ensure_ascii=False) == '"\x7f"'
+
+@pytest.mark.parametrize("value", [2 ** 64, -2 ** 63 - 1, 10 ** 30, 2 ** 64 - 1, -2 ** 63])
+def test_loads_keeps_large_integers_exact(value):
+    text = json.dumps({"pk": value, "media_id": "3141592653589793238", "ratio": 1e19})
+    for data in (text, text.encode()):
+        decoded = fast_json.loads(data)
+        assert decoded["pk"] == value and type(decoded["pk"]) is int
+        assert decoded["ratio"] == 1e19 and type(decoded["ratio"]) is float
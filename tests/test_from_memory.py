@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de la construction du client depuis la mémoire (InstagramClient.from_memory)
+Aucun accès disque, sous-processus ou réseau, durée de l'ordre de la microseconde
+"""
+
+import sys
+import time
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou import InstagramClient
+from conftest import DEVICE_INFO, SESSION_DATA
+
+IO_EVENTS = ("open", "os.listdir", "os.scandir", "os.stat", "subprocess.Popen", "os.system",
+             "socket.connect", "socket.getaddrinfo")
+
+_recorded = []
+_recording = False
+
+def _audit(event, args):
+    if _recording and event in IO_EVENTS:
+        _recorded.append((event, args[:1]))
+
+sys.addaudithook(_audit)
+
+def build():
+    return InstagramClient.from_memory(dict(SESSION_DATA), dict(DEVICE_INFO))
+
+def test_construction_performs_no_io():
+    global _recording
+    build()  # premier appel: vérification de licence (fichiers lus une fois par processus)
+    
+    _recorded.clear()
+    _recording = True
+    try:
+        client = build()
+    finally:
+        _recording = False
+    
+    assert _recorded == []
+    assert client.api is not None
+    assert client.get_x_mid() == DEVICE_INFO["x_mid"]
+
+def test_construction_takes_microseconds():
+    build()
+    rounds = 200
+    start = time.perf_counter()
+    for _ in range(rounds):
+        build()
+    per_call = (time.perf_counter() - start) / rounds
+    # ~100 µs mesurés; large marge pour les machines de CI chargées
+    assert per_call < 0.005
+
+def test_incomplete_device_info_is_rejected():
+    device_info = dict(DEVICE_INFO)
+    del device_info["android_id"]
+    with pytest.raises(ValueError, match="android_id"):
+        InstagramClient.from_memory(dict(SESSION_DATA), device_info)
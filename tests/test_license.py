@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du cache de validation de licence (fichiers appelants validés, par chemin et mtime)
+Exécuté dans un sous-processus: la pile de pytest contient déjà le code d'accès
+"""
+
+import sys
+import subprocess
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou.utils import license
+
+# Module de licence chargé seul, script appelant réécrit entre deux validations (mtime distinct)
+RUNNER = """
+import os, sys, importlib.util
+spec = importlib.util.spec_from_file_location("license_under_test", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+target = sys.argv[2]
+
+def run(source, mtime):
+    with open(target, "w") as f:
+        f.write(source)
+    os.utime(target, ns=(mtime, mtime))
+    namespace = {"validate": module.validate_license}
+    exec(compile("result = validate()", target, "exec"), namespace)
+    return namespace["result"]
+
+code = open(sys.argv[3]).read()
+print(run("# sans code", 1_000_000_000), run("CODE = " + repr(code), 2_000_000_000),
+      run("CODE = " + repr(code), 2_000_000_000), run("# sans code", 3_000_000_000),
+      len(module._validated_files))
+"""
+
+def test_validation_cache_is_keyed_by_mtime(tmp_path):
+    code_file = tmp_path / "code.txt"
+    code_file.write_text(license.REQUIRED_ACCESS_CODE)
+    
+    output = subprocess.run([sys.executable, "-c", RUNNER, license.__file__, str(tmp_path / "script.py"), str(code_file)],
+                            capture_output=True, text=True, timeout=60, cwd=str(tmp_path))
+    assert output.returncode == 0, output.stderr
+    # Refus non mémorisé, validation mémorisée une fois, script modifié réexaminé
+    assert output.stdout.split() == ["False", "True", "True", "False", "1"]
+    assert not hasattr(license, "_rejected_files")
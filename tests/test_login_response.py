@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de l'extraction du login_response imbriqué dans les réponses Bloks (find_embedded_json, _extract_user_data_fixed)
+JSON encodé dans le code Bloks, littéraux échappés sur plusieurs niveaux, réponse décodée ou texte brut
+"""
+
+import json
+import random
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou.utils.bloks import find_embedded_json
+
+USER = {
+    "pk": 71319100555, "username": "ken562615a", "full_name": "Kenny Nestin é😀 \"K\"", "is_verified": False,
+    "is_private": True, "profile_pic_url": "https://scontent.cdninstagram.com/v/t51.2885-19/44884218_n.jpg?_nc_ht=x&_nc_cat=1",
+    "profile_pic_id": "123_71319100555", "phone_number": "+261340000000", "country_code": 261,
+    "national_number": 340000000, "account_type": 1, "fbid_v2": "17841400000000000", "category": None,
+    "allow_contacts_sync": True, "biography": "a\\b/c </script>",
+}
+LOGIN_RESPONSE = {"logged_in_user": USER, "session_flush_nonce": None, "status": "ok"}
+HEADERS = {"IG-Set-Authorization": "Bearer IGT:2:eyJkc191c2VyX2lkIjoiNzEzMTkxMDA1NTUifQ==",
+           "ig-set-ig-u-ds-user-id": 71319100555}
+
+def bloks_filler(count: int = 200) -> str:
+    rng = random.Random(3)
+    return "".join('(bk.action.i32.Const, %d), (bk.action.array.Make, "%s"), '
+                   % (index, "".join(rng.choices("abcdefghij", k=40))) for index in range(count))
+
+def embedded_map() -> str:
+    """Map passée à HandleLoginResponse: login_response et headers encodés en chaînes JSON"""
+    return json.dumps({"login_response": json.dumps(LOGIN_RESPONSE, separators=(',', ':')),
+                       "headers": json.dumps(HEADERS, separators=(',', ':'))}, separators=(',', ':'))
+
+def bloks_response(argument: str) -> dict:
+    return {"layout": {"bloks_payload": {"data": [], "action": "(bk.action.core.TakeLast, " + bloks_filler()
+                                         + "(bk.action.caa.HandleLoginResponse, " + argument + "))"}},
+            "status": "ok"}
+
+def nested_literal(levels: int) -> str:
+    """Map enfermée dans levels littéraux Bloks imbriqués: (y, "(y, \\"{...}\\")")"""
+    literal = embedded_map()
+    for _ in range(levels):
+        literal = "(y, " + json.dumps(literal) + ")"
+    return literal
+
+FIXTURES = {
+    "map dans l'action": bloks_response(embedded_map()),
+    "littéral échappé": bloks_response(json.dumps(embedded_map())),
+    "littéraux imbriqués x2": bloks_response(nested_literal(2)),
+    "littéraux imbriqués x3": bloks_response(nested_literal(3)),
+}
+
+@pytest.fixture
+def auth(client):
+    return client.auth
+
+@pytest.mark.parametrize("raw_text", [False, True], ids=["décodée", "texte brut"])
+@pytest.mark.parametrize("name", list(FIXTURES))
+def test_user_data_from_bloks_login_response(auth, name, raw_text):
+    response = json.dumps(FIXTURES[name]) if raw_text else FIXTURES[name]
+    user_data = auth._extract_user_data_fixed(response)
+
+    assert user_data["user_id"] == "71319100555"
+    assert user_data["username"] == USER["username"]
+    assert user_data["full_name"] == USER["full_name"]
+    assert user_data["is_private"] is True
+    assert user_data["profile_pic_url"] == USER["profile_pic_url"]
+    assert user_data["country_code"] == 261
+    assert user_data["category"] is None
+    assert user_data["allow_contacts_sync"] is True
+    assert user_data["account_type"] == 1
+
+@pytest.mark.parametrize("name", list(FIXTURES))
+def test_find_embedded_json_decodes_login_response(name):
+    assert find_embedded_json(FIXTURES[name], "login_response") == LOGIN_RESPONSE
+    assert find_embedded_json(FIXTURES[name], "headers") == HEADERS
+
+def test_find_embedded_json_plain_tree():
+    tree = {"a": [1, {"b": None}], "login_response": {"logged_in_user": {"pk": 1}}}
+    assert find_embedded_json(tree, "login_response") == {"logged_in_user": {"pk": 1}}
+    assert find_embedded_json({"a": json.dumps({"login_response": json.dumps([1, 2])})}, "login_response") == [1, 2]
+    assert find_embedded_json({"text": "login_response sans valeur"}, "login_response") is None
+    assert find_embedded_json({"status": "ok"}, "login_response") is None
+    assert find_embedded_json([None, 1.5, True], "login_response") is None
+
+def test_find_embedded_json_skips_mentions_before_the_key():
+    # Le mot apparaît d'abord dans un autre littéral, la vraie clé vient ensuite
+    action = '(bk.action.log, "login_response reçu"), (bk.action.caa.HandleLoginResponse, ' + embedded_map() + ')'
+    assert find_embedded_json({"action": action}, "login_response") == LOGIN_RESPONSE
+
+def test_find_embedded_json_depth_limit():
+    tree = bloks_response(nested_literal(3))
+    assert find_embedded_json(tree, "login_response") == LOGIN_RESPONSE
+    assert find_embedded_json(tree, "login_response", depth=2) is None
+
+def test_user_data_fallback_without_login_response(auth):
+    text = '{"logged_in_user": null, "pk": 12345678901, "username": "someone_else"}'
+    assert auth._extract_user_data_fixed(text) == {"user_id": "12345678901", "username": "someone_else"}
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de la préparation des médias par lot (pool de processus)
+Workers démarrés sans fork depuis un processus multi-thread
+"""
+
+import threading
+import multiprocessing
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+PIL = pytest.importorskip("PIL")
+from PIL import Image
+
+from insta_kendou.utils import media
+from insta_kendou.utils.media import MediaProcessor
+
+def _make_image(path, size, color):
+    Image.new("RGB", size, color).save(path, format="PNG")
+    return str(path)
+
+def test_worker_context_never_forks():
+    assert media._worker_context().get_start_method() in ("forkserver", "spawn")
+
+def test_batch_prepares_in_worker_processes_while_threads_hold_locks(tmp_path):
+    paths = [_make_image(tmp_path / f"img{index}.png", (1600, 1200), (index * 40, 90, 200)) for index in range(3)]
+    
+    # Un thread tient un verrou pendant le lot: un fork l'hériterait verrouillé
+    held = threading.Lock()
+    held.acquire()
+    release = threading.Event()
+    holder = threading.Thread(target=lambda: (release.wait(), held.release()))
+    holder.start()
+    try:
+        results = MediaProcessor.prepare_media_batch(paths + [(paths[0], True)], max_workers=2)
+    finally:
+        release.set()
+        holder.join()
+    
+    assert [result["success"] for result in results] == [True] * 4
+    assert [result["image_size"] for result in results] == [(1080, 810)] * 3 + [(720, 1280)]
+    for result in results:
+        assert len(result["pdq_hash"].split(":")[0]) == 64
+        assert bytes(result["image_data"][:2]) == b"\xff\xd8"
+    
+    inline = MediaProcessor.prepare_media(paths[1])
+    assert inline["pdq_hash"] == results[1]["pdq_hash"]
+
+def test_pool_leaves_host_environment_unchanged(tmp_path):
+    import os
+    from insta_kendou.utils import license
+    
+    before = dict(os.environ)
+    paths = [_make_image(tmp_path / f"env{index}.png", (300, 300), (index * 60, 0, 0)) for index in range(2)]
+    results = MediaProcessor.prepare_media_batch(paths, max_workers=2)
+    
+    assert [result["success"] for result in results] == [True, True]
+    assert dict(os.environ) == before
+    assert not hasattr(license, "ACCESS_CODE_ENV")
+
+def test_worker_pool_is_shared_between_batches(tmp_path, monkeypatch):
+    created = []
+    real_create = media._create_worker_pool
+    monkeypatch.setattr(media, "_worker_pools", {})
+    monkeypatch.setattr(media, "_create_worker_pool", lambda max_workers: created.append(real_create(max_workers)) or created[-1])
+    
+    paths = [_make_image(tmp_path / f"pool{index}.png", (300, 300), (0, index * 60, 0)) for index in range(2)]
+    try:
+        for _ in range(2):
+            assert [result["success"] for result in MediaProcessor.prepare_media_batch(paths, max_workers=2)] == [True, True]
+        assert len(created) == 1
+    finally:
+        for executor in created:
+            executor.shutdown()
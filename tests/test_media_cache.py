@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du cache disque des médias préparés
+Écritures concurrentes d'une même clé et éviction déclenchée par la taille estimée
+"""
+
+import os
+import threading
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou.utils import media_cache
+from insta_kendou.utils.media_cache import PreparedMediaCache
+
+def test_concurrent_puts_of_same_key_publish_complete_files(tmp_path):
+    cache = PreparedMediaCache(str(tmp_path))
+    key = cache.make_key("source", False, {"quality": 95})
+    payloads = [bytes([index]) * (512 * 1024) for index in range(8)]
+    barrier = threading.Barrier(len(payloads))
+    
+    def writer(data):
+        barrier.wait()
+        for _ in range(5):
+            cache.put(key, data, (1080, 1080), pdq_hash="0" * 64)
+    
+    threads = [threading.Thread(target=writer, args=(data,)) for data in payloads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    entry = cache.get(key)
+    data = bytes(entry["image_data"])
+    assert data in payloads
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+def test_put_lists_directory_only_when_over_budget(tmp_path, monkeypatch):
+    cache = PreparedMediaCache(str(tmp_path), max_bytes=10 * 1024)
+    listings = []
+    real_listdir = os.listdir
+    
+    def counting_listdir(path):
+        listings.append(path)
+        return real_listdir(path)
+    
+    monkeypatch.setattr(media_cache.os, "listdir", counting_listdir)
+    
+    # Première écriture: taille inconnue => un parcours, puis l'estimation suffit
+    for index in range(4):
+        cache.put(f"key{index}", b"x" * 1024, (10, 10))
+    assert len(listings) == 1
+    
+    # Dépassement de max_bytes: éviction des entrées les plus anciennes
+    for index in range(4, 12):
+        cache.put(f"key{index}", b"x" * 1024, (10, 10))
+    assert len(listings) > 1
+    
+    total = sum(os.path.getsize(os.path.join(tmp_path, name)) for name in real_listdir(tmp_path))
+    assert total <= cache.max_bytes
+    assert cache.get("key11") is not None
+
+def disk_usage(path) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+def test_overwrite_does_not_inflate_size_estimate(tmp_path, monkeypatch):
+    cache = PreparedMediaCache(str(tmp_path), max_bytes=64 * 1024)
+    cache.put("seed", b"s" * 100, (10, 10))
+    
+    evictions = []
+    real_evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda: (evictions.append(1), real_evict()))
+    
+    # Même clé réécrite bien plus de fois que max_bytes ne le permettrait si les tailles s'additionnaient
+    for index in range(200):
+        cache.put("same", bytes([index % 256]) * 4096, (10, 10))
+    
+    assert evictions == []
+    assert cache._size_estimate == disk_usage(tmp_path)
+    assert cache.get("seed") is not None
+    
+    # Passage en pass-through: les octets stockés sont supprimés et décomptés
+    cache.put("same", None, (10, 10), passthrough=True)
+    assert not os.path.exists(cache._paths("same")[1])
+    assert cache._size_estimate == disk_usage(tmp_path)
+
+def test_get_returns_bytes(tmp_path):
+    cache = PreparedMediaCache(str(tmp_path / "cache"))
+    cache.put("stored", b"prepared", (10, 10), pdq_hash="a" * 64)
+    source = tmp_path / "source.jpg"
+    source.write_bytes(b"original")
+    cache.put("passthrough", None, (10, 10), passthrough=True)
+    
+    stored = cache.get("stored")
+    assert stored["image_data"] == b"prepared" and type(stored["image_data"]) is bytes
+    assert stored["pdq_hash"] == "a" * 64
+    
+    passthrough = cache.get("passthrough", str(source))
+    assert passthrough["image_data"] == b"original" and passthrough["passthrough"]
+    assert cache.get("passthrough") is None
+    assert cache.get_stats() == {"hits": 2, "misses": 1, "hit_ratio": 2 / 3}
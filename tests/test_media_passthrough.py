@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du pass-through des images déjà conformes (envoi du fichier original sans ré-encodage)
+Détection de conformité (JPEG baseline RGB, dimensions, EXIF), octets envoyés inchangés, projection refermée
+"""
+
+import mmap
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+Image = pytest.importorskip("PIL.Image")
+pytest.importorskip("numpy")
+
+from insta_kendou.utils.media import MediaProcessor
+
+def save_jpeg(path, size=(1080, 1080), mode="RGB", **options):
+    Image.new(mode, size, (90, 140, 200) if mode == "RGB" else 0).save(path, format="JPEG", quality=90, **options)
+    return str(path)
+
+def is_compliant(path, story_mode=False) -> bool:
+    return MediaProcessor.is_upload_compliant(MediaProcessor.inspect_image_header(str(path)), story_mode)
+
+def test_compliant_baseline_jpeg(tmp_path):
+    assert is_compliant(save_jpeg(tmp_path / "feed.jpg"))
+    assert is_compliant(save_jpeg(tmp_path / "small.jpg", size=(640, 800)))
+    assert is_compliant(save_jpeg(tmp_path / "story.jpg", size=(720, 1280)), story_mode=True)
+
+def test_non_compliant_images_are_rejected(tmp_path):
+    exif = Image.Exif()
+    exif[0x0112] = 6
+
+    assert not is_compliant(save_jpeg(tmp_path / "oversize.jpg", size=(1200, 800)))
+    assert not is_compliant(save_jpeg(tmp_path / "progressive.jpg", progressive=True))
+    assert not is_compliant(save_jpeg(tmp_path / "cmyk.jpg", mode="CMYK"))
+    assert not is_compliant(save_jpeg(tmp_path / "rotated.jpg", exif=exif))
+    assert not is_compliant(save_jpeg(tmp_path / "feed_as_story.jpg"), story_mode=True)
+
+    png = tmp_path / "image.png"
+    Image.new("RGB", (1080, 1080)).save(png)
+    assert not is_compliant(png)
+    assert not MediaProcessor.is_upload_compliant(None)
+
+def test_passthrough_maps_original_bytes(tmp_path):
+    path = save_jpeg(tmp_path / "feed.jpg")
+    original = open(path, "rb").read()
+
+    image_data, image_size, error = MediaProcessor.prepare_image_for_instagram(path)
+    assert error is None and image_size == (1080, 1080)
+    assert isinstance(image_data, mmap.mmap)
+    assert bytes(image_data) == original
+
+    MediaProcessor.release_media(image_data)
+    assert image_data.closed
+
+    # Non conforme: ré-encodé
+    progressive = save_jpeg(tmp_path / "progressive.jpg", progressive=True)
+    image_data, _, error = MediaProcessor.prepare_image_for_instagram(progressive)
+    assert error is None and isinstance(image_data, bytes)
+    assert image_data != open(progressive, "rb").read()
+
+def test_empty_file_is_not_mapped(tmp_path):
+    path = tmp_path / "empty.jpg"
+    path.write_bytes(b"")
+    assert MediaProcessor.map_file(str(path)) == b""
+
+    image_data, _, error = MediaProcessor.prepare_image_for_instagram(str(path))
+    assert image_data is None and error
+
+def test_post_upload_sends_original_bytes_and_closes_map(client, stub_server, tmp_path, monkeypatch):
+    path = save_jpeg(tmp_path / "feed.jpg")
+    original = open(path, "rb").read()
+    bodies = []
+    maps = []
+
+    real_map_file = MediaProcessor.map_file
+    def recording_map_file(image_path):
+        mapped = real_map_file(image_path)
+        maps.append(mapped)
+        return mapped
+    monkeypatch.setattr(MediaProcessor, "map_file", staticmethod(recording_map_file))
+
+    def handler(method, request_path, headers, body):
+        if request_path.startswith("/rupload_igphoto/"):
+            bodies.append(body)
+            return 200, {}, {"status": "ok"}
+        if request_path.startswith("/api/v1/media/configure/"):
+            return 200, {}, {"status": "ok", "media": {"pk": "42", "code": "Cabc"}}
+        return 200, {}, {"status": "ok"}
+
+    stub_server.handler = handler
+    stub_server.route(client.auth.session)
+
+    result = client._upload_post_internal(path, "légende")
+    assert result["success"], result
+    assert bodies == [original]
+
+    assert client.wait_background_tasks(timeout=10)
+    assert maps and all(mapped.closed for mapped in maps)
+
+def test_failed_story_upload_closes_map(client, stub_server, tmp_path, monkeypatch):
+    path = save_jpeg(tmp_path / "story.jpg", size=(720, 1280))
+    maps = []
+
+    real_map_file = MediaProcessor.map_file
+    monkeypatch.setattr(MediaProcessor, "map_file",
+                        staticmethod(lambda image_path: maps.append(real_map_file(image_path)) or maps[-1]))
+    stub_server.handler = lambda method, request_path, headers, body: (403, {}, {"status": "fail"})
+    stub_server.route(client.auth.session)
+
+    assert not client._upload_story_internal(path)["success"]
+    assert maps and all(mapped.closed for mapped in maps)
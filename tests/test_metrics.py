@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Tests des métriques HTTP par endpoint (MetricsRegistry)
+Buckets log-linéaires, exports Prometheus et JSON, absence d'observer quand désactivé
+"""
+
+import json
+import random
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou.utils import get_transport_adapter
+from insta_kendou.utils.metrics import LatencyHistogram, MetricsRegistry
+
+def test_bucket_bounds_and_relative_error():
+    rng = random.Random(5)
+    values = list(range(64)) + [rng.randrange(1, 10 ** 9) for _ in range(5000)]
+    for value in values:
+        index = LatencyHistogram.bucket_index(value)
+        upper = LatencyHistogram.bucket_upper(index)
+        lower = LatencyHistogram.bucket_upper(index - 1) if index else 0
+        assert lower <= value < upper
+        assert upper - lower <= max(1, value / 8)
+
+def test_percentiles_follow_recorded_values():
+    histogram = LatencyHistogram()
+    for value in range(1, 1001):
+        histogram.record(value * 1000)
+    
+    assert histogram.count == 1000
+    assert histogram.max == 1000000
+    assert 500000 <= histogram.percentile(50) <= 500000 * 1.125
+    assert 990000 <= histogram.percentile(99) <= 1000000
+
+@pytest.fixture
+def measured(client, stub_server):
+    def handler(method, path, headers, body):
+        if "missing" in path:
+            return 404, {}, {"status": "fail", "message": "introuvable"}
+        return 200, {}, {"status": "ok", "items": []}
+    
+    stub_server.handler = handler
+    stub_server.route(client.auth.session)
+    registry = client.enable_metrics()
+    session = client.auth.session
+    for _ in range(3):
+        session.get("https://i.instagram.com/api/v1/media/123/info/", headers={"x-ig-client-endpoint": "media_info"})
+    session.get("https://i.instagram.com/api/v1/missing/", headers={"x-ig-client-endpoint": "missing"})
+    session.post("https://i.instagram.com/api/v1/media/456/like/", data=b"x" * 100)
+    return registry
+
+def test_snapshot_counts_statuses_and_bytes(measured):
+    endpoints = json.loads(measured.to_json())["endpoints"]
+    
+    assert endpoints["media_info"]["requests"] == 3
+    assert endpoints["media_info"]["status_codes"] == {"200": 3}
+    assert endpoints["media_info"]["bytes_in"] == 3 * len(json.dumps({"status": "ok", "items": []}))
+    assert endpoints["missing"]["status_codes"] == {"404": 1}
+    # Sans nom logique: chemin avec nombres normalisés
+    assert endpoints["/api/v{id}/media/{id}/like/"]["bytes_out"] == 100
+    assert endpoints["media_info"]["latency_ms"]["p50"] > 0
+
+def test_prometheus_histogram_is_cumulative(measured):
+    text = measured.to_prometheus()
+    assert 'instakendou_requests_total{endpoint="media_info",status="200"} 3' in text
+    assert 'instakendou_requests_total{endpoint="missing",status="404"} 1' in text
+    
+    buckets = [line for line in text.splitlines()
+               if line.startswith('instakendou_request_duration_seconds_bucket{endpoint="media_info"')]
+    counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+    assert counts == sorted(counts)
+    assert buckets[-1] == 'instakendou_request_duration_seconds_bucket{endpoint="media_info",le="+Inf"} 3'
+
+def test_disabled_metrics_leave_no_observer(client):
+    adapter = get_transport_adapter(client.auth.session)
+    registry = client.enable_metrics(MetricsRegistry())
+    assert registry.observe in adapter.observers
+    
+    client.disable_metrics()
+    assert registry.observe not in adapter.observers
+    assert client.get_metrics() in ({}, None, "")
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Vecteurs de référence du hash PDQ (MediaProcessor.generate_pdq_hash)
+Images synthétiques déterministes; valeurs identiques bit à bit à pdqhash (implémentation C++ de Facebook)
+"""
+
+from io import BytesIO
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+from PIL import Image
+
+from insta_kendou.utils.media import MediaProcessor
+
+# (largeur, hauteur, graine, taille de cellule) -> (hash, qualité)
+VECTORS = [
+    ((1080, 1080, 1, 24), "644c8b8e1bb4508232e55fc09734adbe91967e22279953456feca6cda0770f73", 100),
+    ((720, 1280, 2, 24), "b7167a35336ccf70a970c49b21336c1b7fecc7f2528f9648278f56900c4b69c4", 100),
+    ((1080, 608, 3, 24), "d41907f3178c4b7a45d7096485bf80da6123f171dedea681d89e3ad74fc6b401", 100),
+    ((333, 517, 4, 24), "d8b9fc808dffa954df1a8d2186e6de127a2525f85e64cdc525bc34c9318932a3", 100),
+    ((800, 600, 7, 150), "904055c74569d97baab1d97b456915c7011215c74569d97baab1d97b456955c7", 56),
+    ((64, 64, 5, 24), "feb66d70cf28f7d64e2975d68a29d4d435d6b594ca29b5d6ca2935d6ca280400", 18),
+]
+
+def synthetic_image(width: int, height: int, seed: int, cell: int = 24):
+    """Image RGB lisse et sans symétrie (grille pseudo-aléatoire entière, interpolation bilinéaire)"""
+    rows, cols = height // cell + 2, width // cell + 2
+    i, j, c = np.meshgrid(np.arange(rows, dtype=np.uint64), np.arange(cols, dtype=np.uint64),
+                          np.arange(3, dtype=np.uint64), indexing="ij")
+    coarse = ((i * np.uint64(73856093)) ^ (j * np.uint64(19349663)) ^ (c * np.uint64(83492791))
+              ^ np.uint64(seed * 2654435761)) % np.uint64(251)
+    coarse = coarse.astype(np.float64)
+    
+    y = (np.arange(height) + 0.5) / cell
+    x = (np.arange(width) + 0.5) / cell
+    y0, x0 = y.astype(int), x.astype(int)
+    fy, fx = (y - y0)[:, None, None], (x - x0)[None, :, None]
+    top = coarse[y0][:, x0] * (1 - fx) + coarse[y0][:, x0 + 1] * fx
+    bottom = coarse[y0 + 1][:, x0] * (1 - fx) + coarse[y0 + 1][:, x0 + 1] * fx
+    return np.ascontiguousarray(np.rint(top * (1 - fy) + bottom * fy).astype(np.uint8))
+
+@pytest.mark.parametrize("params, expected_hash, expected_quality", VECTORS)
+def test_reference_vectors_from_decoded_pixels(params, expected_hash, expected_quality):
+    image = Image.fromarray(synthetic_image(*params))
+    assert MediaProcessor.generate_pdq_hash(b"", image=image) == f"{expected_hash}:{expected_quality}"
+
+@pytest.mark.parametrize("params, expected_hash, expected_quality", VECTORS[:2])
+def test_reference_vectors_from_encoded_bytes(params, expected_hash, expected_quality):
+    output = BytesIO()
+    Image.fromarray(synthetic_image(*params)).save(output, format="PNG")
+    assert MediaProcessor.generate_pdq_hash(output.getvalue()) == f"{expected_hash}:{expected_quality}"
+
+def test_jpeg_recompression_keeps_hash_close():
+    pixels = synthetic_image(1080, 1080, 1)
+    output = BytesIO()
+    Image.fromarray(pixels).save(output, format="JPEG", quality=70)
+    recompressed = MediaProcessor.generate_pdq_hash(output.getvalue()).split(":")[0]
+    distance = bin(int(recompressed, 16) ^ int(VECTORS[0][1], 16)).count("1")
+    assert distance <= 16
+
+@pytest.mark.parametrize("params, expected_hash, expected_quality", VECTORS)
+def test_vectors_match_reference_implementation(params, expected_hash, expected_quality):
+    pdqhash = pytest.importorskip("pdqhash")
+    bits, quality = pdqhash.compute(synthetic_image(*params))
+    # pdqhash renvoie les 256 bits dans l'ordre de notre chaîne hexadécimale
+    reference = "".join(f"{int(''.join(map(str, bits[index:index + 4])), 2):x}" for index in range(0, 256, 4))
+    assert (reference, quality) == (expected_hash, expected_quality)
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Stress de la couche de persistance JSON (écritures atomiques, verrou consultatif, regroupement)
+Nombreux threads écrivains et lecteurs sur un même fichier
+"""
+
+import os
+import json
+import time
+import threading
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou.utils.persistence import atomic_write_json, atomic_update_json, CoalescingWriter
+
+WRITERS = 16
+UPDATES = 25
+
+def run_threads(target, count):
+    barrier = threading.Barrier(count)
+    errors = []
+    
+    def run(index):
+        barrier.wait()
+        try:
+            target(index)
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors
+
+def test_concurrent_updates_are_never_lost(tmp_path):
+    path = str(tmp_path / "counter.json")
+    
+    def increment(data):
+        data["count"] += 1
+        return data
+    
+    run_threads(lambda index: [atomic_update_json(path, increment, default=lambda: {"count": 0})
+                               for _ in range(UPDATES)], WRITERS)
+    
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"count": WRITERS * UPDATES}
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+def test_readers_never_see_a_partial_file(tmp_path):
+    path = str(tmp_path / "device.json")
+    atomic_write_json(path, {"writer": -1, "padding": ""})
+    stop = threading.Event()
+    torn = []
+    
+    def reader():
+        while not stop.is_set():
+            with open(path, encoding="utf-8") as f:
+                content = f.read()
+            try:
+                json.loads(content)
+            except ValueError:
+                torn.append(content)
+    
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+    try:
+        run_threads(lambda index: [atomic_write_json(path, {"writer": index, "padding": "x" * 65536})
+                                   for _ in range(UPDATES)], WRITERS)
+    finally:
+        stop.set()
+        for thread in readers:
+            thread.join()
+    
+    assert not torn
+
+def test_coalescing_writer_collapses_bursts(tmp_path):
+    path = str(tmp_path / "ig_device.json")
+    writer = CoalescingWriter(path, delay=0.2)
+    
+    run_threads(lambda index: [writer.schedule({"writer": index, "update": update})
+                               for update in range(UPDATES)], WRITERS)
+    writer.flush()
+    
+    # WRITERS * UPDATES planifications, une écriture (deux si le timer a expiré pendant la rafale)
+    assert 1 <= writer.writes <= 2
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["update"] == UPDATES - 1
+
+def test_coalescing_writer_debounces_until_quiet(tmp_path):
+    path = str(tmp_path / "ig_device.json")
+    writer = CoalescingWriter(path, delay=0.3, max_wait=5)
+    
+    # Chaque planification repousse l'écriture: rien n'est écrit pendant la rafale
+    for update in range(6):
+        writer.schedule({"update": update})
+        time.sleep(0.1)
+    assert writer.writes == 0 and not os.path.exists(path)
+    
+    time.sleep(0.5)
+    assert writer.writes == 1
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["update"] == 5
+
+def test_coalescing_writer_max_wait_caps_the_delay(tmp_path):
+    path = str(tmp_path / "ig_device.json")
+    writer = CoalescingWriter(path, delay=0.3, max_wait=0.4)
+    
+    # Rafale continue de 1,2 s: une écriture au moins toutes les max_wait secondes
+    for update in range(12):
+        writer.schedule({"update": update})
+        time.sleep(0.1)
+    assert writer.writes >= 2
+    
+    writer.flush()
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["update"] == 11
+
+def test_coalescing_writer_discard(tmp_path):
+    path = str(tmp_path / "ig_device.json")
+    writer = CoalescingWriter(path, delay=0.1)
+    
+    writer.schedule({"update": 1})
+    assert writer.discard()
+    assert not writer.discard()
+    time.sleep(0.3)
+    assert writer.writes == 0 and not os.path.exists(path)
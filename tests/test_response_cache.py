@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du cache des réponses d'information (ResponseCache, InstagramClient.enable_response_cache)
+Expiration, ordre d'éviction LRU, couche disque, statistiques et invalidation par les actions du client
+"""
+
+import os
+import time
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou.utils import response_cache
+from insta_kendou.utils.response_cache import ResponseCache
+
+MEDIA_ID = "3141592653589793238"
+MEDIA_URL = f"https://www.instagram.com/p/{MEDIA_ID}/"
+USER_ID = "1234567890"
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Horloge du cache contrôlée par le test"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    return now
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResponseCache(ttl=60, ttl_overrides={"user_lookup": 3600})
+    cache.put("user_info", 1, {"username": "a"})
+    cache.put("user_lookup", "a", "1")
+    
+    clock[0] += 59
+    assert cache.get("user_info", "1") == {"username": "a"}
+    clock[0] += 2
+    assert cache.get("user_info", 1) is None
+    assert cache.get("user_lookup", "a") == "1"
+    
+    cache.put("user_info", 1, {"username": "a"}, ttl=5)
+    clock[0] += 6
+    assert cache.get("user_info", 1) is None
+    assert cache.get_stats()["entries"] == 1
+
+def test_lru_evicts_least_recently_used(clock):
+    cache = ResponseCache(max_entries=3)
+    for key in "abc":
+        cache.put("user_info", key, key)
+    
+    # Lecture de "a": "b" devient la plus ancienne
+    assert cache.get("user_info", "a") == "a"
+    cache.put("user_info", "d", "d")
+    assert cache.get("user_info", "b") is None
+    
+    # Puis "c" (jamais relue depuis son insertion)
+    cache.put("user_info", "e", "e")
+    assert list(cache._entries) == [("user_info", key) for key in "ade"]
+    assert [cache.get("user_info", key) for key in "acde"] == ["a", None, "d", "e"]
+
+def test_values_are_copied(clock):
+    cache = ResponseCache()
+    value = {"user": {"followers": [1, 2]}}
+    cache.put("user_info", 1, value)
+    value["user"]["followers"].append(3)
+    
+    cached = cache.get("user_info", 1)
+    assert cached == {"user": {"followers": [1, 2]}}
+    cached["user"]["followers"].clear()
+    assert cache.get("user_info", 1) == {"user": {"followers": [1, 2]}}
+
+def test_disk_layer_survives_a_new_instance(clock, tmp_path):
+    disk_dir = str(tmp_path / "cache")
+    ResponseCache(ttl=60, disk_dir=disk_dir).put("media_info", MEDIA_ID, {"like_count": 3})
+    
+    cache = ResponseCache(ttl=60, disk_dir=disk_dir)
+    assert cache.get("media_info", MEDIA_ID) == {"like_count": 3}
+    assert cache.get_stats()["endpoints"]["media_info"]["hits"] == 1
+    
+    # Entrée disque expirée: ignorée
+    clock[0] += 61
+    assert ResponseCache(disk_dir=disk_dir).get("media_info", MEDIA_ID) is None
+    
+    cache.put("media_info", "1", {"like_count": 1})
+    cache.put("media_info", "2", {"like_count": 2})
+    cache.invalidate("media_info", "1")
+    assert ResponseCache(disk_dir=disk_dir).get("media_info", "1") is None
+    assert ResponseCache(disk_dir=disk_dir).get("media_info", "2") == {"like_count": 2}
+    
+    cache.invalidate("media_info")
+    assert not [name for name in os.listdir(disk_dir) if name.startswith("media_info_")]
+    
+    # Valeur non sérialisable: gardée en mémoire seulement
+    cache.put("media_info", "3", {"raw": object()})
+    assert cache.get("media_info", "3") is not None
+    assert ResponseCache(disk_dir=disk_dir).get("media_info", "3") is None
+
+def test_stats_report_hit_ratio_per_endpoint(clock):
+    cache = ResponseCache()
+    assert cache.get("user_info", 1) is None
+    cache.put("user_info", 1, {"username": "a"})
+    for _ in range(3):
+        cache.get("user_info", 1)
+    cache.get("media_info", MEDIA_ID)
+    cache.invalidate("user_info", 1)
+    
+    stats = cache.get_stats()
+    assert stats["entries"] == 0
+    assert stats["endpoints"]["user_info"] == {"hits": 3, "misses": 1, "invalidations": 1, "hit_ratio": 0.75}
+    assert stats["endpoints"]["media_info"] == {"hits": 0, "misses": 1, "invalidations": 0, "hit_ratio": 0.0}
+
+@pytest.fixture
+def instagram(client, stub_server):
+    """Client avec cache de réponses; état serveur mutable (confidentialité, likes) et requêtes reçues"""
+    state = {"is_private": False, "like_count": 10}
+    
+    def handler(method, path, headers, body):
+        if path == f"/api/v1/users/{USER_ID}/info/":
+            return 200, {}, {"status": "ok", "user": {"pk": USER_ID, "username": "kendou_test",
+                                                       "is_private": state["is_private"]}}
+        if path == f"/api/v1/media/{MEDIA_ID}/info/":
+            return 200, {}, {"status": "ok", "items": [{"id": MEDIA_ID, "like_count": state["like_count"]}]}
+        if path in ("/api/v1/accounts/set_private/", "/api/v1/accounts/set_public/"):
+            state["is_private"] = path.endswith("set_private/")
+            return 200, {}, {"status": "ok"}
+        if path == f"/api/v1/media/{MEDIA_ID}/unlike/":
+            state["like_count"] -= 1
+            return 200, {}, {"status": "ok"}
+        return 200, {}, {"status": "ok"}
+    
+    stub_server.handler = handler
+    stub_server.route(client.auth.session)
+    client.enable_response_cache(ttl=600)
+    return client
+
+def info_requests(stub_server, path):
+    return sum(1 for request in stub_server.requests if request[1] == path)
+
+def test_client_serves_info_from_cache(instagram, stub_server):
+    user_path = f"/api/v1/users/{USER_ID}/info/"
+    assert instagram.api.response_cache is instagram.response_cache
+    
+    for _ in range(3):
+        assert instagram.get_account_info()["data"]["username"] == "kendou_test"
+        assert instagram.get_media_info(MEDIA_URL)["data"]["like_count"] == 10
+    assert info_requests(stub_server, user_path) == 1
+    assert info_requests(stub_server, f"/api/v1/media/{MEDIA_ID}/info/") == 1
+    
+    endpoints = instagram.get_response_cache_stats()["endpoints"]
+    assert endpoints["user_info"]["hit_ratio"] == pytest.approx(2 / 3)
+    assert endpoints["media_info"]["hit_ratio"] == pytest.approx(2 / 3)
+
+def test_toggle_privacy_invalidates_user_info(instagram, stub_server):
+    user_path = f"/api/v1/users/{USER_ID}/info/"
+    assert instagram.get_account_info()["data"]["is_private"] is False
+    
+    assert instagram.toggle_account_privacy()["data"]["new_status"] == "Privé"
+    assert instagram.get_account_info()["data"]["is_private"] is True
+    # Lecture initiale, état réel avant le basculement, relecture après invalidation
+    assert info_requests(stub_server, user_path) == 3
+    
+    assert instagram.toggle_account_privacy()["data"]["new_status"] == "Public"
+    assert instagram.get_account_info()["data"]["is_private"] is False
+    assert instagram.get_response_cache_stats()["endpoints"]["user_info"]["invalidations"] == 4
+
+@pytest.mark.parametrize("action", ["unlike_post", "delete_comment"])
+def test_media_actions_invalidate_media_info(instagram, stub_server, action):
+    media_path = f"/api/v1/media/{MEDIA_ID}/info/"
+    assert instagram.get_media_info(MEDIA_URL)["data"]["like_count"] == 10
+    assert instagram.get_media_info(MEDIA_URL)["success"]
+    assert info_requests(stub_server, media_path) == 1
+    
+    if action == "unlike_post":
+        assert instagram.unlike_post(MEDIA_URL)["success"]
+    else:
+        assert instagram.delete_comment(MEDIA_URL, "17900000000000000")["success"]
+    
+    media_data = instagram.get_media_info(MEDIA_URL)["data"]
+    assert info_requests(stub_server, media_path) == 2
+    assert media_data["like_count"] == (9 if action == "unlike_post" else 10)
+    assert instagram.get_response_cache_stats()["endpoints"]["media_info"]["invalidations"] == 1
+
+def test_failed_action_keeps_cache(instagram, stub_server):
+    media_path = f"/api/v1/media/{MEDIA_ID}/info/"
+    instagram.get_media_info(MEDIA_URL)
+    
+    handler = stub_server.handler
+    stub_server.handler = lambda method, path, headers, body: (
+        (403, {}, {"status": "fail", "message": "refusé"}) if "/comment/" in path else handler(method, path, headers, body))
+    assert not instagram.delete_comment(MEDIA_URL, "17900000000000000")["success"]
+    
+    instagram.get_media_info(MEDIA_URL)
+    assert info_requests(stub_server, media_path) == 1
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Tests des nouvelles tentatives des lectures idempotentes (RetryPolicy)
+Serveur local instable: 503 puis 200, connexion réinitialisée, budget max_total, Retry-After, POST
+"""
+
+import time
+
+import pytest
+import requests
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou import Deadline
+from insta_kendou.utils import create_session, get_transport_adapter
+from insta_kendou.utils.retry import RetryPolicy
+from conftest import RESET
+
+URL = "https://i.instagram.com/api/v1/users/123/info/"
+UNAVAILABLE = (503, {}, {"status": "fail", "message": "unavailable"})
+OK = (200, {}, {"status": "ok"})
+
+def flaky(stub_server, *responses, default=OK):
+    """Réponses successives scriptées, puis default"""
+    queue = iter(responses)
+    stub_server.handler = lambda method, path, headers, body: next(queue, default)
+    session = create_session()
+    stub_server.route(session)
+    return session
+
+def use_policy(session, **kwargs) -> RetryPolicy:
+    policy = RetryPolicy(**dict({"base_delay": 0.01, "max_delay": 0.05}, **kwargs))
+    get_transport_adapter(session).retry_policy = policy
+    return policy
+
+def test_unavailable_then_ok_recovers(stub_server):
+    session = flaky(stub_server, UNAVAILABLE, UNAVAILABLE)
+    use_policy(session)
+    assert session.get(URL).status_code == 200
+    assert len(stub_server.requests) == 3
+
+def test_retries_are_bounded_by_max_attempts(stub_server):
+    session = flaky(stub_server, default=UNAVAILABLE)
+    use_policy(session, max_attempts=4)
+    assert session.get(URL).status_code == 503
+    assert len(stub_server.requests) == 4
+
+def test_connection_reset_is_retried(stub_server):
+    session = flaky(stub_server, RESET)
+    use_policy(session)
+    assert session.get(URL).status_code == 200
+    assert len(stub_server.requests) == 2
+
+def test_persistent_reset_raises_connection_error(stub_server):
+    session = flaky(stub_server, default=RESET)
+    use_policy(session, max_attempts=2)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get(URL)
+    assert len(stub_server.requests) == 2
+
+def test_max_total_budget_stops_retrying(stub_server):
+    session = flaky(stub_server, default=UNAVAILABLE)
+    use_policy(session, max_attempts=100, base_delay=0.1, max_delay=0.1, max_total=0.5)
+    
+    started = time.monotonic()
+    assert session.get(URL).status_code == 503
+    assert time.monotonic() - started < 0.8
+    assert 2 <= len(stub_server.requests) < 100
+
+def test_retry_after_replaces_shorter_backoff(stub_server):
+    session = flaky(stub_server, (503, {"Retry-After": "1"}, {"status": "fail"}))
+    use_policy(session)
+    
+    started = time.monotonic()
+    assert session.get(URL).status_code == 200
+    assert 0.95 <= time.monotonic() - started < 1.5
+
+def test_retry_after_beyond_budget_returns_immediately(stub_server):
+    session = flaky(stub_server, (503, {"Retry-After": "60"}, {"status": "fail"}))
+    use_policy(session, max_total=5)
+    
+    started = time.monotonic()
+    assert session.get(URL).status_code == 503
+    assert time.monotonic() - started < 0.5
+    assert len(stub_server.requests) == 1
+    
+    # Même règle pour la deadline active
+    stub_server.requests.clear()
+    session = flaky(stub_server, (503, {"Retry-After": "2"}, {"status": "fail"}))
+    use_policy(session)
+    with Deadline(1):
+        assert session.get(URL).status_code == 503
+    assert len(stub_server.requests) == 1
+
+def test_post_is_not_retried(stub_server):
+    session = flaky(stub_server, UNAVAILABLE, RESET)
+    use_policy(session)
+    assert session.post(URL, data={"a": "1"}).status_code == 503
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.post(URL, data={"a": "1"})
+    assert [method for method, _ in stub_server.requests] == ["POST", "POST"]
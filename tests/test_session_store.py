@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Tests des backends de sessions (interface SessionStore, JSON et SQLite)
+Contrat abstrait, aller-retour des sessions et méthodes génériques
+"""
+
+import os
+import json
+import time
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou.utils.session_store import SessionStore, JSONSessionStore, SQLiteSessionStore, session_summary
+
+def make_session(user_id: str, created_at: int = None) -> dict:
+    return {
+        "user_data": {"user_id": user_id, "full_name": f"Compte {user_id}"},
+        "created_at": int(time.time()) if created_at is None else created_at,
+        "cookies": {"sessionid": f"{user_id}%3Atest"},
+    }
+
+class MemorySessionStore(SessionStore):
+    def __init__(self):
+        self.sessions = {}
+    
+    def save(self, username, session_data):
+        self.sessions[username] = session_data
+    
+    def load(self, username):
+        return self.sessions.get(username)
+    
+    def delete(self, username):
+        return self.sessions.pop(username, None) is not None
+    
+    def list_sessions(self):
+        return [session_summary(username, data) for username, data in sorted(self.sessions.items())]
+
+def test_incomplete_backend_fails_at_instantiation():
+    class IncompleteStore(SessionStore):
+        def save(self, username, session_data):
+            pass
+    
+    with pytest.raises(TypeError, match="load"):
+        IncompleteStore()
+    with pytest.raises(TypeError):
+        SessionStore()
+
+def test_generic_methods_use_list_sessions():
+    store = MemorySessionStore()
+    store.save("fresh", make_session("1"))
+    store.save("stale", make_session("2", created_at=1000))
+    
+    assert store.find_by_user_id(2)["username"] == "stale"
+    assert store.find_by_user_id("3") is None
+    assert store.purge_expired() == 1
+    assert [summary["username"] for summary in store.list_sessions()] == ["fresh"]
+
+@pytest.fixture(params=["json", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "json":
+        yield JSONSessionStore(str(tmp_path / "sessions"))
+    else:
+        backend = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+        yield backend
+        backend.close()
+
+def test_backend_round_trip(store):
+    session = make_session("42")
+    store.save("alice", session)
+    store.save("bob", make_session("43", created_at=1000))
+    
+    assert store.load("alice") == session
+    assert store.load("nobody") is None
+    assert [summary["username"] for summary in store.list_sessions()] == ["alice", "bob"]
+    assert store.find_by_user_id("43")["username"] == "bob"
+    assert store.purge_expired() == 1
+    assert store.delete("alice")
+    assert not store.delete("alice")
+    assert store.list_sessions() == []
+
+def test_first_save_keeps_legacy_sessions_listed(tmp_path):
+    sessions_dir = tmp_path / "sessions"
+    sessions_dir.mkdir()
+    
+    # Sessions antérieures à l'index (fichiers *_ig_complete.json seuls)
+    for username, user_id in (("felicien09095bab", "111"), ("ken562612a", "222")):
+        (sessions_dir / f"{username}_ig_complete.json").write_text(json.dumps(make_session(user_id)), encoding="utf-8")
+    
+    store = JSONSessionStore(str(sessions_dir))
+    store.save("nouveau", make_session("333"))
+    
+    assert [summary["username"] for summary in store.list_sessions()] == ["felicien09095bab", "ken562612a", "nouveau"]
+    with open(store.index_path, encoding="utf-8") as f:
+        assert sorted(json.load(f)) == ["felicien09095bab", "ken562612a", "nouveau"]
+
+def test_unreadable_index_is_rebuilt_on_save(tmp_path):
+    store = JSONSessionStore(str(tmp_path))
+    store.save("alice", make_session("1"))
+    with open(store.index_path, "w", encoding="utf-8") as f:
+        f.write("{tronqué")
+    
+    store.save("bob", make_session("2"))
+    assert [summary["username"] for summary in store.list_sessions()] == ["alice", "bob"]
+
+def test_json_saves_are_coalesced(tmp_path):
+    store = JSONSessionStore(str(tmp_path), write_delay=0.2)
+    session = make_session("1")
+    path = store._complete_path("alice")
+    index_mtime = None
+    
+    for request in range(20):
+        session = dict(session, last_request=request)
+        store.save("alice", session)
+        if index_mtime is None:
+            index_mtime = os.stat(store.index_path).st_mtime_ns
+    
+    # Fichier de session pas encore écrit, index inchangé (même résumé)
+    assert not os.path.exists(path)
+    assert os.stat(store.index_path).st_mtime_ns == index_mtime
+    assert [summary["username"] for summary in store.list_sessions()] == ["alice"]
+    
+    time.sleep(0.5)
+    assert store._writers["alice"].writes == 1
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["last_request"] == 19
+
+def test_json_load_and_delete_see_pending_save(tmp_path):
+    store = JSONSessionStore(str(tmp_path), write_delay=60)
+    session = make_session("1")
+    store.save("alice", session)
+    assert store.load("alice") == session
+    
+    store.save("bob", make_session("2"))
+    assert store.delete("bob")
+    store.close()
+    assert not os.path.exists(store._complete_path("bob"))
+    assert store.load("bob") is None
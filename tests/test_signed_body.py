@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Tests des corps signed_body pré-calculés (SignedBodyTemplate)
+Sortie comparée octet par octet à la construction historique: json.dumps compact puis HMAC-SHA256 complet
+"""
+
+import hmac
+import json
+import random
+import hashlib
+import threading
+import urllib.parse
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou import client as client_module
+from insta_kendou.utils.encryption import InstagramEncryption
+from insta_kendou.utils.payload import FIELD, SignedBodyTemplate, bloks_form_suffix
+
+SIGNATURE_KEY = "c9c5a5ba6b32e95562e5b3e95562e5b3"
+
+def reference_signed_body(data: dict) -> str:
+    """Construction d'origine: json.dumps compact et nouvel objet HMAC à chaque appel"""
+    json_data = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+    signature = hmac.new(SIGNATURE_KEY.encode(), json_data.encode(), hashlib.sha256).hexdigest()
+    return f"{signature}.{json_data}"
+
+def merge(layout: dict, values: dict) -> dict:
+    return {key: values[key] if value is FIELD else value for key, value in layout.items()}
+
+# Champs variables d'un configure de story, tels que construits par _configure_story
+STORY_VALUES = {
+    "camera_session_id": "0b1c2d3e-4f50-6172-8394-a5b6c7d8e9f0",
+    "original_height": "1920",
+    "timezone_offset": "10800",
+    "client_shared_at": "1760000000",
+    "_uid": "1234567890",
+    "device_id": "android-0123456789abcdef",
+    "composition_id": "9f8e7d6c-5b4a-3928-1706-f5e4d3c2b1a0",
+    "_uuid": "8c3f3e5e-1f3c-4f9a-9d3b-0123456789ab",
+    "nav_chain": "MainFeedFragment:feed_timeline:1:cold_start:1760000000000:::,QuickCaptureFragment:stories_precapture_camera:25:your_story_placeholder:1760000000000:::",
+    "imported_taken_at": "1759996400",
+    "upload_id": "1760000000123",
+    "client_timestamp": "1760000000",
+    "original_width": "1080",
+    "media_transformation_info": '{"width":"1080","height":"1920","x_transform":"0","y_transform":"0","zoom":"1.0","rotation":"0.0","background_coverage":"0.0"}',
+    "edits": {"filter_type": 0, "filter_strength": 0.5, "crop_original_size": [1080.0, 1920.0]},
+    "extra": {"source_width": 1080, "source_height": 1920},
+    "device": {"manufacturer": "samsung", "model": "SM-G991B", "android_version": 32, "android_release": "12"},
+}
+
+SCALARS = [0, 1, -7, 2 ** 70, 0.5, 1e-7, 1e16, True, False, None, "", "abc", "é😀 \"\\/\n\t\x00 ",
+           "1e5", "null", [], {}, [1, "a", None], {"k": [1.5, {"é": "😀"}]}]
+
+def test_story_template_matches_reference_construction():
+    body = client_module._STORY_CONFIGURE_BODY.sign(STORY_VALUES)
+    signature, json_data = body.split(".", 1)
+    data = json.loads(json_data)
+
+    assert list(data)[:5] == ["supported_capabilities_new", "allow_multi_configures", "has_camera_metadata",
+                              "camera_entry_point", "original_media_type"]
+    assert client_module._STORY_CONFIGURE_BODY.fields == list(STORY_VALUES)
+    assert {key: data[key] for key in STORY_VALUES} == STORY_VALUES
+    assert body == reference_signed_body(data)
+    assert body == InstagramEncryption.create_signed_body(data)
+
+def test_post_configure_body_matches_reference_construction(client):
+    for caption in ("", "Légende é 😀 #tag \"citée\" \\ \n ligne", "x" * 2200):
+        body = client._build_post_configure_body("1760000000123", (1080, 1350), "1234567890", caption)
+        signature, json_data = body.split(".", 1)
+        data = json.loads(json_data)
+
+        assert data["caption"] == caption
+        assert data["upload_id"] == "1760000000123"
+        assert data["original_width"] == "1080" and data["original_height"] == "1350"
+        assert data["edits"]["crop_original_size"] == [1080.0, 1350.0]
+        assert body == reference_signed_body(data)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_templates_match_reference_construction(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        keys = [f"k{index}_{rng.choice('aé_😀')}" for index in range(rng.randint(1, 8))]
+        layout = {key: FIELD if rng.random() < 0.5 else rng.choice(SCALARS) for key in keys}
+        template = SignedBodyTemplate(layout)
+        values = {key: rng.choice(SCALARS) for key in template.fields}
+
+        data = merge(layout, values)
+        assert template.render(values) == json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+        assert template.sign(values) == reference_signed_body(data)
+
+def test_template_fields_and_constant_only_layout():
+    template = SignedBodyTemplate({"a": "1", "b": FIELD, "c": 2, "d": FIELD})
+    assert template.fields == ["b", "d"]
+    assert template.render({"b": "x", "d": 3}) == '{"a":"1","b":"x","c":2,"d":3}'
+
+    constant = SignedBodyTemplate({"a": "1"})
+    assert constant.fields == []
+    assert constant.sign({}) == reference_signed_body({"a": "1"})
+    assert SignedBodyTemplate({}).render({}) == "{}"
+
+def test_missing_field_raises_key_error():
+    template = SignedBodyTemplate({"a": FIELD, "b": FIELD})
+    with pytest.raises(KeyError):
+        template.sign({"a": "1"})
+
+def test_signature_is_thread_safe():
+    """L'état HMAC partagé est copié à chaque signature: aucun mélange entre threads"""
+    template = SignedBodyTemplate({"n": FIELD, "pad": "x" * 512})
+    errors = []
+
+    def worker(offset):
+        for index in range(500):
+            values = {"n": offset * 1000 + index}
+            if template.sign(values) != reference_signed_body({"n": values["n"], "pad": "x" * 512}):
+                errors.append(values)
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+def test_generate_signature_matches_full_hmac():
+    for data in ("", "{}", '{"a":"é😀"}', "x" * 10000):
+        expected = hmac.new(SIGNATURE_KEY.encode(), data.encode(), hashlib.sha256).hexdigest()
+        assert InstagramEncryption.generate_signature(data) == expected
+
+def test_bloks_form_suffix_matches_inline_encoding():
+    version = "ee55d61628b17424a72248a17431be7303200a6e7fa08b0de1736f393f1017bd"
+    context = json.dumps({'bloks_version': version, 'styles_id': 'instagram'})
+    expected = f"&bk_client_context={urllib.parse.quote(context)}&bloks_versioning_id={version}"
+
+    assert bloks_form_suffix(version) == expected
+    assert bloks_form_suffix(version) is bloks_form_suffix(version)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du limiteur de débit par famille d'endpoints (ServerAwareThrottle)
+Classification, seaux à jetons et mise en attente sur 429 / Retry-After / feedback_required
+"""
+
+import time
+from types import SimpleNamespace
+from email.utils import formatdate
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou import Deadline, RateLimitError, DeadlineExceededError
+from insta_kendou.utils.throttle import TokenBucket, endpoint_family, parse_retry_after
+
+LIKE_URL = "https://i.instagram.com/api/v1/media/123_456/like/"
+FORM = {"content-type": "application/x-www-form-urlencoded"}
+
+@pytest.mark.parametrize("method, path, family", [
+    ("POST", "/api/v1/accounts/login/", None),
+    ("POST", "/api/v1/bloks/apps/com.bloks.www.two_step_verification/", None),
+    ("POST", "/rupload_igphoto/123_0_456", "upload"),
+    ("POST", "/api/v1/media/configure/", "upload"),
+    ("POST", "/api/v1/friendships/create/123/", "friendships"),
+    ("POST", "/api/v1/media/123/unlike/", "likes"),
+    ("POST", "/api/v1/media/123/comment/", "comments"),
+    ("GET", "/api/v1/users/123/info/", "read"),
+    ("POST", "/api/v1/media/123/delete/", "write"),
+])
+def test_endpoint_family(method, path, family):
+    request = SimpleNamespace(method=method, url="https://i.instagram.com" + path)
+    assert endpoint_family(request) == family
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert 25 <= parse_retry_after(formatdate(time.time() + 30, usegmt=True)) <= 30
+    assert parse_retry_after(formatdate(time.time() - 30, usegmt=True)) == 0.0
+    assert parse_retry_after("bientôt") is None
+    assert parse_retry_after(None) is None
+
+def test_token_bucket_burst_then_rate():
+    bucket = TokenBucket(rate=10, capacity=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert 0.09 <= bucket.reserve() <= 0.1
+    assert 0.19 <= bucket.reserve() <= 0.2
+    
+    bucket.penalize(5)
+    assert bucket.rate == 5
+    assert bucket.reserve() >= 4.99
+
+@pytest.fixture
+def limited(client, stub_server):
+    """Premier like refusé (429, Retry-After: 1), les suivants acceptés"""
+    responses = iter([(429, {"Retry-After": "1"}, {"status": "fail", "message": "Please wait a few minutes"})])
+    stub_server.handler = lambda method, path, headers, body: next(responses, (200, {}, {"status": "ok"}))
+    stub_server.route(client.auth.session)
+    return client
+
+def test_retry_after_parks_following_requests(limited, stub_server):
+    limited.enable_throttle(rates={"likes": (10, 2)})
+    session = limited.auth.session
+    
+    assert session.post(LIKE_URL, data="a=1", headers=FORM).status_code == 429
+    state = limited.get_throttle_state()["likes"]
+    assert state["penalties"] == 1 and 0.5 < state["cooldown_remaining"] <= 1
+    
+    started = time.monotonic()
+    assert session.post(LIKE_URL, data="a=1", headers=FORM).status_code == 200
+    assert 0.9 <= time.monotonic() - started < 1.5
+    # Les autres familles ne sont pas ralenties
+    started = time.monotonic()
+    session.get("https://i.instagram.com/api/v1/users/123/info/")
+    assert time.monotonic() - started < 0.5
+
+def test_wait_beyond_max_wait_raises_without_sending(limited, stub_server):
+    limited.enable_throttle(rates={"likes": (10, 2)}, max_wait=0.2)
+    session = limited.auth.session
+    session.post(LIKE_URL, data="a=1", headers=FORM)
+    sent = len(stub_server.requests)
+    
+    with pytest.raises(RateLimitError) as raised:
+        session.post(LIKE_URL, data="a=1", headers=FORM)
+    assert raised.value.retry_after in (1, 2)
+    assert len(stub_server.requests) == sent
+
+def test_wait_beyond_deadline_raises_deadline_error(limited, stub_server):
+    limited.enable_throttle()
+    session = limited.auth.session
+    session.post(LIKE_URL, data="a=1", headers=FORM)
+    
+    with Deadline(0.3):
+        with pytest.raises(DeadlineExceededError):
+            session.post(LIKE_URL, data="a=1", headers=FORM)
+
+def test_feedback_required_limit_uses_exponential_cooldown(client, stub_server):
+    stub_server.handler = lambda method, path, headers, body: (
+        400, {}, {"message": "feedback_required", "feedback_message": "Réessayer plus tard. We limit how often you can do certain things."})
+    stub_server.route(client.auth.session)
+    throttle = client.enable_throttle(max_wait=0)
+    throttle.default_cooldown = 10
+    
+    client.auth.session.post(LIKE_URL, data="a=1", headers=FORM)
+    first = throttle.get_state()["likes"]["cooldown_remaining"]
+    throttle.bucket("likes").blocked_until = 0
+    throttle.bucket("likes").tokens = 5
+    client.auth.session.post(LIKE_URL, data="a=1", headers=FORM)
+    second = throttle.get_state()["likes"]["cooldown_remaining"]
+    
+    assert 9 < first <= 10
+    assert 19 < second <= 20
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Tests des timeouts adaptatifs par endpoint (AdaptiveTimeoutPolicy)
+p99 x k borné, surcharges, et coupure rapide d'un endpoint bloqué contre un serveur local
+"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou import timeout_override
+from insta_kendou.utils import get_transport_adapter
+from insta_kendou.utils.timeouts import AdaptiveTimeoutPolicy
+
+INFO = SimpleNamespace(method="GET", url="https://i.instagram.com/api/v1/users/123/info/")
+OTHER_INFO = SimpleNamespace(method="GET", url="https://i.instagram.com/api/v1/users/456/info/")
+
+def feed(policy, request, latency: float, count: int):
+    for _ in range(count):
+        policy.observe(request, object(), None, latency)
+
+def test_caller_timeout_kept_until_enough_samples():
+    policy = AdaptiveTimeoutPolicy(min_samples=20)
+    feed(policy, INFO, 0.1, 19)
+    assert policy.timeout_for(INFO, 10) == (10, 10)
+    feed(policy, INFO, 0.1, 1)
+    assert policy.timeout_for(INFO, 10) == (10, 2.0)
+
+def test_connect_timeout_is_fixed():
+    policy = AdaptiveTimeoutPolicy(k=3, read_floor=0.5, min_samples=10, recompute_every=1)
+    feed(policy, INFO, 0.4, 50)
+    # Latences de requête complète: le timeout de connexion n'en dépend pas
+    assert policy.timeout_for(INFO, (3.05, 30)) == (3.05, pytest.approx(1.2))
+    assert policy.timeout_for(INFO, None)[0] is None
+    
+    fixed = AdaptiveTimeoutPolicy(connect_timeout=2, min_samples=1)
+    feed(fixed, INFO, 0.4, 5)
+    assert fixed.timeout_for(INFO, 10)[0] == 2
+    assert fixed.timeout_for(INFO, None)[0] == 2
+
+def test_failures_are_censored_at_current_limit():
+    policy = AdaptiveTimeoutPolicy(k=3, read_floor=0.5, min_samples=10, recompute_every=1)
+    feed(policy, INFO, 0.2, 90)
+    assert policy.timeout_for(INFO, 10)[1] == pytest.approx(0.6)
+    
+    # Coupures rapides et timeouts: enregistrés au moins à la limite (0,6 s), jamais en dessous
+    for _ in range(5):
+        policy.observe(INFO, None, ConnectionResetError(), 0.01)
+    for _ in range(5):
+        policy.observe(INFO, None, requests.exceptions.ReadTimeout(), 0.6)
+    state = policy.get_state()["GET /api/v{id}/users/{id}/info/"]
+    assert state["samples"] == 100 and state["p99"] >= 0.6
+    assert policy.timeout_for(INFO, 10)[1] >= 1.8
+    
+    # Échecs avant toute mesure: latence observée conservée
+    cold = AdaptiveTimeoutPolicy(min_samples=1)
+    cold.observe(INFO, None, requests.exceptions.ConnectTimeout(), 4.0)
+    assert cold.timeout_for(INFO, 30)[1] == pytest.approx(12.0)
+
+def test_read_timeout_is_p99_times_k_within_bounds():
+    policy = AdaptiveTimeoutPolicy(k=3, read_floor=0.5, min_samples=10, recompute_every=1)
+    feed(policy, INFO, 0.4, 99)
+    feed(policy, INFO, 1.0, 1)
+    
+    # IDs normalisés: une seule fenêtre pour tous les profils
+    connect, read = policy.timeout_for(OTHER_INFO, 10)
+    assert read == pytest.approx(3.0)
+    assert policy.timeout_for(OTHER_INFO, (5, 2))[1] == 2
+    assert policy.timeout_for(OTHER_INFO, None)[1] == pytest.approx(3.0)
+    assert policy.get_state()["GET /api/v{id}/users/{id}/info/"]["samples"] == 100
+
+def test_override_takes_precedence():
+    policy = AdaptiveTimeoutPolicy(min_samples=1, overrides={"GET /api/v{id}/users/{id}/info/": (1, 4)})
+    feed(policy, INFO, 0.1, 5)
+    assert policy.timeout_for(INFO, 10) == (1, 4)
+
+def test_stalled_endpoint_is_cut_at_adaptive_timeout(client, stub_server):
+    stall = {"seconds": 0.02}
+    
+    def handler(method, path, headers, body):
+        time.sleep(stall["seconds"])
+        return 200, {}, {"status": "ok"}
+    
+    stub_server.handler = handler
+    stub_server.route(client.auth.session)
+    # Une seule tentative par requête pour mesurer le timeout seul
+    get_transport_adapter(client.auth.session).retry_policy = None
+    policy = client.enable_adaptive_timeouts(k=3, read_floor=0.3, min_samples=10)
+    session = client.auth.session
+    url = "https://i.instagram.com/api/v1/users/123/info/"
+    for _ in range(10):
+        session.get(url, timeout=10)
+    assert policy.get_state()["GET /api/v{id}/users/{id}/info/"]["read_timeout"] == 0.3
+    
+    stall["seconds"] = 2
+    started = time.monotonic()
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        session.get(url, timeout=10)
+    assert time.monotonic() - started < 1
+    
+    # timeout_override reste prioritaire sur le timeout adaptatif
+    stall["seconds"] = 0.5
+    with timeout_override(5):
+        assert session.get(url, timeout=10).status_code == 200
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du traçage par spans imbriqués et de l'export JSONL (forme OTLP/JSON)
+Connexion tracée contre un serveur local qui répond par un challenge
+"""
+
+import json
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou.utils import get_transport_adapter
+from insta_kendou.utils.tracing import Tracer, InMemorySpanExporter, span, traced, current_span, SPAN_KIND_CLIENT
+
+def challenge_handler(method, path, headers, body):
+    if "mobileconfig" in path or "qe/sync" in path:
+        return 200, {}, {"status": "ok"}
+    return 400, {}, {"status": "fail", "message": "challenge_required", "layout": "PresentCheckpointsFlow"}
+
+def test_spans_nest_and_noop_outside_a_trace():
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(exporter)
+    
+    @traced("step.failing")
+    def failing_step():
+        return {"success": False, "error": "refusé"}
+    
+    assert span("orphan") is span("other")
+    assert failing_step() == {"success": False, "error": "refusé"}
+    assert exporter.spans == []
+    
+    with tracer.span("root", {"ig.username": "alice"}) as root:
+        with span("child") as child:
+            assert current_span() is child
+            failing_step()
+    assert current_span() is None
+    
+    names = {record["name"]: record for record in exporter.spans}
+    assert set(names) == {"root", "child", "step.failing"}
+    assert names["child"]["parentSpanId"] == root.span_id
+    assert names["step.failing"]["parentSpanId"] == child.span_id
+    assert names["step.failing"]["status"] == {"code": 2, "message": "refusé"}
+    assert {record["traceId"] for record in exporter.spans} == {root.trace_id}
+    assert names["root"]["attributes"] == [{"key": "ig.username", "value": {"stringValue": "alice"}}]
+
+def test_traced_login_exports_jsonl(client, stub_server, tmp_path):
+    stub_server.handler = challenge_handler
+    stub_server.route(client.auth.session)
+    path = tmp_path / "traces" / "login.jsonl"
+    client.enable_tracing(str(path))
+    
+    result = client.login("alice", "secret")
+    assert not result["success"]
+    
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    by_id = {record["spanId"]: record for record in records}
+    names = [record["name"] for record in records]
+    
+    assert len({record["traceId"] for record in records}) == 1
+    roots = [record for record in records if not record["parentSpanId"]]
+    assert [root["name"] for root in roots] == ["login"]
+    assert all(record["parentSpanId"] in by_id for record in records if record["parentSpanId"])
+    assert {"login.sync_pre_login", "encryption.encrypt_password", "login.send_login_request"} <= set(names)
+    
+    http_spans = [record for record in records if record["kind"] == SPAN_KIND_CLIENT]
+    assert http_spans and all(record["name"].startswith("HTTP ") for record in http_spans)
+    for record in records:
+        assert int(record["startTimeUnixNano"]) <= int(record["endTimeUnixNano"])
+        assert record["resource"]["attributes"][0]["value"] == {"stringValue": "insta_kendou"}
+    
+    client.disable_tracing()
+    assert not any(getattr(observer, "__name__", "") == "observe_http"
+                   for observer in get_transport_adapter(client.auth.session).observers)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du pipeline d'upload de post (hash PDQ et corps signé calculés pendant l'envoi)
+Serveur local simulant rupload, configure et la mise à jour PDQ
+"""
+
+import time
+import threading
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+UPLOAD_DELAY = 0.3
+
+@pytest.fixture
+def image_path(tmp_path):
+    path = tmp_path / "post.png"
+    Image.new("RGB", (1200, 1200), (90, 140, 200)).save(path)
+    return str(path)
+
+@pytest.fixture
+def instagram(client, stub_server):
+    def handler(method, path, headers, body):
+        if path.startswith("/rupload_igphoto/"):
+            time.sleep(UPLOAD_DELAY)
+            return 200, {}, {"status": "ok", "upload_id": "1"}
+        if path.startswith("/api/v1/media/configure/"):
+            return 200, {}, {"status": "ok", "media": {"pk": "42", "code": "Cabc"}}
+        return 200, {}, {"status": "ok"}
+    
+    stub_server.handler = handler
+    stub_server.route(client.auth.session)
+    return client
+
+def test_busy_background_pool_does_not_delay_post_pipeline(instagram, stub_server, image_path):
+    # Occuper les deux workers d'arrière-plan (préchauffage lent, mises à jour PDQ en attente)
+    release = threading.Event()
+    blockers = [instagram._submit_background(release.wait, 30, detached=True) for _ in range(2)]
+    
+    started = time.perf_counter()
+    result = instagram._upload_post_internal(image_path, "légende")
+    elapsed = time.perf_counter() - started
+    
+    assert result["success"], result
+    assert elapsed < UPLOAD_DELAY + 2.0
+    assert not any(blocker.done() for blocker in blockers)
+    
+    release.set()
+    assert instagram.wait_background_tasks(timeout=10)
+    paths = [path for _, path in stub_server.requests]
+    assert any(path.startswith("/api/v1/media/update_media_with_pdq_hash_info/") for path in paths)
+
+def test_pipeline_work_overlaps_with_upload(instagram, image_path, monkeypatch):
+    from insta_kendou.utils.media import MediaProcessor
+    
+    # Hash PDQ et corps signé ralentis: ils doivent s'exécuter pendant l'envoi, pas après
+    real_complete = MediaProcessor.complete_pdq_hash
+    real_build = instagram._build_post_configure_body
+    monkeypatch.setattr(MediaProcessor, "complete_pdq_hash",
+                        staticmethod(lambda prepared: (time.sleep(UPLOAD_DELAY), real_complete(prepared))[1]))
+    monkeypatch.setattr(instagram, "_build_post_configure_body",
+                        lambda *args: (time.sleep(UPLOAD_DELAY), real_build(*args))[1])
+    
+    started = time.perf_counter()
+    result = instagram._upload_post_internal(image_path)
+    elapsed = time.perf_counter() - started
+    
+    assert result["success"], result
+    assert elapsed < 2.5 * UPLOAD_DELAY + 0.5
+    assert instagram.wait_background_tasks(timeout=10)
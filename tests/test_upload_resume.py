@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de l'upload rupload en streaming avec reprise
+Requête GET de l'offset reçu, renvoi de la seule fin du corps après coupure, erreurs rapportées par tentative
+"""
+
+import os
+
+import pytest
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou.utils.media import MediaProcessor
+from conftest import RESET
+
+DATA = os.urandom(300 * 1024)
+RECEIVED = 100_000
+
+@pytest.fixture
+def uploads(client, stub_server):
+    """Requêtes rupload reçues: (méthode, en-tête offset, corps); stub_server.script fixe les réponses POST"""
+    received = []
+    stub_server.script = []
+    stub_server.offset_reply = (200, {}, {"offset": RECEIVED})
+
+    def handler(method, path, headers, body):
+        if not path.startswith("/rupload_igphoto/"):
+            return 200, {}, {"status": "ok"}
+        received.append((method, headers.get("offset"), body, headers.get("x-entity-length")))
+        if method == "GET":
+            return stub_server.offset_reply
+        return stub_server.script.pop(0) if stub_server.script else (200, {}, {"status": "ok"})
+
+    stub_server.handler = handler
+    stub_server.route(client.auth.session)
+    return received
+
+def test_query_upload_offset(client, stub_server, uploads):
+    url = "https://i.instagram.com/rupload_igphoto/1_0_1"
+    assert client._query_upload_offset(url, {}, len(DATA)) == RECEIVED
+
+    stub_server.offset_reply = (200, {}, {"offset": len(DATA) + 1})
+    assert client._query_upload_offset(url, {}, len(DATA)) == 0
+
+    stub_server.offset_reply = (404, {}, {"status": "fail"})
+    assert client._query_upload_offset(url, {}, len(DATA)) == 0
+
+    stub_server.offset_reply = (200, {}, b"<html>")
+    assert client._query_upload_offset(url, {}, len(DATA)) == 0
+    assert [method for method, *_ in uploads] == ["GET"] * 4
+
+def test_drop_mid_body_resends_only_the_tail(client, stub_server, uploads):
+    stub_server.script = [RESET]
+
+    result = client._upload_image_data(DATA, "1760000000123")
+    assert result["success"], result
+
+    assert [method for method, *_ in uploads] == ["POST", "GET", "POST"]
+    (_, first_offset, first_body, _), _, (_, offset, body, length) = uploads
+    assert first_offset == "0" and first_body == DATA
+    assert offset == str(RECEIVED)
+    assert body == DATA[RECEIVED:]
+    assert length == str(len(DATA))
+
+def test_server_error_resumes_from_returned_offset(client, stub_server, uploads):
+    stub_server.script = [(503, {}, {"status": "fail"})]
+    stub_server.offset_reply = (200, {}, {"offset": 0})
+
+    assert client._upload_image_data(DATA, "1760000000123")["success"]
+    assert [(method, offset) for method, offset, *_ in uploads] == [("POST", "0"), ("GET", None), ("POST", "0")]
+    assert uploads[-1][2] == DATA
+
+def test_last_attempt_error_is_reported_not_stale_response(client, stub_server, uploads):
+    stub_server.script = [(503, {}, {"status": "fail"}), RESET, RESET]
+
+    result = client._upload_image_data(DATA, "1760000000123")
+    assert not result["success"]
+    assert result["error"].startswith("Erreur upload image")
+    assert "503" not in result["error"]
+
+def test_path_input_is_mapped_and_closed(client, stub_server, uploads, tmp_path, monkeypatch):
+    path = tmp_path / "image.jpg"
+    path.write_bytes(DATA)
+    maps = []
+    real_map_file = MediaProcessor.map_file
+    monkeypatch.setattr(MediaProcessor, "map_file",
+                        staticmethod(lambda image_path: maps.append(real_map_file(image_path)) or maps[-1]))
+    stub_server.script = [RESET]
+
+    assert client._upload_image_data(str(path), "1760000000123")["success"]
+    assert uploads[-1][2] == DATA[RECEIVED:]
+    assert len(maps) == 1 and maps[0].closed
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du préchauffage des connexions (warm_up_connections)
+Connexions ouvertes d'avance puis réutilisées par les requêtes, échec sans effet, exécution en arrière-plan
+"""
+
+import time
+import threading
+
+# CODE D'ACCÈS OBLIGATOIRE - NÉCESSAIRE POUR UTILISER LA BIBLIOTHÈQUE
+ACCESS_CODE = "MampifalyfelicienKennyNestinFoad56266325$17Mars2004FeliciteGemmellineNestine"
+
+from insta_kendou import InstagramClient
+from conftest import DEVICE_INFO, SESSION_DATA
+
+UNREACHABLE = "http://127.0.0.1:1"
+
+def wait_for_connections(server, count, timeout=2.0):
+    """Le compteur est incrémenté par le thread serveur après accept(), un peu après le connect() client"""
+    deadline = time.monotonic() + timeout
+    while server.connections < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return server.connections
+
+def test_warmed_connections_are_reused(client, stub_server):
+    opened = client.warm_up_connections((stub_server.url, UNREACHABLE), connections=2, wait=True)
+    
+    assert opened == {stub_server.url: 2, UNREACHABLE: 0}
+    assert wait_for_connections(stub_server, 2) == 2
+    assert stub_server.requests == []
+    
+    for _ in range(4):
+        assert client.auth.session.get(stub_server.url + "/api/v1/users/123/info/").status_code == 200
+    assert stub_server.connections == 2
+    assert len(stub_server.requests) == 4
+
+def test_warm_up_runs_in_background(client, stub_server):
+    future = client.warm_up_connections((stub_server.url,))
+    assert future.result(timeout=5) == {stub_server.url: 1}
+    assert client.wait_background_tasks(timeout=5)
+
+def test_construction_with_warm_up_does_not_wait(monkeypatch):
+    release = threading.Event()
+    calls = []
+    
+    def slow_warm_up(self, hosts, connections):
+        calls.append(hosts)
+        release.wait(5)
+        return {}
+    
+    monkeypatch.setattr(InstagramClient, "_warm_up_hosts", slow_warm_up)
+    client = InstagramClient.from_memory(dict(SESSION_DATA), dict(DEVICE_INFO), warm_up=True)
+    assert not client.wait_background_tasks(timeout=0.1)
+    
+    release.set()
+    assert client.wait_background_tasks(timeout=5)
+    assert calls == [("https://i.instagram.com", "https://b.i.instagram.com")]